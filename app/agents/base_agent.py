@@ -53,12 +53,29 @@ class BaseAgent(ABC):
             openai_api_key=settings.OPENAI_API_KEY,
         )
         self.logger = get_logger(f"agent.{name}")
+        self._prompt: Optional[ChatPromptTemplate] = None
 
     @abstractmethod
     def create_prompt(self) -> ChatPromptTemplate:
         """Create the prompt template for this agent."""
         pass
 
+    def prepare_prompt(self) -> ChatPromptTemplate:
+        """
+        Build the prompt template once and reuse it for every call.
+        
+        Prompts keep the static instructions and format instructions in the
+        system message, ahead of the per-request data, so every request
+        starts with the same prefix and OpenAI's prompt caching skips its
+        prefill.
+        
+        Returns:
+            The agent's prompt template
+        """
+        if self._prompt is None:
+            self._prompt = self.create_prompt()
+        return self._prompt
+
     @abstractmethod
     async def process(self, state: AgentState) -> AgentState:
         """Process the current state and return updated state."""
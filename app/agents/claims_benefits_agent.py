@@ -53,11 +53,9 @@ class ClaimsAndBenefitsAgent(BaseAgent):
 
     def create_prompt(self) -> ChatPromptTemplate:
         """Create claims analysis prompt."""
-        template = """You are an expert at analyzing insurance claims and calculating benefits.
+        system_template = """You are an expert at analyzing insurance claims and calculating benefits.
 
-Analyze this claim document:
-
-{text}
+Analyze the claim document in the user message.
 
 Instructions:
 1. Extract claim identification (claim number, policy number, claimant)
@@ -84,7 +82,10 @@ Instructions:
 
 {format_instructions}
 """
-        return ChatPromptTemplate.from_template(template).partial(
+        return ChatPromptTemplate.from_messages([
+            ("system", system_template),
+            ("human", "{text}"),
+        ]).partial(
             format_instructions=self.parser.get_format_instructions()
         )
 
@@ -96,11 +97,11 @@ Instructions:
 
         try:
             # Create chain
-            prompt = self.create_prompt()
+            prompt = self.prepare_prompt()
             chain = prompt | self.llm | self.parser
 
             # Run analysis
-            result: ClaimAnalysis = chain.invoke({"text": state.text})
+            result: ClaimAnalysis = await chain.ainvoke({"text": state.text})
 
             # Update state
             state.extracted_entities = {
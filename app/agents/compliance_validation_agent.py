@@ -68,14 +68,9 @@ class ComplianceValidationAgent(BaseAgent):
 
     def create_prompt(self) -> ChatPromptTemplate:
         """Create compliance validation prompt."""
-        template = """You are an expert compliance officer specializing in healthcare and insurance regulations.
+        system_template = """You are an expert compliance officer specializing in healthcare and insurance regulations.
 
-Validate compliance for the following claim/policy/transaction:
-
-Data to Validate:
-{data}
-
-Document Type: {document_type}
+Validate compliance for the claim/policy/transaction in the user message.
 
 Instructions - Check compliance with these regulations:
 
@@ -150,7 +145,13 @@ Provide critical actions and recommendations.
 
 {format_instructions}
 """
-        return ChatPromptTemplate.from_template(template).partial(
+        return ChatPromptTemplate.from_messages([
+            ("system", system_template),
+            ("human", (
+                "Data to Validate:\n{data}\n\n"
+                "Document Type: {document_type}"
+            )),
+        ]).partial(
             format_instructions=self.parser.get_format_instructions()
         )
 
@@ -166,11 +167,11 @@ Provide critical actions and recommendations.
             document_type = state.document_type or "unknown"
 
             # Create chain
-            prompt = self.create_prompt()
+            prompt = self.prepare_prompt()
             chain = prompt | self.llm | self.parser
 
             # Run compliance validation
-            result: ComplianceValidation = chain.invoke({
+            result: ComplianceValidation = await chain.ainvoke({
                 "data": str(data),
                 "document_type": document_type,
             })
@@ -32,18 +32,15 @@ class DocumentClassifierAgent(BaseAgent):
 
     def create_prompt(self) -> ChatPromptTemplate:
         """Create classification prompt."""
-        template = """You are an expert at classifying financial and insurance documents.
+        system_template = """You are an expert at classifying financial and insurance documents.
 
-Analyze the following document and classify it into one of these types:
+Analyze the document in the user message and classify it into one of these types:
 - policy: Insurance policy documents
 - claim_form: Medical/insurance claim forms
 - invoice: Medical or service invoices/bills
 - eob: Explanation of Benefits (EOB) documents
 - receipt: Payment receipts
 
-Document Text:
-{text}
-
 Instructions:
 1. Identify the document type based on content, structure, and terminology
 2. Look for key indicators like policy numbers, claim numbers, invoice amounts, EOB language
@@ -53,7 +50,10 @@ Instructions:
 
 {format_instructions}
 """
-        return ChatPromptTemplate.from_template(template).partial(
+        return ChatPromptTemplate.from_messages([
+            ("system", system_template),
+            ("human", "Document Text:\n{text}"),
+        ]).partial(
             format_instructions=self.parser.get_format_instructions()
         )
 
@@ -65,11 +65,11 @@ Instructions:
 
         try:
             # Create chain
-            prompt = self.create_prompt()
+            prompt = self.prepare_prompt()
             chain = prompt | self.llm | self.parser
 
             # Run classification
-            result: ClassificationResult = chain.invoke({"text": state.text[:5000]})
+            result: ClassificationResult = await chain.ainvoke({"text": state.text[:5000]})
 
             # Update state
             state.document_type = result.document_type
@@ -50,18 +50,9 @@ class EligibilityReasoningAgent(BaseAgent):
 
     def create_prompt(self) -> ChatPromptTemplate:
         """Create eligibility reasoning prompt."""
-        template = """You are an expert at determining insurance coverage eligibility and explaining the reasoning.
+        system_template = """You are an expert at determining insurance coverage eligibility and explaining the reasoning.
 
-Analyze the following information to determine eligibility:
-
-Policy Information:
-{policy_info}
-
-Service/Claim Information:
-{service_info}
-
-Medical Context:
-{medical_context}
+Analyze the information in the user message to determine eligibility.
 
 Instructions:
 1. Determine if the service is eligible for coverage under this policy
@@ -93,7 +84,14 @@ Instructions:
 
 {format_instructions}
 """
-        return ChatPromptTemplate.from_template(template).partial(
+        return ChatPromptTemplate.from_messages([
+            ("system", system_template),
+            ("human", (
+                "Policy Information:\n{policy_info}\n\n"
+                "Service/Claim Information:\n{service_info}\n\n"
+                "Medical Context:\n{medical_context}"
+            )),
+        ]).partial(
             format_instructions=self.parser.get_format_instructions()
         )
 
@@ -110,11 +108,11 @@ Instructions:
             medical_context = state.extracted_entities.get("medical_codes", "No medical codes available")
 
             # Create chain
-            prompt = self.create_prompt()
+            prompt = self.prepare_prompt()
             chain = prompt | self.llm | self.parser
 
             # Run eligibility check
-            result: EligibilityDecision = chain.invoke({
+            result: EligibilityDecision = await chain.ainvoke({
                 "policy_info": str(policy_info),
                 "service_info": str(service_info),
                 "medical_context": str(medical_context),
@@ -61,15 +61,9 @@ class FraudDetectionAgent(BaseAgent):
 
     def create_prompt(self) -> ChatPromptTemplate:
         """Create fraud detection prompt."""
-        template = """You are an expert fraud detection analyst specializing in healthcare and insurance fraud.
+        system_template = """You are an expert fraud detection analyst specializing in healthcare and insurance fraud.
 
-Analyze the following claim/billing information for potential fraud indicators:
-
-Claim/Billing Data:
-{claim_data}
-
-Historical Context (if available):
-{historical_context}
+Analyze the claim/billing information in the user message for potential fraud indicators.
 
 Instructions - Analyze for these fraud patterns:
 
@@ -126,7 +120,13 @@ Provide actionable recommendations for investigation or approval.
 
 {format_instructions}
 """
-        return ChatPromptTemplate.from_template(template).partial(
+        return ChatPromptTemplate.from_messages([
+            ("system", system_template),
+            ("human", (
+                "Claim/Billing Data:\n{claim_data}\n\n"
+                "Historical Context (if available):\n{historical_context}"
+            )),
+        ]).partial(
             format_instructions=self.parser.get_format_instructions()
         )
 
@@ -142,11 +142,11 @@ Provide actionable recommendations for investigation or approval.
             historical_context = state.analysis.get("historical_data", "No historical context available")
 
             # Create chain
-            prompt = self.create_prompt()
+            prompt = self.prepare_prompt()
             chain = prompt | self.llm | self.parser
 
             # Run fraud detection
-            result: FraudAnalysis = chain.invoke({
+            result: FraudAnalysis = await chain.ainvoke({
                 "claim_data": str(claim_data),
                 "historical_context": str(historical_context),
             })
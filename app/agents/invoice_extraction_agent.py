@@ -51,11 +51,9 @@ class InvoiceExtractionAgent(BaseAgent):
 
     def create_prompt(self) -> ChatPromptTemplate:
         """Create invoice extraction prompt."""
-        template = """You are an expert at extracting structured information from invoices and bills.
+        system_template = """You are an expert at extracting structured information from invoices and bills.
 
-Extract all relevant information from this invoice/bill:
-
-{text}
+Extract all relevant information from the invoice/bill in the user message.
 
 Instructions:
 1. Extract invoice header information (number, dates, provider details)
@@ -69,7 +67,10 @@ Instructions:
 
 {format_instructions}
 """
-        return ChatPromptTemplate.from_template(template).partial(
+        return ChatPromptTemplate.from_messages([
+            ("system", system_template),
+            ("human", "{text}"),
+        ]).partial(
             format_instructions=self.parser.get_format_instructions()
         )
 
@@ -81,11 +82,11 @@ Instructions:
 
         try:
             # Create chain
-            prompt = self.create_prompt()
+            prompt = self.prepare_prompt()
             chain = prompt | self.llm | self.parser
 
             # Run extraction
-            result: InvoiceData = chain.invoke({"text": state.text})
+            result: InvoiceData = await chain.ainvoke({"text": state.text})
 
             # Update state
             state.extracted_entities = {
@@ -57,11 +57,9 @@ class PolicyParserAgent(BaseAgent):
 
     def create_prompt(self) -> ChatPromptTemplate:
         """Create policy parsing prompt."""
-        template = """You are an expert at analyzing insurance policy documents.
+        system_template = """You are an expert at analyzing insurance policy documents.
 
-Extract all relevant information from this insurance policy:
-
-{text}
+Extract all relevant information from the insurance policy in the user message.
 
 Instructions:
 1. Extract policy identification (number, holder, company, type)
@@ -77,7 +75,10 @@ Instructions:
 
 {format_instructions}
 """
-        return ChatPromptTemplate.from_template(template).partial(
+        return ChatPromptTemplate.from_messages([
+            ("system", system_template),
+            ("human", "{text}"),
+        ]).partial(
             format_instructions=self.parser.get_format_instructions()
         )
 
@@ -89,11 +90,11 @@ Instructions:
 
         try:
             # Create chain
-            prompt = self.create_prompt()
+            prompt = self.prepare_prompt()
             chain = prompt | self.llm | self.parser
 
             # Run parsing
-            result: PolicyData = chain.invoke({"text": state.text})
+            result: PolicyData = await chain.ainvoke({"text": state.text})
 
             # Update state
             state.extracted_entities = {
@@ -0,0 +1,10 @@
+"""Shared client dependencies for API routes."""
+
+from fastapi import Request
+
+from app.services.storage_service import StorageService
+
+
+def get_storage(request: Request) -> StorageService:
+    """Get the shared storage service."""
+    return request.app.state.storage
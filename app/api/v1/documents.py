@@ -1,5 +1,6 @@
 """Document management endpoints."""
 
+import asyncio
 from typing import Optional, Dict, Any
 from uuid import UUID
 
@@ -7,11 +8,12 @@ from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status,
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.deps import get_storage
 from app.core.security import get_current_user
 from app.db.postgres import get_db
 from app.models.database import Document as DBDocument
 from app.models.schemas import DocumentMetadata, DocumentType, SuccessResponse, TokenData
-from app.services.storage_service import get_storage_service
+from app.services.storage_service import StorageService
 from app.services.ocr_service import get_ocr_service
 from app.services.document_service import get_document_classifier
 from app.services.extraction_service import get_extraction_service
@@ -24,6 +26,34 @@ from app.utils.logger import get_logger
 router = APIRouter()
 logger = get_logger(__name__)
 
+_ALLOWED_TYPES = frozenset({
+    "application/pdf",
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "image/jpeg",
+    "image/png",
+})
+
+
+# Columns needed to render DocumentMetadata
+_DOCUMENT_LIST_COLUMNS = (
+    DBDocument.document_id,
+    DBDocument.filename,
+    DBDocument.file_size,
+    DBDocument.mime_type,
+    DBDocument.document_type,
+    DBDocument.upload_date,
+    DBDocument.processed,
+    DBDocument.processing_status,
+)
+
+
+def _first_code(medical_codes: Optional[Dict[str, Any]], kind: str) -> Optional[str]:
+    """Return the first extracted code of a kind, for the indexed column."""
+    if not medical_codes:
+        return None
+    codes = medical_codes.get(kind)
+    return codes[0][:16] if codes else None
+
 
 @router.post("/upload", response_model=DocumentMetadata, status_code=status.HTTP_201_CREATED)
 async def upload_document(
@@ -33,6 +63,7 @@ async def upload_document(
     background_tasks: BackgroundTasks = None,
     current_user: TokenData = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
+    storage: StorageService = Depends(get_storage),
 ):
     """
     Upload a document for processing.
@@ -45,41 +76,41 @@ async def upload_document(
         use_workflow: Use LangGraph AI workflow for comprehensive analysis
         current_user: Authenticated user
         db: Database session
+        storage: Shared storage service
     """
     # Validate file size
     from app.config import settings
     
-    # Read file content
-    content = await file.read()
-    file_size = len(content)
-    
     max_size = settings.MAX_FILE_SIZE_MB * 1024 * 1024
-    if file_size > max_size:
-        raise HTTPException(
+    
+    def _too_large() -> HTTPException:
+        return HTTPException(
             status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
             detail=f"File size exceeds maximum allowed size of {settings.MAX_FILE_SIZE_MB}MB",
         )
 
-    # Validate file type
-    allowed_types = [
-        "application/pdf",
-        "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-        "image/jpeg",
-        "image/png",
-    ]
-    
-    if file.content_type not in allowed_types:
+    # Validate file type and known size before reading any bytes
+    if file.content_type not in _ALLOWED_TYPES:
         raise HTTPException(
             status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
             detail=f"Unsupported file type: {file.content_type}",
         )
+    
+    if file.size is not None and file.size > max_size:
+        raise _too_large()
+    
+    # Read file content
+    content = await file.read()
+    file_size = len(content)
+    
+    if file_size > max_size:
+        raise _too_large()
 
     # TODO: Upload to S3/MinIO
-    storage = get_storage_service()
     file_path = f"documents/{current_user.user_id}/{file.filename}"
     
-    # Upload to storage
-    storage.upload_file(
+    # Upload to storage while the text is extracted
+    upload = asyncio.create_task(storage.upload_file_async(
         file_content=content,
         object_key=file_path,
         content_type=file.content_type,
@@ -87,30 +118,36 @@ async def upload_document(
             "user_id": str(current_user.user_id),
             "original_filename": file.filename or "unknown",
         },
-    )
-    
-    logger.info("File uploaded to storage", file_path=file_path)
-    
-    # Extract text using OCR
-    ocr = get_ocr_service()
+    ))
     
-    if file.content_type == "application/pdf":
-        extracted_text = ocr.extract_text_from_pdf(content)
-    elif file.content_type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
-        extracted_text = ocr.extract_text_from_docx(content)
-    else:  # Image
-        extracted_text = ocr.extract_text_from_image(content)
+    try:
+        # Extract text using OCR
+        ocr = get_ocr_service()
+        
+        if file.content_type == "application/pdf":
+            extracted_text = ocr.extract_text_from_pdf(content)
+        elif file.content_type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
+            extracted_text = ocr.extract_text_from_docx(content)
+        else:  # Image
+            # Decoding and OCR run in a worker thread, off the event loop
+            extracted_text = await asyncio.to_thread(ocr.extract_text_from_image, content)
+    finally:
+        await upload
     
+    logger.info("File uploaded to storage", file_path=file_path)
     logger.info("Text extracted", text_length=len(extracted_text))
     
     # Classify document if type not provided
     if not document_type:
         classifier = get_document_classifier()
-        doc_type_str, confidence = classifier.classify(extracted_text)
+        context = classifier.build_context(extracted_text, file.filename)
+        doc_type_str, confidence = classifier.classify(extracted_text, context=context)
         
         # Try LLM if confidence is low
         if confidence < 0.7:
-            doc_type_str, confidence = classifier.classify_with_llm(extracted_text)
+            doc_type_str, confidence = classifier.classify_with_llm(
+                extracted_text, context=context
+            )
         
         document_type = DocumentType(doc_type_str)
         logger.info("Document classified", doc_type=doc_type_str, confidence=confidence)
@@ -141,6 +178,8 @@ async def upload_document(
         extracted_text=extracted_text[:10000],  # Store first 10k chars
         extracted_entities=entities,
         medical_codes=medical_codes,
+        cpt_code=_first_code(medical_codes, "cpt"),
+        icd10_code=_first_code(medical_codes, "icd10"),
         classification_confidence=confidence,
     )
     
@@ -223,7 +262,7 @@ async def upload_document(
         graph_store = get_graph_store_service()
         
         # Extract entities and relationships
-        extraction = graph_extractor.extract_entities_and_relationships(
+        extraction = await graph_extractor.aextract_entities_and_relationships(
             text=extracted_text,
             document_type=document_type.value,
             document_id=str(db_document.document_id)
@@ -295,6 +334,7 @@ async def delete_document(
     document_id: UUID,
     current_user: TokenData = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
+    storage: StorageService = Depends(get_storage),
 ):
     """Delete a document."""
     result = await db.execute(
@@ -312,10 +352,9 @@ async def delete_document(
         )
     
     # Delete from S3/MinIO
-    storage = get_storage_service()
     try:
         if document.file_path:
-            storage.delete_file(document.file_path)
+            await storage.delete_file_async(document.file_path)
             logger.info("Deleted file from storage", file_path=document.file_path)
     except Exception as e:
         logger.warning("Failed to delete file from storage", error=str(e))
@@ -344,7 +383,11 @@ async def list_documents(
     db: AsyncSession = Depends(get_db),
 ):
     """List user's documents."""
-    query = select(DBDocument).where(DBDocument.user_id == current_user.user_id)
+    # Select only the listed columns: rows come back as lightweight tuples
+    # instead of identity-mapped ORM objects carrying text and JSONB blobs
+    query = select(*_DOCUMENT_LIST_COLUMNS).where(
+        DBDocument.user_id == current_user.user_id
+    )
     
     if document_type:
         query = query.where(DBDocument.document_type == document_type.value)
@@ -352,6 +395,6 @@ async def list_documents(
     query = query.limit(limit).offset(offset)
     
     result = await db.execute(query)
-    documents = result.scalars().all()
+    documents = result.mappings().all()
     
     return documents
@@ -5,7 +5,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.security import get_current_user
 from app.db.postgres import get_db
-from app.models.database import EligibilityCheck as DBEligibilityCheck
+from app.models.database import CONFIDENCE_SCALE, EligibilityCheck as DBEligibilityCheck
 from app.models.schemas import (
     EligibilityCheckRequest,
     EligibilityCheckResponse,
@@ -61,7 +61,7 @@ async def check_eligibility(
         procedure_code=request.procedure_code,
         diagnosis_code=request.diagnosis_code,
         result=EligibilityResult.APPROVED.value,
-        confidence_score=8500,  # Store as int for precision (0.85)
+        confidence_score=round(0.85 * CONFIDENCE_SCALE),
         explanation={
             "decision": "approved",
             "reasoning": "Procedure is covered under policy",
@@ -72,7 +72,7 @@ async def check_eligibility(
     await db.commit()
     await db.refresh(db_check)
     
-    return EligibilityCheckResponse(
+    return EligibilityCheckResponse.make(
         check_id=db_check.check_id,
         result=EligibilityResult.APPROVED,
         confidence_score=0.85,
@@ -94,22 +94,27 @@ async def get_eligibility_history(
     from sqlalchemy import select, desc
     
     result = await db.execute(
-        select(DBEligibilityCheck)
+        select(
+            DBEligibilityCheck.check_id,
+            DBEligibilityCheck.result,
+            DBEligibilityCheck.confidence_score,
+            DBEligibilityCheck.explanation,
+        )
         .where(DBEligibilityCheck.user_id == current_user.user_id)
         .order_by(desc(DBEligibilityCheck.created_at))
         .limit(limit)
     )
     
-    checks = result.scalars().all()
+    checks = result.all()
     
     # Convert to response format
     response_list = []
     for check in checks:
         response_list.append(
-            EligibilityCheckResponse(
+            EligibilityCheckResponse.make(
                 check_id=check.check_id,
                 result=check.result,
-                confidence_score=check.confidence_score / 10000,
+                confidence_score=check.confidence_score / CONFIDENCE_SCALE,
                 explanation=check.explanation.get("reasoning", ""),
                 cost_estimate=None,
                 requirements=[],
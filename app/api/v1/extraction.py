@@ -38,7 +38,7 @@ async def extract_entities(
     # 3. Store entities in graph and vector databases
     # 4. Return extracted entities
     
-    return EntityExtractionResponse(
+    return EntityExtractionResponse.make(
         document_id=request.document_id,
         entities={
             "policies": [],
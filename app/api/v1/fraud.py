@@ -37,7 +37,7 @@ async def analyze_fraud(
     # 4. Calculate fraud risk score
     # 5. Generate indicators
     
-    return FraudAnalysisResponse(
+    return FraudAnalysisResponse.make(
         claim_id=request.claim_id,
         fraud_risk_score=0.15,
         risk_level="low",
@@ -37,7 +37,7 @@ async def get_policy_coverage(
     # 3. Get exclusions
     # 4. Filter by service category if provided
     
-    return PolicyCoverageResponse(
+    return PolicyCoverageResponse.make(
         policy_id=policy_id,
         coverages=[],
         exclusions=[],
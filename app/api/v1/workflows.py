@@ -1,13 +1,15 @@
 """Workflow endpoints - LangGraph agent orchestration."""
 
+import heapq
+
 from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks
 from pydantic import BaseModel, Field
 from typing import Optional, Dict, Any, List
 from datetime import datetime
-import uuid
 
 from app.workflows import DocumentProcessingWorkflow, EligibilityCheckWorkflow
 from app.core.security import get_current_user
+from app.utils.ids import new_id
 from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -62,7 +64,7 @@ async def process_document(
     Returns comprehensive analysis results.
     """
     try:
-        workflow_id = str(uuid.uuid4())
+        workflow_id = new_id()
         
         logger.info(
             "Starting document processing workflow",
@@ -146,7 +148,7 @@ async def check_eligibility(
     Returns eligibility decision with fraud risk and compliance status.
     """
     try:
-        workflow_id = str(uuid.uuid4())
+        workflow_id = new_id()
         
         logger.info(
             "Starting eligibility check workflow",
@@ -247,11 +249,8 @@ async def get_workflow_history(
     if status:
         executions = [e for e in executions if e.status == status]
     
-    # Sort by started_at descending
-    executions.sort(key=lambda x: x.started_at, reverse=True)
-    
-    # Limit results
-    return executions[:limit]
+    # Most recent first; partial selection instead of sorting everything
+    return heapq.nlargest(limit, executions, key=lambda x: x.started_at)
 
 
 @router.delete("/clear-history")
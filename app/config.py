@@ -66,11 +66,17 @@ class Settings(BaseSettings):
     NEBULA_PASSWORD: str = "nebula"
     NEBULA_SPACE: str = "finsight"
     NEBULA_POOL_SIZE: int = 10
+    NEBULA_MAX_CONCURRENT_QUERIES: int = 32
+    COVERAGE_CACHE_TTL_SECONDS: int = 60
+    COVERAGE_CACHE_MAX_ENTRIES: int = 50000
+    COVERAGE_PATH_CACHE_TTL_SECONDS: int = 300
+    COVERAGE_PATH_CACHE_MAX_ENTRIES: int = 10000
 
     # Weaviate
     WEAVIATE_URL: str = "http://localhost:8080"
     WEAVIATE_API_KEY: str = ""
     WEAVIATE_TIMEOUT: int = 120
+    WEAVIATE_CHUNK_VECTOR_PQ: bool = False  # Product-quantize chunk vectors in the index
 
     # MinIO/S3
     S3_ENDPOINT: str = "http://localhost:9000"
@@ -79,12 +85,21 @@ class Settings(BaseSettings):
     S3_BUCKET: str = "finsight-documents"
     S3_REGION: str = "us-east-1"
     S3_USE_SSL: bool = False
+    S3_MULTIPART_THRESHOLD_MB: int = 8
+    S3_MULTIPART_CHUNKSIZE_MB: int = 8
+    S3_MAX_CONCURRENCY: int = 10
+    S3_MAX_POOL_CONNECTIONS: int = 100
+    S3_IO_WORKERS: int = 32
+    S3_ASYNC_CLIENT: bool = False  # Needs aioboto3
+    PRESIGNED_URL_CACHE_TTL_SECONDS: int = 300
+    PRESIGNED_URL_CACHE_MAX_ENTRIES: int = 10000
 
     # Redis
     REDIS_HOST: str = "localhost"
     REDIS_PORT: int = 6379
     REDIS_DB: int = 0
     REDIS_PASSWORD: str = ""
+    REDIS_MAX_CONNECTIONS: int = 256
 
     # OpenAI
     OPENAI_API_KEY: str
@@ -92,12 +107,35 @@ class Settings(BaseSettings):
     OPENAI_EMBEDDING_MODEL: str = "text-embedding-3-large"
     OPENAI_MAX_TOKENS: int = 4096
     OPENAI_TEMPERATURE: float = 0.1
+    EMBEDDING_CACHE_MAX_ENTRIES: int = 10000
+    EMBEDDING_DISK_CACHE_PATH: Optional[str] = None  # e.g. ./cache/embeddings.sqlite
+    EMBEDDING_MAX_CONCURRENCY: int = 16
+    EXTRACTION_MAX_CONCURRENCY: int = 32
+
+    # Semantic Cache
+    SEMANTIC_CACHE_THRESHOLD: float = 0.95
+    SEMANTIC_CACHE_TTL_SECONDS: int = 300
+    SEMANTIC_CACHE_MAX_ENTRIES: int = 1024
+
+    # Workflow node result cache
+    WORKFLOW_NODE_CACHE_ENABLED: bool = True
+    WORKFLOW_NODE_CACHE_TTL_SECONDS: int = 3600
+    WORKFLOW_NODE_CACHE_MAX_ENTRIES: int = 1024
 
     # OCR
     TESSERACT_PATH: str = "tesseract"
     TESSERACT_LANG: str = "eng"
     PADDLEOCR_LANG: str = "en"
     PADDLEOCR_USE_GPU: bool = False
+    PADDLEOCR_PRECISION: str = "fp32"  # fp16/int8 via TensorRT on GPU
+    PADDLEOCR_DET_MODEL_DIR: Optional[str] = None  # e.g. a *_slim_quant_infer model
+    PADDLEOCR_REC_MODEL_DIR: Optional[str] = None
+    PADDLEOCR_REC_BATCH_NUM: int = 32  # Text lines per recognition forward pass
+    OCR_STRONG_DENOISE: bool = False
+    OCR_USE_GPU: bool = False  # Needs an OpenCV build with CUDA
+    OCR_PROCESS_WORKERS: int = 0  # 0 = one per CPU
+    OCR_DPI: int = 300
+    OCR_PDF_PAGE_CHUNK: int = 4
 
     # Document Processing
     MAX_FILE_SIZE_MB: int = 50
@@ -105,10 +143,19 @@ class Settings(BaseSettings):
     CHUNK_OVERLAP: int = 100
     MIN_CHUNK_SIZE: int = 100
 
+    # Response compression
+    GZIP_MINIMUM_SIZE: int = 256
+
     # Rate Limiting
     RATE_LIMIT_PER_MINUTE: int = 60
     RATE_LIMIT_BURST: int = 10
 
+    # API request logging
+    API_LOG_ENABLED: bool = True
+    API_LOG_BATCH_SIZE: int = 1024
+    API_LOG_FLUSH_INTERVAL_MS: int = 50
+    API_LOG_QUEUE_SIZE: int = 10000
+
     # Observability
     LANGSMITH_API_KEY: str = ""
     LANGSMITH_PROJECT: str = "finsight-ai"
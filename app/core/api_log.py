@@ -0,0 +1,165 @@
+"""Batched API request log writer."""
+
+import asyncio
+import uuid
+from datetime import datetime, timezone
+from typing import Any, List, Optional, Tuple
+
+import orjson
+
+from app.config import settings
+from app.db.postgres import engine
+from app.utils.ids import uuid7
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+API_LOG_COLUMNS = (
+    "log_id",
+    "user_id",
+    "endpoint",
+    "method",
+    "request_body",
+    "response_status",
+    "response_body",
+    "latency_ms",
+    "timestamp",
+    "correlation_id",
+)
+
+
+class APILogWriter:
+    """
+    Buffer API log rows and write them to Postgres in batches.
+
+    Rows are queued without blocking the request and a background task
+    flushes them with COPY once batch_size rows are waiting or the flush
+    interval passes. Rows still queued when the process dies are lost;
+    the queue is bounded and drops rows when full rather than applying
+    backpressure to requests.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = 1024,
+        flush_interval_ms: float = 50.0,
+        max_queue_size: int = 10000,
+    ):
+        """
+        Initialize API log writer.
+
+        Args:
+            batch_size: Maximum rows per COPY
+            flush_interval_ms: Maximum time a row waits before being flushed
+            max_queue_size: Maximum buffered rows
+        """
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_queue_size = max_queue_size
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self.dropped = 0
+
+    async def start(self) -> None:
+        """Start the background flush task."""
+        if self._worker is not None:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._worker = asyncio.create_task(self._run(), name="api-log-writer")
+        logger.info("API log writer started", batch_size=self.batch_size)
+
+    async def stop(self) -> None:
+        """Stop the flush task and write any remaining rows."""
+        if self._worker is None:
+            return
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+
+        remaining = []
+        while not self._queue.empty():
+            remaining.append(self._queue.get_nowait())
+        if remaining:
+            await self._flush(remaining)
+        logger.info("API log writer stopped", dropped=self.dropped)
+
+    def enqueue(
+        self,
+        endpoint: str,
+        method: str,
+        response_status: int,
+        latency_ms: int,
+        correlation_id: str,
+        user_id: Optional[str] = None,
+        request_body: Any = None,
+        response_body: Any = None,
+    ) -> None:
+        """Queue a log row without waiting."""
+        if self._queue is None:
+            return
+
+        row = (
+            uuid7(),
+            uuid.UUID(user_id) if user_id else None,
+            endpoint[:255],
+            method,
+            orjson.dumps(request_body).decode() if request_body is not None else None,
+            response_status,
+            orjson.dumps(response_body).decode() if response_body is not None else None,
+            latency_ms,
+            datetime.now(timezone.utc),
+            uuid.UUID(correlation_id),
+        )
+        try:
+            self._queue.put_nowait(row)
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    async def _run(self) -> None:
+        """Collect rows into batches and flush them."""
+        loop = asyncio.get_running_loop()
+
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.flush_interval
+
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            await self._flush(batch)
+
+    async def _flush(self, batch: List[Tuple[Any, ...]]) -> None:
+        """Write a batch of rows with COPY."""
+        try:
+            async with engine.connect() as conn:
+                raw = await conn.get_raw_connection()
+                await raw.driver_connection.copy_records_to_table(
+                    "api_logs",
+                    records=batch,
+                    columns=API_LOG_COLUMNS,
+                )
+        except Exception as e:
+            logger.error(
+                "Failed to write API logs",
+                rows=len(batch),
+                error=str(e),
+                exc_info=True
+            )
+
+
+# Global writer instance
+api_log_writer = APILogWriter(
+    batch_size=settings.API_LOG_BATCH_SIZE,
+    flush_interval_ms=settings.API_LOG_FLUSH_INTERVAL_MS,
+    max_queue_size=settings.API_LOG_QUEUE_SIZE,
+)
@@ -1,7 +1,6 @@
 """Custom middleware for FastAPI."""
 
 import time
-import uuid
 from typing import Callable
 
 from fastapi import Request, Response
@@ -9,6 +8,9 @@ from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.types import ASGIApp
 
 from app.config import settings
+from app.core.api_log import api_log_writer
+from app.db.redis import redis_client
+from app.utils.ids import new_id
 from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -20,7 +22,7 @@ class LoggingMiddleware(BaseHTTPMiddleware):
     async def dispatch(self, request: Request, call_next: Callable) -> Response:
         """Process request and log."""
         # Generate correlation ID
-        correlation_id = str(uuid.uuid4())
+        correlation_id = new_id()
         request.state.correlation_id = correlation_id
 
         # Log request
@@ -51,6 +53,16 @@ class LoggingMiddleware(BaseHTTPMiddleware):
                 correlation_id=correlation_id,
             )
             
+            # Persist request log (batched, off the request path)
+            if settings.API_LOG_ENABLED:
+                api_log_writer.enqueue(
+                    endpoint=request.url.path,
+                    method=request.method,
+                    response_status=response.status_code,
+                    latency_ms=duration_ms,
+                    correlation_id=correlation_id,
+                )
+            
             # Add correlation ID to response headers
             response.headers["X-Correlation-ID"] = correlation_id
             response.headers["X-Response-Time"] = str(duration_ms)
@@ -73,7 +85,13 @@ class LoggingMiddleware(BaseHTTPMiddleware):
 
 
 class RateLimitMiddleware(BaseHTTPMiddleware):
-    """Simple in-memory rate limiting middleware."""
+    """
+    Fixed-window rate limiting middleware.
+
+    Counts are kept in Redis when the shared client is connected (one
+    EVALSHA round trip per request) and fall back to in-memory tracking
+    otherwise.
+    """
 
     def __init__(self, app: ASGIApp):
         """Initialize rate limiter."""
@@ -93,6 +111,19 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
         # TODO: Extract user ID from JWT token
         
         current_time = time.time()
+
+        # Shared counter in Redis
+        if redis_client.client is not None:
+            window = int(current_time // 60)
+            try:
+                count = await redis_client.incr_window(
+                    f"ratelimit:{client_id}:{window}", 60_000
+                )
+            except Exception as e:
+                logger.warning("rate_limit_redis_failed", error=str(e))
+            else:
+                return await self._respond(request, call_next, client_id, count)
+
         window_start = current_time - 60  # 1-minute window
 
         # Clean old requests
@@ -131,3 +162,29 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
         response.headers["X-RateLimit-Remaining"] = str(max(0, remaining))
         
         return response
+
+    async def _respond(
+        self, request: Request, call_next: Callable, client_id: str, count: int
+    ) -> Response:
+        """Apply the limit for a request counted in Redis."""
+        if count > settings.RATE_LIMIT_PER_MINUTE:
+            logger.warning(
+                "rate_limit_exceeded",
+                client_id=client_id,
+                path=request.url.path,
+                requests_in_window=count,
+            )
+            
+            return Response(
+                content='{"detail": "Rate limit exceeded"}',
+                status_code=429,
+                media_type="application/json",
+            )
+
+        response = await call_next(request)
+        
+        remaining = settings.RATE_LIMIT_PER_MINUTE - count
+        response.headers["X-RateLimit-Limit"] = str(settings.RATE_LIMIT_PER_MINUTE)
+        response.headers["X-RateLimit-Remaining"] = str(max(0, remaining))
+        
+        return response
@@ -1,7 +1,12 @@
 """Security and authentication utilities."""
 
+import hashlib
+import secrets
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
@@ -14,13 +19,55 @@ from app.models.schemas import TokenData
 # Password hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# Resolve the bcrypt backend at import so the first login doesn't pay for it
+try:
+    pwd_context.hash("warmup")
+except Exception:
+    pass
+
+# Short-lived cache of successful password verifications.
+# Only positive results are cached, keyed on the stored hash and a digest of
+# the plaintext, so repeated logins within a few seconds skip bcrypt.
+# The digest is keyed with a per-process secret, so cache entries read from
+# memory cannot be brute-forced faster than the bcrypt hashes beside them.
+_VERIFY_CACHE_KEY = secrets.token_bytes(32)
+_VERIFY_CACHE_TTL_SECONDS = 5.0
+_VERIFY_CACHE_MAX_ENTRIES = 1024
+_VERIFY_CACHE: "OrderedDict[Tuple[str, bytes], float]" = OrderedDict()
+_VERIFY_CACHE_LOCK = threading.Lock()
+
 # OAuth2 scheme
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_PREFIX}/auth/login")
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against a hash."""
-    return pwd_context.verify(plain_password, hashed_password)
+    key = (
+        hashed_password,
+        hashlib.blake2b(
+            plain_password.encode("utf-8"), key=_VERIFY_CACHE_KEY, digest_size=16
+        ).digest(),
+    )
+    now = time.monotonic()
+    
+    with _VERIFY_CACHE_LOCK:
+        verified_at = _VERIFY_CACHE.get(key)
+        if verified_at is not None:
+            if now - verified_at < _VERIFY_CACHE_TTL_SECONDS:
+                _VERIFY_CACHE.move_to_end(key)
+                return True
+            del _VERIFY_CACHE[key]
+    
+    if not pwd_context.verify(plain_password, hashed_password):
+        return False
+    
+    with _VERIFY_CACHE_LOCK:
+        _VERIFY_CACHE[key] = now
+        _VERIFY_CACHE.move_to_end(key)
+        if len(_VERIFY_CACHE) > _VERIFY_CACHE_MAX_ENTRIES:
+            _VERIFY_CACHE.popitem(last=False)
+    
+    return True
 
 
 def get_password_hash(password: str) -> str:
@@ -30,8 +77,6 @@ def get_password_hash(password: str) -> str:
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token."""
-    to_encode = data.copy()
-    
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
     else:
@@ -39,7 +84,7 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
             minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
         )
     
-    to_encode.update({"exp": expire})
+    to_encode = {**data, "exp": expire}
     encoded_jwt = jwt.encode(
         to_encode,
         settings.SECRET_KEY,
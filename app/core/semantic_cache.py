@@ -0,0 +1,178 @@
+"""In-process semantic cache keyed by query embeddings."""
+
+import hashlib
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from app.config import settings
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class SemanticCache:
+    """
+    Cache of responses keyed by query embedding.
+
+    A lookup returns a stored response when a previous query with the same
+    scope has cosine similarity at or above the threshold. The scope (filters,
+    limits, caller) is hashed and must match exactly, so near-duplicate
+    queries never return results computed for a different filter set.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.95,
+        max_entries: int = 1024,
+        ttl_seconds: float = 300.0,
+    ):
+        """
+        Initialize semantic cache.
+
+        Args:
+            threshold: Minimum cosine similarity for a hit
+            max_entries: Maximum cached entries (oldest evicted first)
+            ttl_seconds: Lifetime of a cached entry
+        """
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+
+        self._vectors: Optional[np.ndarray] = None
+        self._scopes: List[bytes] = []
+        self._expires: List[float] = []
+        self._responses: List[Any] = []
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def scope_key(**scope: Any) -> bytes:
+        """Hash the exact-match part of a cache key."""
+        raw = repr(sorted(scope.items())).encode("utf-8")
+        return hashlib.blake2b(raw, digest_size=16).digest()
+
+    @staticmethod
+    def _normalize(embedding: Sequence[float]) -> Optional[np.ndarray]:
+        """Return a unit-length float32 copy of the embedding."""
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        if norm == 0:
+            return None
+        return vector / norm
+
+    def lookup(self, embedding: Sequence[float], scope: bytes) -> Optional[Any]:
+        """
+        Find a cached response for a semantically similar query.
+
+        Args:
+            embedding: Query embedding
+            scope: Value from scope_key() for the request
+
+        Returns:
+            Cached response or None on miss
+        """
+        vector = self._normalize(embedding)
+        if vector is None:
+            return None
+
+        with self._lock:
+            if self._vectors is None or not self._responses:
+                return None
+
+            now = time.monotonic()
+            similarities = self._vectors @ vector
+            # Only entries above the threshold can match; order just those
+            above = np.flatnonzero(similarities >= self.threshold)
+            for index in above[np.argsort(-similarities[above])]:
+                if self._scopes[index] == scope and self._expires[index] > now:
+                    return self._responses[index]
+
+        return None
+
+    def store(self, embedding: Sequence[float], scope: bytes, response: Any) -> None:
+        """
+        Store a response for a query embedding.
+
+        Args:
+            embedding: Query embedding
+            scope: Value from scope_key() for the request
+            response: Response to cache
+        """
+        vector = self._normalize(embedding)
+        if vector is None:
+            return
+
+        with self._lock:
+            self._evict_expired()
+
+            if self._vectors is None or self._vectors.shape[1] != vector.shape[0]:
+                self._vectors = vector[np.newaxis, :]
+                self._scopes, self._expires, self._responses = [], [], []
+            else:
+                self._vectors = np.vstack([self._vectors, vector])
+
+            self._scopes.append(scope)
+            self._expires.append(time.monotonic() + self.ttl_seconds)
+            self._responses.append(response)
+
+            overflow = len(self._responses) - self.max_entries
+            if overflow > 0:
+                self._drop(slice(0, overflow))
+
+    def clear(self) -> None:
+        """Drop all cached entries."""
+        with self._lock:
+            self._vectors = None
+            self._scopes, self._expires, self._responses = [], [], []
+
+    def _evict_expired(self) -> None:
+        """Remove expired entries. Caller must hold the lock."""
+        now = time.monotonic()
+        live = [i for i, expires in enumerate(self._expires) if expires > now]
+        if len(live) == len(self._expires):
+            return
+
+        if not live:
+            self._vectors = None
+            self._scopes, self._expires, self._responses = [], [], []
+            return
+
+        self._vectors = self._vectors[live]
+        self._scopes = [self._scopes[i] for i in live]
+        self._expires = [self._expires[i] for i in live]
+        self._responses = [self._responses[i] for i in live]
+
+    def _drop(self, span: slice) -> None:
+        """Remove a contiguous span of entries. Caller must hold the lock."""
+        self._vectors = np.delete(self._vectors, span, axis=0)
+        del self._scopes[span]
+        del self._expires[span]
+        del self._responses[span]
+
+
+# Named cache instances
+_semantic_caches: Dict[str, SemanticCache] = {}
+
+
+def get_semantic_cache(name: str) -> SemanticCache:
+    """
+    Get or create a named semantic cache.
+
+    Args:
+        name: Cache name (one per call site)
+
+    Returns:
+        SemanticCache instance
+    """
+    cache = _semantic_caches.get(name)
+    if cache is None:
+        cache = SemanticCache(
+            threshold=settings.SEMANTIC_CACHE_THRESHOLD,
+            max_entries=settings.SEMANTIC_CACHE_MAX_ENTRIES,
+            ttl_seconds=settings.SEMANTIC_CACHE_TTL_SECONDS,
+        )
+        _semantic_caches[name] = cache
+        logger.info("Semantic cache created", name=name, threshold=cache.threshold)
+    return cache
@@ -2,6 +2,7 @@
 
 from app.db.nebula import get_nebula_client, nebula_client
 from app.db.postgres import get_db, init_db
+from app.db.redis import get_redis_client, redis_client
 from app.db.weaviate import get_weaviate_client, weaviate_client
 
 __all__ = [
@@ -9,6 +10,8 @@ __all__ = [
     "init_db",
     "nebula_client",
     "get_nebula_client",
+    "redis_client",
+    "get_redis_client",
     "weaviate_client",
     "get_weaviate_client",
 ]
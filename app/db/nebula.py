@@ -1,18 +1,48 @@
 """NebulaGraph connection pool and query utilities."""
 
+import asyncio
 from contextlib import asynccontextmanager
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
 
-from nebula3.Config import Config
+import orjson
+from nebula3.Config import Config, SessionPoolConfig
 from nebula3.gclient.net import ConnectionPool
 from nebula3.gclient.net.SessionPool import SessionPool
 
 from app.config import settings
 from app.models.graph_schema import QUERIES
+from app.utils.cache import TTLCache
 from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Upper bounds for a single multi-row INSERT statement; large VALUES lists
+# stall the graphd parser, so rows are kept well below its limits
+INSERT_BATCH_MAX_ROWS = 128
+INSERT_BATCH_MAX_BYTES = 1024 * 1024
+
+
+def _quote(value: str) -> str:
+    """Quote a string as a double-quoted literal with JSON escapes."""
+    return orjson.dumps(value).decode()
+
+
+def _quote_json(value: Any) -> str:
+    """Encode a list/dict property as a JSON document in a string literal."""
+    return _quote(orjson.dumps(value, option=orjson.OPT_SERIALIZE_NUMPY).decode())
+
+
+# Property value formatters keyed on exact type
+_FORMATTERS = {
+    str: _quote,
+    bool: lambda v: "true" if v else "false",
+    type(None): lambda v: "NULL",
+    int: str,
+    float: str,
+    dict: _quote_json,
+    list: _quote_json,
+}
+
 
 class NebulaGraphClient:
     """NebulaGraph client wrapper."""
@@ -23,6 +53,12 @@ class NebulaGraphClient:
         self.config.max_connection_pool_size = settings.NEBULA_POOL_SIZE
         self.connection_pool: Optional[ConnectionPool] = None
         self.session_pool: Optional[SessionPool] = None
+        self.coverage_cache: TTLCache = TTLCache(
+            max_entries=settings.COVERAGE_CACHE_MAX_ENTRIES,
+            ttl_seconds=settings.COVERAGE_CACHE_TTL_SECONDS,
+        )
+        # Bounds queries in flight on executor threads
+        self._query_semaphore = asyncio.Semaphore(settings.NEBULA_MAX_CONCURRENT_QUERIES)
 
     async def connect(self) -> None:
         """Initialize connection pool."""
@@ -34,13 +70,22 @@ class NebulaGraphClient:
                 self.config
             )
 
-            # Initialize session pool
+            # Initialize session pool: sessions are authenticated and bound
+            # to the space once, up front, then borrowed per query. Every
+            # query allowed in flight must be able to borrow a session
+            pool_config = SessionPoolConfig()
+            pool_config.min_size = settings.NEBULA_POOL_SIZE
+            pool_config.max_size = max(
+                settings.NEBULA_POOL_SIZE, settings.NEBULA_MAX_CONCURRENT_QUERIES
+            )
             self.session_pool = SessionPool(
                 settings.NEBULA_USER,
                 settings.NEBULA_PASSWORD,
                 settings.NEBULA_SPACE,
                 [(settings.NEBULA_HOST, settings.NEBULA_PORT)]
             )
+            if not self.session_pool.init(pool_config):
+                raise RuntimeError("NebulaGraph session pool initialization failed")
 
             logger.info(
                 "NebulaGraph connection established",
@@ -75,18 +120,82 @@ class NebulaGraphClient:
                         query = query.replace(f"${key}", str(value))
 
             # Execute query
-            result = self.session_pool.execute(query)
-            
-            if not result.is_succeeded():
-                error_msg = result.error_msg()
-                logger.error("NebulaGraph query failed", query=query, error=error_msg)
-                raise RuntimeError(f"Query failed: {error_msg}")
-
-            return result
+            return await self._run(self._execute_sync, query)
+        except Exception as e:
+            logger.error("Error executing NebulaGraph query", error=str(e), exc_info=True)
+            raise
+
+    async def execute_parameterized(self, query: str, params: Dict[str, Any]) -> Any:
+        """
+        Execute a query with server-side parameters.
+
+        Values are sent separately from the statement, so they need no
+        escaping and the query text stays constant across calls.
+
+        Args:
+            query: Statement referencing parameters as $name
+            params: Parameter values as Python types
+
+        Returns:
+            Query result
+        """
+        if not self.session_pool:
+            raise RuntimeError("NebulaGraph connection not initialized")
+
+        try:
+            return await self._run(self._execute_parameterized_sync, query, params)
         except Exception as e:
             logger.error("Error executing NebulaGraph query", error=str(e), exc_info=True)
             raise
 
+    async def execute_concurrently(self, queries: Iterable[str]) -> List[Any]:
+        """
+        Execute independent queries concurrently on pool threads.
+
+        Args:
+            queries: Statements with no ordering dependency between them
+
+        Returns:
+            Result or exception for each query, in input order
+        """
+        if not self.session_pool:
+            raise RuntimeError("NebulaGraph connection not initialized")
+
+        return await asyncio.gather(
+            *(self._run(self._execute_sync, query) for query in queries),
+            return_exceptions=True,
+        )
+
+    async def _run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run a blocking pool call on a thread, bounded by the query semaphore."""
+        async with self._query_semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(None, func, *args)
+
+    def _execute_sync(self, query: str) -> Any:
+        """Run a query on the session pool and check the result."""
+        result = self.session_pool.execute(query)
+        
+        if not result.is_succeeded():
+            error_msg = result.error_msg()
+            logger.error("NebulaGraph query failed", query=query, error=error_msg)
+            raise RuntimeError(f"Query failed: {error_msg}")
+
+        return result
+
+    def _execute_parameterized_sync(self, query: str, params: Dict[str, Any]) -> Any:
+        """Run a parameterized query on the session pool and check the result."""
+        result = self.session_pool.execute_py(query, params)
+        
+        # A failed statement comes back as an empty result set, which callers
+        # would otherwise read (and cache) as "no rows"
+        if not result.is_succeeded():
+            error_msg = result.error_msg()
+            logger.error("NebulaGraph query failed", query=query, error=error_msg)
+            raise RuntimeError(f"Query failed: {error_msg}")
+
+        return result
+
     async def execute_named_query(
         self, query_name: str, params: Optional[Dict[str, Any]] = None
     ) -> Any:
@@ -97,15 +206,65 @@ class NebulaGraphClient:
         query = QUERIES[query_name]
         return await self.execute(query, params)
 
+    async def check_procedure_coverage(self, user_id: str, cpt_code: str) -> Any:
+        """
+        Check whether a user's policies cover a procedure.
+
+        Results are cached per (user_id, cpt_code) for a short TTL since
+        eligibility lookups within a session repeat the same pair.
+
+        Args:
+            user_id: User identifier
+            cpt_code: CPT procedure code
+
+        Returns:
+            Query result
+        """
+        key = (user_id, cpt_code)
+        result = self.coverage_cache.get(key)
+        if result is None:
+            result = await self.execute_named_query(
+                "check_procedure_coverage",
+                {"user_id": user_id, "cpt_code": cpt_code},
+            )
+            self.coverage_cache.set(key, result)
+        return result
+
     async def insert_node(
         self, tag: str, vid: str, properties: Dict[str, Any]
     ) -> None:
         """Insert a node."""
-        props_str = ", ".join(
-            f"{k}: {self._format_value(v)}" for k, v in properties.items()
+        await self.insert_nodes(tag, [(vid, properties)])
+
+    async def insert_nodes(
+        self, tag: str, rows: List[Tuple[str, Dict[str, Any]]]
+    ) -> int:
+        """
+        Insert many nodes of one tag with multi-row INSERT statements.
+
+        Property keys are taken from the first row; every row is expected
+        to carry the same keys.
+
+        Args:
+            tag: Vertex tag
+            rows: List of (vid, properties) tuples
+
+        Returns:
+            Number of nodes inserted
+        """
+        if not rows:
+            return 0
+
+        keys = list(rows[0][1])
+        # IDs come from extracted entity names, so they are escaped like
+        # property strings; a stray quote would break the whole batch
+        header = f"INSERT VERTEX {tag} ({', '.join(keys)}) VALUES "
+        values = (
+            f'{_quote(vid)}:({", ".join(self._format_value(props.get(k)) for k in keys)})'
+            for vid, props in rows
         )
-        query = f'INSERT VERTEX {tag} ({props_str}) VALUES "{vid}":({props_str});'
-        await self.execute(query)
+        await self._execute_batched(header, values)
+        return len(rows)
 
     async def insert_edge(
         self,
@@ -115,24 +274,78 @@ class NebulaGraphClient:
         properties: Optional[Dict[str, Any]] = None,
     ) -> None:
         """Insert an edge."""
-        if properties:
-            props_str = ", ".join(
-                f"{k}: {self._format_value(v)}" for k, v in properties.items()
-            )
-            query = f'INSERT EDGE {edge_type} ({props_str}) VALUES "{src_vid}"->"{dst_vid}":({props_str});'
-        else:
-            query = f'INSERT EDGE {edge_type} () VALUES "{src_vid}"->"{dst_vid}":();'
-        
-        await self.execute(query)
+        await self.insert_edges(edge_type, [(src_vid, dst_vid, properties or {})])
+
+    async def insert_edges(
+        self, edge_type: str, rows: List[Tuple[str, str, Dict[str, Any]]]
+    ) -> int:
+        """
+        Insert many edges of one type with multi-row INSERT statements.
+
+        Property keys are taken from the first row; every row is expected
+        to carry the same keys.
+
+        Args:
+            edge_type: Edge type
+            rows: List of (src_vid, dst_vid, properties) tuples
+
+        Returns:
+            Number of edges inserted
+        """
+        if not rows:
+            return 0
+
+        keys = list(rows[0][2])
+        header = f"INSERT EDGE {edge_type} ({', '.join(keys)}) VALUES "
+        values = (
+            f'{_quote(src)}->{_quote(dst)}:({", ".join(self._format_value(props.get(k)) for k in keys)})'
+            for src, dst, props in rows
+        )
+        await self._execute_batched(header, values)
+        return len(rows)
+
+    async def _execute_batched(self, header: str, values: Iterable[str]) -> None:
+        """
+        Execute an INSERT, splitting VALUES by row count and statement size.
+
+        The resulting statements are independent, so they are pipelined
+        rather than awaited one round-trip at a time.
+        """
+        statements: List[str] = []
+        batch: List[str] = []
+        size = len(header)
+
+        for value in values:
+            if batch and (
+                len(batch) >= INSERT_BATCH_MAX_ROWS
+                or size + len(value) > INSERT_BATCH_MAX_BYTES
+            ):
+                statements.append(header + ", ".join(batch) + ";")
+                batch = []
+                size = len(header)
+            batch.append(value)
+            size += len(value) + 2
+
+        if batch:
+            statements.append(header + ", ".join(batch) + ";")
+
+        await asyncio.gather(*(self.execute(statement) for statement in statements))
 
     def _format_value(self, value: Any) -> str:
         """Format value for NebulaGraph query."""
+        formatter = _FORMATTERS.get(type(value))
+        if formatter is not None:
+            return formatter(value)
+
+        # Subclasses (e.g. str-based enums) take the slower isinstance path
         if isinstance(value, str):
-            return f'"{value}"'
+            return _quote(value)
         elif isinstance(value, bool):
             return "true" if value else "false"
         elif value is None:
             return "NULL"
+        elif isinstance(value, (dict, list, tuple)):
+            return _quote_json(value)
         else:
             return str(value)
 
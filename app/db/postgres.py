@@ -2,6 +2,7 @@
 
 from typing import AsyncGenerator
 
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.pool import NullPool
 
@@ -11,6 +12,54 @@ from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Idempotent upgrades for tables created before a column/index was added.
+# create_all only creates missing tables, so existing ones are patched here.
+SCHEMA_UPGRADES = (
+    "ALTER TABLE documents ADD COLUMN IF NOT EXISTS cpt_code VARCHAR(16)",
+    "ALTER TABLE documents ADD COLUMN IF NOT EXISTS icd10_code VARCHAR(16)",
+    "CREATE INDEX IF NOT EXISTS ix_documents_cpt_code ON documents (cpt_code)",
+    "CREATE INDEX IF NOT EXISTS ix_documents_icd10_code ON documents (icd10_code)",
+    "CREATE INDEX IF NOT EXISTS ix_doc_entities_gin "
+    "ON documents USING GIN (extracted_entities jsonb_path_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_doc_medical_codes_gin "
+    "ON documents USING GIN (medical_codes jsonb_path_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_processing_jobs_status ON processing_jobs (status)",
+    # confidence_score moved from INTEGER (0-10000) to SMALLINT (0-1000)
+    """
+    DO $$
+    BEGIN
+        IF EXISTS (
+            SELECT 1 FROM information_schema.columns
+            WHERE table_name = 'eligibility_checks'
+              AND column_name = 'confidence_score'
+              AND data_type = 'integer'
+        ) THEN
+            ALTER TABLE eligibility_checks
+                ALTER COLUMN confidence_score TYPE SMALLINT
+                USING (confidence_score / 10);
+        END IF;
+    END $$
+    """,
+    # TOAST-compress JSONB blobs with lz4 instead of pglz (Postgres 14+).
+    # Only affects newly written values; skipped on servers without lz4.
+    """
+    DO $$
+    BEGIN
+        IF current_setting('server_version_num')::int >= 140000 THEN
+            ALTER TABLE documents ALTER COLUMN document_metadata SET COMPRESSION lz4;
+            ALTER TABLE documents ALTER COLUMN extracted_entities SET COMPRESSION lz4;
+            ALTER TABLE documents ALTER COLUMN medical_codes SET COMPRESSION lz4;
+            ALTER TABLE api_logs ALTER COLUMN request_body SET COMPRESSION lz4;
+            ALTER TABLE api_logs ALTER COLUMN response_body SET COMPRESSION lz4;
+            ALTER TABLE processing_jobs ALTER COLUMN result SET COMPRESSION lz4;
+            ALTER TABLE eligibility_checks ALTER COLUMN explanation SET COMPRESSION lz4;
+        END IF;
+    EXCEPTION
+        WHEN feature_not_supported THEN NULL;
+    END $$
+    """,
+)
+
 # Create async engine
 engine = create_async_engine(
     settings.database_url,
@@ -48,6 +97,10 @@ async def init_db() -> None:
         async with engine.begin() as conn:
             # Create all tables
             await conn.run_sync(Base.metadata.create_all)
+            
+            # Bring existing tables up to date
+            for statement in SCHEMA_UPGRADES:
+                await conn.execute(text(statement))
         logger.info("Database initialized successfully")
     except Exception as e:
         logger.error("Failed to initialize database", error=str(e), exc_info=True)
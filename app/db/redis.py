@@ -0,0 +1,91 @@
+"""Redis connection pool and rate-limit script."""
+
+from typing import Optional
+
+from redis.asyncio import BlockingConnectionPool, Redis
+from redis.commands.core import AsyncScript
+
+from app.config import settings
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Fixed-window counter: INCR and set the expiry on the first hit, in one round trip
+RATE_LIMIT_SCRIPT = """
+local n = redis.call('INCR', KEYS[1])
+if n == 1 then
+    redis.call('PEXPIRE', KEYS[1], ARGV[1])
+end
+return n
+"""
+
+
+class RedisClient:
+    """Redis client wrapper."""
+
+    def __init__(self):
+        """Initialize Redis client."""
+        self.pool: Optional[BlockingConnectionPool] = None
+        self.client: Optional[Redis] = None
+        self.rate_limit_script: Optional[AsyncScript] = None
+
+    async def connect(self) -> None:
+        """Create the connection pool and load scripts."""
+        try:
+            self.pool = BlockingConnectionPool(
+                host=settings.REDIS_HOST,
+                port=settings.REDIS_PORT,
+                db=settings.REDIS_DB,
+                password=settings.REDIS_PASSWORD or None,
+                max_connections=settings.REDIS_MAX_CONNECTIONS,
+            )
+            self.client = Redis(connection_pool=self.pool)
+
+            # register_script calls EVALSHA and falls back to EVAL on NOSCRIPT;
+            # loading it up front keeps the first request on the EVALSHA path
+            self.rate_limit_script = self.client.register_script(RATE_LIMIT_SCRIPT)
+            await self.client.script_load(RATE_LIMIT_SCRIPT)
+
+            logger.info(
+                "Redis connection pool created",
+                host=settings.REDIS_HOST,
+                port=settings.REDIS_PORT,
+            )
+        except Exception as e:
+            logger.error("Failed to connect to Redis", error=str(e), exc_info=True)
+            raise
+
+    async def close(self) -> None:
+        """Close Redis connections."""
+        if self.client:
+            await self.client.aclose()
+        if self.pool:
+            await self.pool.disconnect()
+        self.client = None
+        self.pool = None
+        self.rate_limit_script = None
+        logger.info("Redis connection pool closed")
+
+    async def incr_window(self, key: str, window_ms: int) -> int:
+        """
+        Increment a fixed-window counter.
+
+        Args:
+            key: Counter key
+            window_ms: Window length in milliseconds
+
+        Returns:
+            Counter value after the increment
+        """
+        return int(await self.rate_limit_script(keys=[key], args=[window_ms]))
+
+
+# Global client instance
+redis_client = RedisClient()
+
+
+async def get_redis_client() -> RedisClient:
+    """Get Redis client instance."""
+    if not redis_client.client:
+        await redis_client.connect()
+    return redis_client
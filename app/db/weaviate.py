@@ -4,13 +4,20 @@ from typing import Any, Dict, List, Optional
 
 import weaviate
 from weaviate.classes.config import Configure, DataType, Property
-from weaviate.classes.query import MetadataQuery
+from weaviate.classes.data import DataObject
+from weaviate.classes.query import Filter, MetadataQuery
 
 from app.config import settings
 from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Objects per batch insert request
+CHUNK_INSERT_BATCH_SIZE = 100
+
+# Document IDs per batch delete request
+DOCUMENT_DELETE_BATCH_SIZE = 100
+
 
 class WeaviateClient:
     """Weaviate client wrapper."""
@@ -18,6 +25,17 @@ class WeaviateClient:
     def __init__(self):
         """Initialize Weaviate client."""
         self.client: Optional[weaviate.WeaviateClient] = None
+        self.doc_chunks = None
+        self.policy_clauses = None
+        self.claims = None
+        self.invoice_items = None
+
+    def _cache_collections(self) -> None:
+        """Cache collection handles so request paths skip the lookup."""
+        self.doc_chunks = self.client.collections.get("DocumentChunk")
+        self.policy_clauses = self.client.collections.get("PolicyClause")
+        self.claims = self.client.collections.get("ClaimRecord")
+        self.invoice_items = self.client.collections.get("InvoiceLineItem")
 
     async def connect(self) -> None:
         """Connect to Weaviate."""
@@ -41,6 +59,7 @@ class WeaviateClient:
 
             # Test connection
             if self.client.is_ready():
+                self._cache_collections()
                 logger.info("Weaviate connection established", url=settings.WEAVIATE_URL)
             else:
                 raise RuntimeError("Weaviate is not ready")
@@ -53,8 +72,25 @@ class WeaviateClient:
         """Close Weaviate connection."""
         if self.client:
             self.client.close()
+        self.doc_chunks = self.policy_clauses = self.claims = self.invoice_items = None
         logger.info("Weaviate connection closed")
 
+    @staticmethod
+    def _chunk_vector_index_config() -> Any:
+        """
+        HNSW index config for DocumentChunk.
+        
+        Chunks are by far the largest collection. With product quantization
+        the index keeps about one byte per vector segment in memory instead
+        of four bytes per dimension, rescoring candidates from the full
+        vectors on disk.
+        """
+        if not settings.WEAVIATE_CHUNK_VECTOR_PQ:
+            return None
+        return Configure.VectorIndex.hnsw(
+            quantizer=Configure.VectorIndex.Quantizer.pq()
+        )
+
     async def create_schema(self) -> None:
         """Create Weaviate schema."""
         try:
@@ -66,6 +102,7 @@ class WeaviateClient:
                     vectorizer_config=Configure.Vectorizer.text2vec_openai(
                         model="text-embedding-3-large"
                     ),
+                    vector_index_config=self._chunk_vector_index_config(),
                     properties=[
                         Property(name="content", data_type=DataType.TEXT),
                         Property(name="document_id", data_type=DataType.TEXT),
@@ -134,6 +171,8 @@ class WeaviateClient:
                 )
                 logger.info("Created InvoiceLineItem collection")
 
+            self._cache_collections()
+
         except Exception as e:
             logger.error("Failed to create Weaviate schema", error=str(e), exc_info=True)
             raise
@@ -147,7 +186,7 @@ class WeaviateClient:
         metadata: Optional[Dict[str, Any]] = None,
     ) -> str:
         """Add a document chunk."""
-        collection = self.client.collections.get("DocumentChunk")
+        collection = self.doc_chunks
         
         data_object = {
             "content": content,
@@ -160,6 +199,71 @@ class WeaviateClient:
         result = collection.data.insert(data_object)
         return str(result)
 
+    async def create_chunks_batch(
+        self,
+        objects: List[Dict[str, Any]],
+        batch_size: int = CHUNK_INSERT_BATCH_SIZE,
+    ) -> List[str]:
+        """
+        Insert document chunks with precomputed vectors in batch requests.
+        
+        Args:
+            objects: Dicts with "properties" and "vector" keys
+            batch_size: Objects per insert request
+            
+        Returns:
+            UUIDs of the inserted objects, in input order
+        """
+        collection = self.doc_chunks
+        
+        uuids: List[str] = []
+        for start in range(0, len(objects), batch_size):
+            batch = objects[start:start + batch_size]
+            result = collection.data.insert_many([
+                DataObject(properties=obj["properties"], vector=obj["vector"])
+                for obj in batch
+            ])
+            if result.has_errors:
+                index, error = next(iter(result.errors.items()))
+                raise RuntimeError(
+                    f"Failed to insert chunk {start + index}: {error.message}"
+                )
+            # uuids is keyed by position within the batch
+            uuids.extend(str(result.uuids[i]) for i in range(len(batch)))
+        
+        return uuids
+
+    async def delete_documents(
+        self,
+        document_ids: List[str],
+        batch_size: int = DOCUMENT_DELETE_BATCH_SIZE,
+    ) -> int:
+        """
+        Delete the chunks of several documents with batch delete requests.
+        
+        Args:
+            document_ids: Document IDs whose chunks to delete
+            batch_size: Document IDs per delete request
+            
+        Returns:
+            Number of chunk objects deleted
+        """
+        collection = self.doc_chunks
+        
+        deleted = 0
+        for start in range(0, len(document_ids), batch_size):
+            batch = document_ids[start:start + batch_size]
+            result = collection.data.delete_many(
+                where=Filter.by_property("document_id").contains_any(batch)
+            )
+            if result.failed:
+                raise RuntimeError(
+                    f"Failed to delete {result.failed} of {result.matches} chunks"
+                )
+            deleted += result.successful
+        
+        return deleted
+
     async def search_similar_chunks(
         self,
         query: str,
@@ -167,12 +271,11 @@ class WeaviateClient:
         limit: int = 10,
     ) -> List[Dict[str, Any]]:
         """Search for similar document chunks."""
-        collection = self.client.collections.get("DocumentChunk")
+        collection = self.doc_chunks
         
         # Build filter
         filters = None
         if document_type:
-            from weaviate.classes.query import Filter
             filters = Filter.by_property("document_type").equal(document_type)
         
         # Execute search
@@ -205,7 +308,7 @@ class WeaviateClient:
         **kwargs
     ) -> str:
         """Add a claim record."""
-        collection = self.client.collections.get("ClaimRecord")
+        collection = self.claims
         
         data_object = {
             "claim_summary": claim_summary,
@@ -226,11 +329,10 @@ class WeaviateClient:
         limit: int = 5,
     ) -> List[Dict[str, Any]]:
         """Find similar historical claims."""
-        collection = self.client.collections.get("ClaimRecord")
+        collection = self.claims
         
         filters = None
         if procedure_code:
-            from weaviate.classes.query import Filter
             filters = Filter.by_property("procedure_codes").contains_any([procedure_code])
         
         response = collection.query.near_text(
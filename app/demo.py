@@ -2,12 +2,17 @@
 
 from fastapi import FastAPI, HTTPException, File, UploadFile, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, Response
 from pydantic import BaseModel
 from typing import Optional, List
 from datetime import datetime
 import uvicorn
+import asyncio
+import msgspec
 import os
-import uuid
+
+from app.utils.ids import new_id
 
 app = FastAPI(
     title="FinSightAI - Demo Mode",
@@ -15,6 +20,7 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
 )
 
 # CORS
@@ -26,8 +32,20 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress the repetitive mock JSON payloads
+app.add_middleware(GZipMiddleware, minimum_size=256)
+
+_ALLOWED_TYPES = frozenset({
+    "application/pdf",
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "image/jpeg",
+    "image/png",
+    "text/plain",
+})
+
 # Create temp directory for uploads
 UPLOAD_DIR = "temp_uploads"
+UPLOAD_CHUNK_SIZE = 1 << 20
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
 
@@ -54,13 +72,159 @@ class ExtractionResult(BaseModel):
     processing_time: float
 
 
-class WorkflowResult(BaseModel):
+class WorkflowResult(msgspec.Struct, frozen=True):
+    workflow_id: str
+    status: str
+    results: dict
+    processing_time: float
+
+
+class WorkflowResultSchema(BaseModel):
+    """OpenAPI schema for WorkflowResult."""
     workflow_id: str
     status: str
     results: dict
     processing_time: float
 
 
+_ENCODER = msgspec.json.Encoder()
+
+
+def _workflow_response(result: WorkflowResult) -> Response:
+    """Encode a workflow result without going through pydantic."""
+    return Response(content=_ENCODER.encode(result), media_type="application/json")
+
+
+# ============================================================================
+# STATIC MOCK PAYLOADS
+# ============================================================================
+# Built once at import; handlers only add the per-request fields.
+
+_CLASSIFICATION_RESULT = {
+    "type": "medical_claim",
+    "confidence": 0.98
+}
+
+_EXTRACTION_RESULT = {
+    "patient": "Jane Smith (simulated)",
+    "provider": "City Hospital (simulated)",
+    "claim_total": "$12,500 (simulated)"
+}
+
+_ELIGIBILITY_RESULT = {
+    "status": "approved",
+    "coverage": 80,
+    "reason": "Policy active, within coverage limits"
+}
+
+_FRAUD_RESULT = {
+    "risk_level": "low",
+    "score": 0.15,
+    "flags": []
+}
+
+_COMPLIANCE_RESULT = {
+    "status": "compliant",
+    "checks_passed": 8,
+    "checks_total": 8
+}
+
+_ELIGIBILITY_WORKFLOW_RESULTS = {
+    "policy_status": "active",
+    "eligible": True,
+    "coverage_percentage": 80,
+    "deductible_remaining": "$500",
+    "out_of_pocket_max": "$2000 remaining",
+    "benefits_applied": [
+        "Outpatient services",
+        "Diagnostic tests",
+        "Prescription drugs"
+    ],
+    "exclusions_checked": [],
+    "reasoning": "Policy is active and claim falls within covered benefits (simulated)"
+}
+
+_FRAUD_ANALYSIS = {
+    "fraud_score": 0.23,
+    "risk_level": "low",
+    "indicators": [
+        {
+            "type": "billing_pattern",
+            "severity": "low",
+            "description": "Normal billing pattern detected"
+        }
+    ],
+    "recommendations": [
+        "No immediate action required",
+        "Continue standard processing"
+    ],
+    "confidence": 0.92,
+    "note": "Simulated fraud analysis for demonstration"
+}
+
+_SIMILAR_DOCUMENTS = {
+    "results": [
+        {
+            "id": "doc-101",
+            "filename": "similar_claim_1.pdf",
+            "similarity_score": 0.94,
+            "snippet": "Medical claim for outpatient procedure... (simulated)"
+        },
+        {
+            "id": "doc-102",
+            "filename": "similar_claim_2.pdf",
+            "similarity_score": 0.89,
+            "snippet": "Insurance claim with similar diagnosis codes... (simulated)"
+        }
+    ],
+    "total_found": 2,
+    "note": "Mock search results for demonstration"
+}
+
+_GRAPH_RELATIONSHIPS = {
+    "relationships": [
+        {
+            "type": "has_policy",
+            "target": {
+                "type": "Policy",
+                "id": "POL-12345",
+                "status": "active"
+            }
+        },
+        {
+            "type": "submitted_claim",
+            "target": {
+                "type": "Claim",
+                "id": "CLM-67890",
+                "amount": "$5000"
+            }
+        }
+    ],
+    "note": "Mock graph data for demonstration"
+}
+
+_POLICY_ANSWER = {
+    "answer": "Based on your policy, outpatient procedures are covered at 80% after deductible. (simulated answer)",
+    "confidence": 0.91,
+    "sources": [
+        "Policy document section 3.2",
+        "Benefits schedule page 12"
+    ],
+    "note": "Simulated policy analysis for demonstration"
+}
+
+_ELIGIBILITY_CHECK = {
+    "eligible": True,
+    "coverage_percentage": 80,
+    "requirements": [
+        "Valid policy",
+        "Within coverage limits",
+        "No exclusions apply"
+    ],
+    "note": "Simulated eligibility check for demonstration"
+}
+
+
 @app.get("/", tags=["Root"])
 async def root():
     """Root endpoint."""
@@ -137,28 +301,19 @@ async def upload_document(
         Document metadata with simulated processing status
     """
     # Validate file type
-    allowed_types = [
-        "application/pdf",
-        "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-        "image/jpeg",
-        "image/png",
-        "text/plain",
-    ]
-    
-    if file.content_type and file.content_type not in allowed_types:
+    if file.content_type and file.content_type not in _ALLOWED_TYPES:
         # Still allow it but warn
         pass
 
-    # Read and save file
-    content = await file.read()
-    file_size = len(content)
-    
-    # Save to temp directory
-    doc_id = str(uuid.uuid4())
+    # Stream file to temp directory without buffering it in memory
+    doc_id = new_id()
     file_path = os.path.join(UPLOAD_DIR, f"{doc_id}_{file.filename}")
+    file_size = 0
     
     with open(file_path, "wb") as f:
-        f.write(content)
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            f.write(chunk)
+            file_size += len(chunk)
     
     return DocumentMetadata(
         id=doc_id,
@@ -227,10 +382,8 @@ async def extract_entities(
     - Medical codes (ICD-10, CPT)
     - Policy numbers
     """
-    content = await file.read()
-    
     return ExtractionResult(
-        document_id=str(uuid.uuid4()),
+        document_id=new_id(),
         entities={
             "patient_name": "John Doe (simulated)",
             "policy_number": "POL-2024-12345 (simulated)",
@@ -248,7 +401,12 @@ async def extract_entities(
 # WORKFLOW ENDPOINTS
 # ============================================================================
 
-@app.post("/api/v1/workflows/document-processing", response_model=WorkflowResult, tags=["Workflows"])
+@app.post(
+    "/api/v1/workflows/document-processing",
+    response_class=Response,
+    responses={200: {"model": WorkflowResultSchema}},
+    tags=["Workflows"],
+)
 async def process_document_workflow(
     file: UploadFile = File(...),
 ):
@@ -264,42 +422,61 @@ async def process_document_workflow(
     6. Fraud Detection
     7. Compliance Validation
     """
-    content = await file.read()
+    classification = await _classify(file)
+    extraction = await _extract(file)
     
-    return WorkflowResult(
-        workflow_id=str(uuid.uuid4()),
+    # Downstream checks only depend on the extracted entities
+    eligibility, fraud_score, compliance = await asyncio.gather(
+        _check_eligibility(extraction),
+        _fraud(extraction),
+        _compliance(extraction),
+    )
+    
+    return _workflow_response(WorkflowResult(
+        workflow_id=new_id(),
         status="completed",
         results={
-            "classification": {
-                "type": "medical_claim",
-                "confidence": 0.98
-            },
-            "extraction": {
-                "patient": "Jane Smith (simulated)",
-                "provider": "City Hospital (simulated)",
-                "claim_total": "$12,500 (simulated)"
-            },
-            "eligibility": {
-                "status": "approved",
-                "coverage": 80,
-                "reason": "Policy active, within coverage limits"
-            },
-            "fraud_score": {
-                "risk_level": "low",
-                "score": 0.15,
-                "flags": []
-            },
-            "compliance": {
-                "status": "compliant",
-                "checks_passed": 8,
-                "checks_total": 8
-            }
+            "classification": classification,
+            "extraction": extraction,
+            "eligibility": eligibility,
+            "fraud_score": fraud_score,
+            "compliance": compliance,
         },
         processing_time=5.3
-    )
+    ))
+
 
+async def _classify(file: UploadFile) -> dict:
+    """Classify the uploaded document (simulated)."""
+    return _CLASSIFICATION_RESULT
 
-@app.post("/api/v1/workflows/eligibility-check", response_model=WorkflowResult, tags=["Workflows"])
+
+async def _extract(file: UploadFile) -> dict:
+    """Extract entities from the uploaded document (simulated)."""
+    return _EXTRACTION_RESULT
+
+
+async def _check_eligibility(entities: dict) -> dict:
+    """Check claim eligibility for the extracted entities (simulated)."""
+    return _ELIGIBILITY_RESULT
+
+
+async def _fraud(entities: dict) -> dict:
+    """Score fraud risk for the extracted entities (simulated)."""
+    return _FRAUD_RESULT
+
+
+async def _compliance(entities: dict) -> dict:
+    """Validate compliance for the extracted entities (simulated)."""
+    return _COMPLIANCE_RESULT
+
+
+@app.post(
+    "/api/v1/workflows/eligibility-check",
+    response_class=Response,
+    responses={200: {"model": WorkflowResultSchema}},
+    tags=["Workflows"],
+)
 async def check_eligibility_workflow(
     policy_number: str,
     claim_details: dict,
@@ -313,25 +490,12 @@ async def check_eligibility_workflow(
     - Verify benefits
     - Apply exclusions
     """
-    return WorkflowResult(
-        workflow_id=str(uuid.uuid4()),
+    return _workflow_response(WorkflowResult(
+        workflow_id=new_id(),
         status="completed",
-        results={
-            "policy_status": "active",
-            "eligible": True,
-            "coverage_percentage": 80,
-            "deductible_remaining": "$500",
-            "out_of_pocket_max": "$2000 remaining",
-            "benefits_applied": [
-                "Outpatient services",
-                "Diagnostic tests",
-                "Prescription drugs"
-            ],
-            "exclusions_checked": [],
-            "reasoning": "Policy is active and claim falls within covered benefits (simulated)"
-        },
+        results=_ELIGIBILITY_WORKFLOW_RESULTS,
         processing_time=2.1
-    )
+    ))
 
 
 # ============================================================================
@@ -351,26 +515,7 @@ async def analyze_fraud_risk(
     - Provider history
     - Temporal anomalies
     """
-    content = await file.read()
-    
-    return {
-        "document_id": str(uuid.uuid4()),
-        "fraud_score": 0.23,
-        "risk_level": "low",
-        "indicators": [
-            {
-                "type": "billing_pattern",
-                "severity": "low",
-                "description": "Normal billing pattern detected"
-            }
-        ],
-        "recommendations": [
-            "No immediate action required",
-            "Continue standard processing"
-        ],
-        "confidence": 0.92,
-        "note": "Simulated fraud analysis for demonstration"
-    }
+    return {"document_id": new_id(), **_FRAUD_ANALYSIS}
 
 
 # ============================================================================
@@ -384,25 +529,7 @@ async def search_similar_documents(query: str):
     
     In production, uses Weaviate vector database.
     """
-    return {
-        "query": query,
-        "results": [
-            {
-                "id": "doc-101",
-                "filename": "similar_claim_1.pdf",
-                "similarity_score": 0.94,
-                "snippet": "Medical claim for outpatient procedure... (simulated)"
-            },
-            {
-                "id": "doc-102",
-                "filename": "similar_claim_2.pdf",
-                "similarity_score": 0.89,
-                "snippet": "Insurance claim with similar diagnosis codes... (simulated)"
-            }
-        ],
-        "total_found": 2,
-        "note": "Mock search results for demonstration"
-    }
+    return {"query": query, **_SIMILAR_DOCUMENTS}
 
 
 @app.get("/api/v1/search/graph", tags=["Search"])
@@ -417,25 +544,7 @@ async def search_graph(entity_type: str, entity_id: str):
             "type": entity_type,
             "id": entity_id,
         },
-        "relationships": [
-            {
-                "type": "has_policy",
-                "target": {
-                    "type": "Policy",
-                    "id": "POL-12345",
-                    "status": "active"
-                }
-            },
-            {
-                "type": "submitted_claim",
-                "target": {
-                    "type": "Claim",
-                    "id": "CLM-67890",
-                    "amount": "$5000"
-                }
-            }
-        ],
-        "note": "Mock graph data for demonstration"
+        **_GRAPH_RELATIONSHIPS
     }
 
 
@@ -453,13 +562,7 @@ async def query_policy(policy_number: str, question: str):
     return {
         "policy_number": policy_number,
         "question": question,
-        "answer": "Based on your policy, outpatient procedures are covered at 80% after deductible. (simulated answer)",
-        "confidence": 0.91,
-        "sources": [
-            "Policy document section 3.2",
-            "Benefits schedule page 12"
-        ],
-        "note": "Simulated policy analysis for demonstration"
+        **_POLICY_ANSWER
     }
 
 
@@ -469,14 +572,7 @@ async def check_eligibility(policy_number: str, service_code: str):
     return {
         "policy_number": policy_number,
         "service_code": service_code,
-        "eligible": True,
-        "coverage_percentage": 80,
-        "requirements": [
-            "Valid policy",
-            "Within coverage limits",
-            "No exclusions apply"
-        ],
-        "note": "Simulated eligibility check for demonstration"
+        **_ELIGIBILITY_CHECK
     }
 
 
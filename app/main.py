@@ -4,12 +4,19 @@ from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 
 from app.api.v1.router import api_router
 from app.config import settings
+from app.core.api_log import api_log_writer
 from app.core.middleware import LoggingMiddleware, RateLimitMiddleware
-from app.db.postgres import init_db
+from app.db.nebula import nebula_client
+from app.db.postgres import close_db, init_db
+from app.db.redis import redis_client
+from app.db.weaviate import weaviate_client
+from app.services.ocr_service import shutdown_ocr_process_pool
+from app.services.storage_service import get_storage_service
 from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -24,9 +31,30 @@ async def lifespan(app: FastAPI):
     # Initialize database
     await init_db()
     
-    # TODO: Initialize NebulaGraph connection pool
-    # TODO: Initialize Weaviate client
-    # TODO: Initialize S3/MinIO client
+    # Storage service shared with routes through app.api.deps
+    app.state.storage = get_storage_service()
+    
+    # Initialize NebulaGraph connection pool
+    try:
+        await nebula_client.connect()
+    except Exception as e:
+        logger.warning("NebulaGraph unavailable at startup", error=str(e))
+    
+    # Initialize Weaviate client
+    try:
+        await weaviate_client.connect()
+    except Exception as e:
+        logger.warning("Weaviate unavailable at startup", error=str(e))
+    
+    # Initialize Redis (rate limiting); fall back to in-memory limits without it
+    try:
+        await redis_client.connect()
+    except Exception as e:
+        logger.warning("Redis unavailable, using in-memory rate limiting", error=str(e))
+    
+    # Start batched API log writer
+    if settings.API_LOG_ENABLED:
+        await api_log_writer.start()
     
     logger.info("Application startup complete")
     
@@ -34,9 +62,13 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     logger.info("Shutting down FinSightAI application")
-    # TODO: Close database connections
-    # TODO: Close NebulaGraph pool
-    # TODO: Close Weaviate client
+    shutdown_ocr_process_pool()
+    await api_log_writer.stop()
+    await redis_client.close()
+    await weaviate_client.close()
+    await nebula_client.close()
+    await app.state.storage.close()
+    await close_db()
 
 
 app = FastAPI(
@@ -47,6 +79,7 @@ app = FastAPI(
     redoc_url="/redoc",
     openapi_url="/openapi.json",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # CORS Middleware
@@ -62,6 +95,9 @@ app.add_middleware(
 app.add_middleware(LoggingMiddleware)
 app.add_middleware(RateLimitMiddleware)
 
+# Response compression (added last so it wraps the other middleware)
+app.add_middleware(GZipMiddleware, minimum_size=settings.GZIP_MINIMUM_SIZE)
+
 # Include routers
 app.include_router(api_router, prefix=settings.API_V1_PREFIX)
 
@@ -93,7 +129,7 @@ async def global_exception_handler(request, exc):
         error=str(exc),
         exc_info=True,
     )
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=500,
         content={"detail": "Internal server error"},
     )
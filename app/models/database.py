@@ -1,7 +1,6 @@
 """SQLAlchemy database models for PostgreSQL."""
 
 from datetime import datetime
-from uuid import uuid4
 
 from sqlalchemy import (
     TIMESTAMP,
@@ -10,7 +9,9 @@ from sqlalchemy import (
     Column,
     Float,
     ForeignKey,
+    Index,
     Integer,
+    SmallInteger,
     String,
     Text,
 )
@@ -19,15 +20,20 @@ from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
+from app.utils.ids import uuid7
+
 Base = declarative_base()
 
+# Fixed-point scale for confidence scores stored as SMALLINT (0.0-1.0 -> 0-1000)
+CONFIDENCE_SCALE = 1000
+
 
 class User(Base):
     """User model."""
 
     __tablename__ = "users"
 
-    user_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
+    user_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     email = Column(String(255), unique=True, nullable=False, index=True)
     password_hash = Column(String(255), nullable=False)
     role = Column(String(50), default="user")
@@ -46,7 +52,7 @@ class Document(Base):
 
     __tablename__ = "documents"
 
-    document_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
+    document_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.user_id"), index=True)
     filename = Column(String(255), nullable=False)
     file_path = Column(Text, nullable=False)
@@ -64,18 +70,37 @@ class Document(Base):
     extracted_entities = Column(JSONB)
     medical_codes = Column(JSONB)
     classification_confidence = Column(Float)
+    
+    # Primary codes promoted out of medical_codes for indexed filtering
+    cpt_code = Column(String(16), index=True)
+    icd10_code = Column(String(16), index=True)
 
     # Relationships
     user = relationship("User", back_populates="documents")
     processing_jobs = relationship("ProcessingJob", back_populates="document")
 
+    __table_args__ = (
+        Index(
+            "ix_doc_entities_gin",
+            extracted_entities,
+            postgresql_using="gin",
+            postgresql_ops={"extracted_entities": "jsonb_path_ops"},
+        ),
+        Index(
+            "ix_doc_medical_codes_gin",
+            medical_codes,
+            postgresql_using="gin",
+            postgresql_ops={"medical_codes": "jsonb_path_ops"},
+        ),
+    )
+
 
 class APILog(Base):
     """API request/response log."""
 
     __tablename__ = "api_logs"
 
-    log_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
+    log_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.user_id"), index=True)
     endpoint = Column(String(255))
     method = Column(String(10))
@@ -92,10 +117,10 @@ class ProcessingJob(Base):
 
     __tablename__ = "processing_jobs"
 
-    job_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
+    job_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     document_id = Column(UUID(as_uuid=True), ForeignKey("documents.document_id"))
     job_type = Column(String(50))
-    status = Column(String(50))
+    status = Column(String(50), index=True)
     started_at = Column(TIMESTAMP(timezone=True))
     completed_at = Column(TIMESTAMP(timezone=True))
     result = Column(JSONB)
@@ -110,15 +135,16 @@ class EligibilityCheck(Base):
 
     __tablename__ = "eligibility_checks"
 
-    check_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
+    # Fixed-width columns first to minimise tuple padding
+    check_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.user_id"), index=True)
+    created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
+    confidence_score = Column(SmallInteger)  # Scaled by CONFIDENCE_SCALE (0-1000)
     policy_id = Column(String(255))
     procedure_code = Column(String(50))
     diagnosis_code = Column(String(50))
     result = Column(String(50))
-    confidence_score = Column(Integer)  # Store as int (0-10000) for precision
     explanation = Column(JSONB)
-    created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
 
     # Relationships
     user = relationship("User", back_populates="eligibility_checks")
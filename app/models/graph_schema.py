@@ -1,6 +1,7 @@
 """NebulaGraph schema definitions and queries."""
 
-from typing import Dict, List
+import textwrap
+from typing import Dict, Tuple
 
 # Space creation
 CREATE_SPACE = """
@@ -277,17 +278,46 @@ QUERIES = {
 }
 
 
-def get_all_schema_statements() -> List[str]:
+# Collapse whitespace once so each query is sent as a single compact line
+QUERIES = {name: " ".join(query.split()) for name, query in QUERIES.items()}
+
+
+def _clean_statement(statement: str) -> str:
+    """Dedent and trim an nGQL statement."""
+    return textwrap.dedent(statement).strip()
+
+
+# All schema creation statements in order, built once at import
+ALL_SCHEMA_STATEMENTS: Tuple[str, ...] = tuple(
+    _clean_statement(statement)
+    for statement in (
+        CREATE_SPACE,
+        USE_SPACE,
+        *TAG_DEFINITIONS.values(),
+        *EDGE_DEFINITIONS.values(),
+        *INDEX_DEFINITIONS.values(),
+    )
+)
+
+
+def get_all_schema_statements() -> Tuple[str, ...]:
     """Get all schema creation statements in order."""
-    statements = [CREATE_SPACE, USE_SPACE]
-    
-    # Add tag definitions
-    statements.extend(TAG_DEFINITIONS.values())
-    
-    # Add edge definitions
-    statements.extend(EDGE_DEFINITIONS.values())
-    
-    # Add index definitions
-    statements.extend(INDEX_DEFINITIONS.values())
-    
-    return statements
+    return ALL_SCHEMA_STATEMENTS
+
+
+# Dependency tiers: the space must exist before tags/edges, which are
+# independent of each other, and indexes must follow the tags they cover
+SCHEMA_STATEMENT_TIERS: Tuple[Tuple[str, ...], ...] = (
+    (_clean_statement(CREATE_SPACE),),
+    (_clean_statement(USE_SPACE),),
+    tuple(
+        _clean_statement(s)
+        for s in (*TAG_DEFINITIONS.values(), *EDGE_DEFINITIONS.values())
+    ),
+    tuple(_clean_statement(s) for s in INDEX_DEFINITIONS.values()),
+)
+
+
+def get_schema_statement_tiers() -> Tuple[Tuple[str, ...], ...]:
+    """Get schema statements grouped into tiers that can run concurrently."""
+    return SCHEMA_STATEMENT_TIERS
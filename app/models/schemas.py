@@ -1,5 +1,7 @@
 """Pydantic models for API requests and responses."""
 
+import sys
+from dataclasses import dataclass
 from datetime import date, datetime
 from decimal import Decimal
 from enum import Enum
@@ -50,6 +52,22 @@ class BaseSchema(BaseModel):
     """Base schema with common configurations."""
     model_config = {"from_attributes": True, "use_enum_values": True}
 
+    @classmethod
+    def make(cls, **data: Any) -> "BaseSchema":
+        """
+        Build an instance from trusted, already well-typed data.
+
+        Skips validation (including nested lists), so use it only for
+        values the service produced itself; untrusted input goes through
+        the normal constructor or model_validate.
+        """
+        return cls.model_construct(**data)
+
+
+# Internal-only types that never cross the API boundary are plain slotted
+# dataclasses: no per-instance __dict__ and no validation on construction
+_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
 
 # Document Models
 class DocumentUploadRequest(BaseSchema):
@@ -232,7 +250,8 @@ class Token(BaseSchema):
     token_type: str = "bearer"
 
 
-class TokenData(BaseSchema):
+@dataclass(frozen=True, **_SLOTS)
+class TokenData:
     """Token payload data."""
     user_id: Optional[str] = None
     email: Optional[str] = None
@@ -1,6 +1,11 @@
 """Document classification service."""
 
-from typing import Dict, Optional
+import json
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_openai import ChatOpenAI
 
 from app.config import settings
 from app.models.schemas import DocumentType
@@ -9,6 +14,26 @@ from app.utils.logger import get_logger
 logger = get_logger(__name__)
 
 
+@lru_cache(maxsize=4)
+def _get_llm(model: str, temperature: float) -> ChatOpenAI:
+    """Get a shared chat model (and its HTTP connection pool) per model/temperature."""
+    return ChatOpenAI(
+        model=model,
+        temperature=temperature,
+        api_key=settings.OPENAI_API_KEY,
+        # JSON mode guarantees a parseable object in the response
+        model_kwargs={"response_format": {"type": "json_object"}},
+    )
+
+
+@dataclass
+class ClassificationContext:
+    """Per-document state shared between classification passes."""
+    text_lower: str
+    filename_lower: str = ""
+    result: Optional[Dict[str, Any]] = None
+
+
 class DocumentClassifier:
     """Classify documents based on content and patterns."""
 
@@ -97,9 +122,38 @@ class DocumentClassifier:
                 "weight": 1.0,
             },
         }
+        
+        # Map each keyword to every (doc_type, keyword index) it scores for;
+        # some keywords (e.g. "deductible") are shared between types
+        self._keyword_slots: Dict[str, List[Tuple[DocumentType, int]]] = {}
+        for doc_type, patterns in self.classification_patterns.items():
+            for index, keyword in enumerate(patterns["keywords"]):
+                self._keyword_slots.setdefault(keyword, []).append((doc_type, index))
+
+    @staticmethod
+    def build_context(
+        text: str, filename: Optional[str] = None
+    ) -> ClassificationContext:
+        """
+        Normalize a document once for one or more classification passes.
+        
+        Args:
+            text: Document text content
+            filename: Optional filename for additional hints
+            
+        Returns:
+            ClassificationContext to pass to classify/classify_with_llm
+        """
+        return ClassificationContext(
+            text_lower=text.lower(),
+            filename_lower=filename.lower() if filename else "",
+        )
 
     def classify(
-        self, text: str, filename: Optional[str] = None
+        self,
+        text: str,
+        filename: Optional[str] = None,
+        context: Optional[ClassificationContext] = None,
     ) -> Dict[str, any]:
         """
         Classify document based on content.
@@ -107,26 +161,35 @@ class DocumentClassifier:
         Args:
             text: Document text content
             filename: Optional filename for additional hints
+            context: Optional context from build_context; reuses its
+                lowercased text and any result already computed for it
             
         Returns:
             Dictionary with document_type and confidence score
         """
-        logger.info("Classifying document", filename=filename)
+        if context is None:
+            context = self.build_context(text, filename)
+        elif context.result is not None:
+            return context.result
         
-        # Normalize text for matching
-        text_lower = text.lower()
+        logger.info("Classifying document", filename=filename)
         
+        context.result = self._classify_context(context)
+        return context.result
+
+    def _classify_context(self, context: ClassificationContext) -> Dict[str, any]:
+        """Score a normalized document against every document type."""
         # Calculate scores for each document type
-        scores = {}
-        for doc_type, patterns in self.classification_patterns.items():
-            score = self._calculate_score(text_lower, patterns["keywords"])
-            scores[doc_type] = score
+        counts = self._count_keywords(context.text_lower)
+        scores = {
+            doc_type: self._score_counts(counts[doc_type])
+            for doc_type in self.classification_patterns
+        }
         
         # Boost scores based on filename hints
-        if filename:
-            filename_lower = filename.lower()
+        if context.filename_lower:
             for doc_type in scores:
-                if doc_type.value in filename_lower:
+                if doc_type.value in context.filename_lower:
                     scores[doc_type] *= 1.5
         
         # Find best match
@@ -157,38 +220,56 @@ class DocumentClassifier:
             "scores": {k.value: v for k, v in scores.items()},
         }
 
-    def _calculate_score(self, text: str, keywords: list[str]) -> float:
-        """Calculate matching score based on keyword presence."""
+    def _count_keywords(self, text: str) -> Dict[DocumentType, List[int]]:
+        """Count occurrences of every keyword, per document type."""
+        counts = {
+            doc_type: [0] * len(patterns["keywords"])
+            for doc_type, patterns in self.classification_patterns.items()
+        }
+        
+        # Each distinct keyword is counted once, non-overlapping as str.count
+        # does, and the count is shared by every type that scores it
+        for keyword, slots in self._keyword_slots.items():
+            occurrences = text.count(keyword)
+            if occurrences:
+                for doc_type, index in slots:
+                    counts[doc_type][index] = occurrences
+        
+        return counts
+
+    @staticmethod
+    def _score_counts(counts: List[int]) -> float:
+        """
+        Calculate matching score from per-keyword occurrence counts.
+        
+        A zero count doubles as the presence check, so each keyword costs
+        one scan of the text rather than an `in` test plus a count.
+        """
         score = 0.0
         
-        for keyword in keywords:
-            # Exact phrase match
-            if keyword in text:
-                score += 1.0
-                
-                # Bonus for multiple occurrences
-                occurrences = text.count(keyword)
-                if occurrences > 1:
-                    score += 0.1 * min(occurrences - 1, 3)  # Cap bonus at 3 extra
+        for occurrences in counts:
+            if occurrences:
+                # Exact phrase match, plus bonus for multiple occurrences
+                score += 1.0 + 0.1 * min(occurrences - 1, 3)  # Cap bonus at 3 extra
         
         return score
 
-    def classify_with_llm(self, text: str, filename: Optional[str] = None) -> Dict[str, any]:
+    def classify_with_llm(
+        self,
+        text: str,
+        filename: Optional[str] = None,
+        context: Optional[ClassificationContext] = None,
+    ) -> Dict[str, any]:
         """
         Classify document using LLM for more accurate results.
         
         This method uses GPT to classify documents when rule-based
-        classification has low confidence.
+        classification has low confidence. Pass the context used for the
+        rule-based pass so the fallback does not rescan the document.
         """
-        from langchain_openai import ChatOpenAI
-        
         logger.info("Classifying document with LLM")
         
-        llm = ChatOpenAI(
-            model=settings.OPENAI_MODEL,
-            temperature=0.0,
-            api_key=settings.OPENAI_API_KEY,
-        )
+        llm = _get_llm(settings.OPENAI_MODEL, 0.0)
         
         # Truncate text if too long
         max_chars = 4000
@@ -213,7 +294,6 @@ Response:"""
             response = llm.invoke(prompt)
             
             # Parse response
-            import json
             result = json.loads(response.content)
             
             # Convert string to enum
@@ -232,7 +312,7 @@ Response:"""
         except Exception as e:
             logger.error("LLM classification failed", error=str(e), exc_info=True)
             # Fall back to rule-based
-            return self.classify(text, filename)
+            return self.classify(text, filename, context=context)
 
 
 # Global classifier instance
@@ -1,14 +1,49 @@
 """Embedding service for generating text embeddings using OpenAI."""
 
-from typing import List, Dict, Any, Optional
+import asyncio
+import base64
+import hashlib
+import math
+import os
+import re
+from typing import List, Dict, Any, Optional, Tuple
 import numpy as np
-from openai import OpenAI
+import tiktoken
+from openai import AsyncOpenAI, OpenAI
 
 from app.config import settings
+from app.utils.cache import DiskCache, TTLCache
 from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+try:
+    import faiss
+except ImportError:  # Optional; registered searches fall back to NumPy
+    faiss = None
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+# Input limit of the OpenAI embedding models
+MAX_EMBEDDING_TOKENS = 8191
+
+
+def _decode_embedding(data: Any) -> np.ndarray:
+    """
+    Decode one embedding from an embeddings response.
+    
+    Requests ask for base64, which is the raw little-endian float32 buffer,
+    so the vector is viewed directly instead of going through a list of
+    Python floats (as the SDK's default decoding does).
+    """
+    if isinstance(data, str):
+        return np.frombuffer(base64.b64decode(data), dtype="<f4")
+    return np.asarray(data, dtype=np.float32)
+
+
+# Texts per embeddings request
+EMBEDDING_BATCH_SIZE = 100
+
 
 class EmbeddingService:
     """Service for generating text embeddings."""
@@ -24,8 +59,34 @@ class EmbeddingService:
                 - text-embedding-ada-002: 1536 dimensions, legacy model
         """
         self.client = OpenAI(api_key=settings.OPENAI_API_KEY)
+        self.async_client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
         self.model = model
         self.dimension = 1536 if "small" in model or "ada" in model else 3072
+        self.encoding = self._load_encoding(model)
+        
+        # Registered candidates for repeated similarity searches
+        self._candidates: Optional[np.ndarray] = None
+        self._index = None
+        
+        # Exact-match cache keyed on a digest of the model and text; stored
+        # as float32 arrays to keep the footprint small
+        self.cache: TTLCache = TTLCache(
+            max_entries=settings.EMBEDDING_CACHE_MAX_ENTRIES,
+            ttl_seconds=None,
+        )
+        
+        # Optional persistent tier so re-processed documents skip OpenAI
+        # across restarts
+        self.disk_cache: Optional[DiskCache] = None
+        if settings.EMBEDDING_DISK_CACHE_PATH:
+            try:
+                self.disk_cache = DiskCache(settings.EMBEDDING_DISK_CACHE_PATH)
+            except Exception as e:
+                logger.warning(
+                    "Embedding disk cache unavailable",
+                    path=settings.EMBEDDING_DISK_CACHE_PATH,
+                    error=str(e)
+                )
         
         logger.info(
             "Embedding service initialized",
@@ -33,7 +94,40 @@ class EmbeddingService:
             dimension=self.dimension
         )
     
-    def generate_embedding(self, text: str) -> List[float]:
+    @staticmethod
+    def _load_encoding(model: str) -> Optional["tiktoken.Encoding"]:
+        """Load the model's tokenizer, or None to fall back to char truncation."""
+        try:
+            try:
+                return tiktoken.encoding_for_model(model)
+            except KeyError:
+                return tiktoken.get_encoding("cl100k_base")
+        except Exception as e:
+            logger.warning("Tokenizer unavailable, truncating by characters", error=str(e))
+            return None
+    
+    def _prepare_inputs(self, texts: List[str]) -> List[Any]:
+        """
+        Truncate texts to the model's token limit.
+        
+        Args:
+            texts: Non-empty, stripped texts
+            
+        Returns:
+            Token id lists (or truncated strings without a tokenizer)
+        """
+        if self.encoding is None:
+            # Rough estimate: 4 chars per token
+            return [text[:32000] for text in texts]
+        
+        token_lists = self.encoding.encode_batch(
+            texts,
+            num_threads=os.cpu_count() or 1,
+            disallowed_special=()
+        )
+        return [tokens[:MAX_EMBEDDING_TOKENS] for tokens in token_lists]
+    
+    def generate_embedding(self, text: str) -> np.ndarray:
         """
         Generate embedding for a single text.
         
@@ -41,22 +135,30 @@ class EmbeddingService:
             text: Text to embed
             
         Returns:
-            List of embedding values
+            float32 embedding vector
         """
         try:
-            # Clean and truncate text (max 8191 tokens for OpenAI)
-            text = text.strip()[:32000]  # Rough estimate: 4 chars per token
+            text = text.strip()
             
             if not text:
                 logger.warning("Empty text provided for embedding")
-                return [0.0] * self.dimension
+                return np.zeros(self.dimension, dtype=np.float32)
+            
+            key = self._cache_key(text)
+            cached = self._cache_get_many([key]).get(key)
+            if cached is not None:
+                return cached.copy()
             
+            # Truncated to 8191 tokens and sent as token ids
             response = self.client.embeddings.create(
-                input=text,
-                model=self.model
+                input=self._prepare_inputs([text])[0],
+                model=self.model,
+                encoding_format="base64"
             )
             
-            embedding = response.data[0].embedding
+            # Copied out of the read-only response buffer
+            embedding = _decode_embedding(response.data[0].embedding).copy()
+            self._cache_set_many({key: embedding.copy()})
             
             logger.debug(
                 "Embedding generated",
@@ -75,57 +177,264 @@ class EmbeddingService:
             )
             raise
     
-    def generate_embeddings(self, texts: List[str]) -> List[List[float]]:
+    async def agenerate_embedding(self, text: str, query: bool = False) -> np.ndarray:
         """
-        Generate embeddings for multiple texts in batch.
+        Generate embedding for a single text without blocking the event loop.
+        
+        Cached texts are served without a request; misses use the async
+        client.
         
         Args:
-            texts: List of texts to embed
+            text: Text to embed
+            query: Text is a search query; queries differing only in case or
+                whitespace share one cached embedding
             
         Returns:
-            List of embeddings
+            float32 embedding vector
         """
         try:
-            # Clean and truncate texts
-            cleaned_texts = [text.strip()[:32000] for text in texts]
+            text = text.strip()
+            
+            if not text:
+                logger.warning("Empty text provided for embedding")
+                return np.zeros(self.dimension, dtype=np.float32)
+            
+            key = self._cache_key(text, query=query)
+            cached = self._cache_get_many([key]).get(key)
+            if cached is not None:
+                return cached.copy()
+            
+            response = await self.async_client.embeddings.create(
+                input=self._prepare_inputs([text])[0],
+                model=self.model,
+                encoding_format="base64"
+            )
+            
+            # Copied out of the read-only response buffer
+            embedding = _decode_embedding(response.data[0].embedding).copy()
+            self._cache_set_many({key: embedding.copy()})
+            
+            return embedding
+            
+        except Exception as e:
+            logger.error(
+                "Embedding generation failed",
+                error=str(e),
+                text_length=len(text),
+                exc_info=True
+            )
+            raise
+    
+    def _cache_key(self, text: str, query: bool = False) -> bytes:
+        """
+        Digest of the model and the text.
+        
+        Document and chunk texts are keyed exactly, since their vectors are
+        stored. Search queries are case- and whitespace-normalized and kept
+        in their own key space, so they never resolve to a document vector.
+        """
+        if query:
+            normalized = _WHITESPACE_RE.sub(" ", text.strip().lower())
+            return hashlib.sha256(f"{self.model}\0query\0{normalized}".encode("utf-8")).digest()
+        return hashlib.sha256(f"{self.model}\0{text}".encode("utf-8")).digest()
+    
+    def _cache_get_many(self, keys: List[bytes]) -> Dict[bytes, np.ndarray]:
+        """Look keys up in memory, then on disk, promoting disk hits."""
+        found: Dict[bytes, np.ndarray] = {}
+        missing = []
+        for key in keys:
+            cached = self.cache.get(key)
+            if cached is not None:
+                found[key] = cached
+            else:
+                missing.append(key)
+        
+        if missing and self.disk_cache is not None:
+            try:
+                for key, blob in self.disk_cache.get_many(missing).items():
+                    vector = np.frombuffer(blob, dtype=np.float32).copy()
+                    self.cache.set(key, vector)
+                    found[key] = vector
+            except Exception as e:
+                logger.warning("Embedding disk cache read failed", error=str(e))
+        
+        return found
+    
+    def _cache_set_many(self, items: Dict[bytes, np.ndarray]) -> None:
+        """Store embeddings in memory and on disk."""
+        for key, vector in items.items():
+            self.cache.set(key, vector)
+        
+        if items and self.disk_cache is not None:
+            try:
+                self.disk_cache.set_many(
+                    {key: vector.tobytes() for key, vector in items.items()}
+                )
+            except Exception as e:
+                logger.warning("Embedding disk cache write failed", error=str(e))
+    
+    def _collect_misses(
+        self,
+        texts: List[str]
+    ) -> Tuple[np.ndarray, List[Optional[bytes]], List[str], List[int], int]:
+        """
+        Fill cached rows and collect the texts that still need embedding.
+        
+        Args:
+            texts: List of texts to embed
             
-            # Remove empty texts and track indices
-            valid_texts = []
-            valid_indices = []
-            for i, text in enumerate(cleaned_texts):
-                if text:
-                    valid_texts.append(text)
-                    valid_indices.append(i)
+        Returns:
+            Tuple of (result matrix, cache keys, texts to embed, their row
+            indices, cache hit count)
+        """
+        cleaned_texts = [text.strip() for text in texts]
+        
+        # Every row is written exactly once below (cached, zero or fresh),
+        # so skip zero-filling the whole matrix up front
+        result = np.empty((len(texts), self.dimension), dtype=np.float32)
+        
+        # Remove empty and cached texts and track indices
+        keys = [self._cache_key(text) if text else None for text in cleaned_texts]
+        cached = self._cache_get_many([key for key in keys if key is not None])
+        
+        valid_texts = []
+        valid_indices = []
+        for i, (text, key) in enumerate(zip(cleaned_texts, keys)):
+            if not text:
+                result[i] = 0.0
+                continue
+            if key in cached:
+                result[i] = cached[key]
+            else:
+                valid_texts.append(text)
+                valid_indices.append(i)
+        
+        if not valid_texts and not cached:
+            logger.warning("No valid texts provided for embedding")
+        
+        return result, keys, valid_texts, valid_indices, len(cached)
+    
+    @staticmethod
+    def _write_rows(
+        result: np.ndarray,
+        row_indices: List[int],
+        response: Any
+    ) -> None:
+        """Copy each embedding of a response straight into its result row."""
+        for row, item in zip(row_indices, response.data):
+            result[row] = _decode_embedding(item.embedding)
+    
+    def _cache_fresh(
+        self,
+        result: np.ndarray,
+        keys: List[Optional[bytes]],
+        valid_indices: List[int]
+    ) -> None:
+        """Cache freshly generated rows."""
+        self._cache_set_many({
+            keys[idx]: result[idx].copy() for idx in valid_indices
+        })
+    
+    def generate_embeddings(self, texts: List[str]) -> np.ndarray:
+        """
+        Generate embeddings for multiple texts in batch.
+        
+        Args:
+            texts: List of texts to embed
             
+        Returns:
+            (len(texts), dimension) float32 array, zero rows for empty texts
+        """
+        try:
+            result, keys, valid_texts, valid_indices, hits = self._collect_misses(texts)
             if not valid_texts:
-                logger.warning("No valid texts provided for embedding")
-                return [[0.0] * self.dimension] * len(texts)
+                return result
             
-            # Generate embeddings in batch (max 2048 texts per request)
-            batch_size = 100
-            all_embeddings = []
+            # Tokenize and truncate all texts in one multi-threaded call
+            inputs = self._prepare_inputs(valid_texts)
             
-            for i in range(0, len(valid_texts), batch_size):
-                batch = valid_texts[i:i + batch_size]
+            # Generate embeddings in batch (max 2048 texts per request),
+            # writing each response directly into the result matrix
+            for i in range(0, len(inputs), EMBEDDING_BATCH_SIZE):
+                batch = inputs[i:i + EMBEDDING_BATCH_SIZE]
                 
                 response = self.client.embeddings.create(
                     input=batch,
-                    model=self.model
+                    model=self.model,
+                    encoding_format="base64"
                 )
                 
-                batch_embeddings = [item.embedding for item in response.data]
-                all_embeddings.extend(batch_embeddings)
+                self._write_rows(result, valid_indices[i:i + EMBEDDING_BATCH_SIZE], response)
             
-            # Reconstruct full list with zeros for empty texts
-            result = [[0.0] * self.dimension] * len(texts)
-            for idx, embedding in zip(valid_indices, all_embeddings):
-                result[idx] = embedding
+            self._cache_fresh(result, keys, valid_indices)
             
             logger.info(
                 "Batch embeddings generated",
                 total_texts=len(texts),
                 valid_texts=len(valid_texts),
-                batches=len(range(0, len(valid_texts), batch_size))
+                cache_hits=hits,
+                batches=(len(valid_texts) + EMBEDDING_BATCH_SIZE - 1) // EMBEDDING_BATCH_SIZE
+            )
+            
+            return result
+            
+        except Exception as e:
+            logger.error(
+                "Batch embedding generation failed",
+                error=str(e),
+                text_count=len(texts),
+                exc_info=True
+            )
+            raise
+    
+    async def agenerate_embeddings(self, texts: List[str]) -> np.ndarray:
+        """
+        Generate embeddings for multiple texts with concurrent batch requests.
+        
+        Same result as generate_embeddings, but all batches are in flight
+        at once (bounded by EMBEDDING_MAX_CONCURRENCY) instead of one
+        round-trip after another.
+        
+        Args:
+            texts: List of texts to embed
+            
+        Returns:
+            (len(texts), dimension) float32 array, zero rows for empty texts
+        """
+        try:
+            result, keys, valid_texts, valid_indices, hits = self._collect_misses(texts)
+            if not valid_texts:
+                return result
+            
+            # Tokenization is CPU-bound; keep it off the event loop
+            loop = asyncio.get_running_loop()
+            inputs = await loop.run_in_executor(None, self._prepare_inputs, valid_texts)
+            
+            batches = range(0, len(inputs), EMBEDDING_BATCH_SIZE)
+            semaphore = asyncio.Semaphore(settings.EMBEDDING_MAX_CONCURRENCY)
+            
+            async def embed_batch(start: int) -> None:
+                async with semaphore:
+                    response = await self.async_client.embeddings.create(
+                        input=inputs[start:start + EMBEDDING_BATCH_SIZE],
+                        model=self.model,
+                        encoding_format="base64"
+                    )
+                # Each batch owns a disjoint slice of rows
+                self._write_rows(
+                    result, valid_indices[start:start + EMBEDDING_BATCH_SIZE], response
+                )
+            
+            await asyncio.gather(*(embed_batch(start) for start in batches))
+            
+            self._cache_fresh(result, keys, valid_indices)
+            
+            logger.info(
+                "Batch embeddings generated",
+                total_texts=len(texts),
+                valid_texts=len(valid_texts),
+                cache_hits=hits,
+                batches=len(batches)
             )
             
             return result
@@ -141,8 +450,9 @@ class EmbeddingService:
     
     def calculate_similarity(
         self,
-        embedding1: List[float],
-        embedding2: List[float]
+        embedding1: Any,
+        embedding2: Any,
+        normalized: bool = False
     ) -> float:
         """
         Calculate cosine similarity between two embeddings.
@@ -150,39 +460,160 @@ class EmbeddingService:
         Args:
             embedding1: First embedding
             embedding2: Second embedding
+            normalized: Both embeddings are already unit length (e.g. from
+                normalize()), so the similarity is a single dot product
             
         Returns:
             Similarity score between -1 and 1
         """
         try:
-            # Convert to numpy arrays
-            vec1 = np.array(embedding1)
-            vec2 = np.array(embedding2)
+            # No-op for float32 arrays; converts plain lists
+            vec1 = np.asarray(embedding1, dtype=np.float32)
+            vec2 = np.asarray(embedding2, dtype=np.float32)
             
-            # Calculate cosine similarity
-            dot_product = np.dot(vec1, vec2)
-            norm1 = np.linalg.norm(vec1)
-            norm2 = np.linalg.norm(vec2)
+            if normalized:
+                return float(vec1 @ vec2)
             
-            if norm1 == 0 or norm2 == 0:
+            # Squared norms via dot products avoid two linalg.norm dispatches
+            norm_product = float(vec1 @ vec1) * float(vec2 @ vec2)
+            if norm_product == 0:
                 return 0.0
             
-            similarity = dot_product / (norm1 * norm2)
-            
-            return float(similarity)
+            return float(vec1 @ vec2) / math.sqrt(norm_product)
             
         except Exception as e:
-            logger.error(
-                "Similarity calculation failed",
-                error=str(e),
-                exc_info=True
-            )
+            # Callers get 0.0 back; a traceback per bad pair is not worth it
+            logger.warning("Similarity calculation failed", error=str(e))
             return 0.0
     
+    @staticmethod
+    def normalize(embedding: Any) -> np.ndarray:
+        """
+        Scale an embedding to unit length for normalized similarity.
+        
+        Args:
+            embedding: Embedding vector
+            
+        Returns:
+            float32 unit vector (zero vector stays zero)
+        """
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+    
+    @staticmethod
+    def normalize_batch(embeddings: np.ndarray) -> np.ndarray:
+        """
+        Scale every row of an embedding matrix to unit length, in place.
+        
+        Args:
+            embeddings: (N, dimension) float32 array, e.g. from
+                generate_embeddings
+            
+        Returns:
+            The same array (zero rows stay zero)
+        """
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        embeddings /= norms
+        return embeddings
+    
+    @staticmethod
+    def _normalize_rows(candidates: Any) -> np.ndarray:
+        """Stack candidates into a float32 matrix with unit-length rows."""
+        matrix = np.asarray(candidates, dtype=np.float32)
+        if matrix.ndim == 1:
+            matrix = matrix.reshape(1, -1)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+    
+    def register_candidates(
+        self,
+        candidate_embeddings: Any,
+        approximate: bool = False
+    ) -> None:
+        """
+        Pre-normalize and index candidate embeddings for repeated searches.
+        
+        Args:
+            candidate_embeddings: (N, D) array or list of embeddings
+            approximate: Use an HNSW graph (sublinear, approximate) instead
+                of an exact flat index; only applies when FAISS is installed
+        """
+        self._candidates = self._normalize_rows(candidate_embeddings)
+        self._index = None
+        
+        if faiss is not None:
+            dimension = self._candidates.shape[1]
+            if approximate:
+                self._index = faiss.IndexHNSWFlat(
+                    dimension, 32, faiss.METRIC_INNER_PRODUCT
+                )
+            else:
+                self._index = faiss.IndexFlatIP(dimension)
+            self._index.add(np.ascontiguousarray(self._candidates))
+        
+        logger.debug(
+            "Candidates registered",
+            count=self._candidates.shape[0],
+            indexed=self._index is not None
+        )
+    
+    @staticmethod
+    def quantize(vectors: Any) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Symmetric per-row int8 quantization.
+        
+        Args:
+            vectors: (N, D) or (D,) float array
+            
+        Returns:
+            Tuple of int8 array and float32 per-row scale (max(abs) / 127)
+        """
+        matrix = np.asarray(vectors, dtype=np.float32)
+        scale = np.abs(matrix).max(axis=-1, keepdims=True) / 127.0
+        scale[scale == 0] = 1.0
+        quantized = np.rint(matrix / scale).astype(np.int8)
+        return quantized, scale.squeeze(-1).astype(np.float32)
+    
+    def register_quantized_candidates(self, candidate_embeddings: Any) -> None:
+        """
+        Normalize, quantize to int8 and store candidates for approximate search.
+        
+        Args:
+            candidate_embeddings: (N, D) array or list of embeddings
+        """
+        self._candidates_q, self._candidates_scale = self.quantize(
+            self._normalize_rows(candidate_embeddings)
+        )
+        
+        logger.debug("Quantized candidates registered", count=self._candidates_q.shape[0])
+    
+    def quantized_similarity(self, query_embedding: Any) -> np.ndarray:
+        """
+        Approximate cosine similarity against the int8 candidate matrix.
+        
+        Args:
+            query_embedding: Query embedding
+            
+        Returns:
+            float32 similarity per registered candidate
+        """
+        query = np.asarray(query_embedding, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm == 0:
+            return np.zeros(self._candidates_q.shape[0], dtype=np.float32)
+        
+        query_q, query_scale = self.quantize(query / norm)
+        # Accumulate in int32 to avoid int8 overflow
+        dots = self._candidates_q.astype(np.int32) @ query_q.astype(np.int32)
+        return dots.astype(np.float32) * (self._candidates_scale * query_scale)
+    
     def find_most_similar(
         self,
-        query_embedding: List[float],
-        candidate_embeddings: List[List[float]],
+        query_embedding: Any,
+        candidate_embeddings: Optional[Any] = None,
         top_k: int = 5
     ) -> List[Dict[str, Any]]:
         """
@@ -190,27 +621,52 @@ class EmbeddingService:
         
         Args:
             query_embedding: Query embedding
-            candidate_embeddings: List of candidate embeddings
+            candidate_embeddings: List of candidate embeddings (defaults to
+                the candidates passed to register_candidates, searched
+                through the FAISS index when available)
             top_k: Number of top results to return
             
         Returns:
             List of dicts with index and similarity score
         """
         try:
-            similarities = []
+            if candidate_embeddings is not None:
+                candidates = self._normalize_rows(candidate_embeddings)
+            else:
+                candidates = self._candidates
             
-            for i, candidate in enumerate(candidate_embeddings):
-                similarity = self.calculate_similarity(query_embedding, candidate)
-                similarities.append({
-                    "index": i,
-                    "similarity": similarity
-                })
+            if candidates is None or candidates.shape[0] == 0 or top_k <= 0:
+                return []
             
-            # Sort by similarity descending
-            similarities.sort(key=lambda x: x["similarity"], reverse=True)
+            query = np.asarray(query_embedding, dtype=np.float32)
+            query_norm = np.linalg.norm(query)
             
-            # Return top k
-            return similarities[:top_k]
+            if candidate_embeddings is None and self._index is not None and query_norm > 0:
+                k = min(top_k, candidates.shape[0])
+                distances, indices = self._index.search(
+                    (query / query_norm).reshape(1, -1), k
+                )
+                # HNSW pads with -1 when fewer than k neighbours are reachable
+                return [
+                    {"index": int(i), "similarity": float(d)}
+                    for i, d in zip(indices[0], distances[0])
+                    if i >= 0
+                ]
+            
+            if query_norm == 0:
+                scores = np.zeros(candidates.shape[0], dtype=np.float32)
+            else:
+                scores = candidates @ (query / query_norm)
+            
+            # Partial selection of the top k, then sort only those
+            k = min(top_k, scores.shape[0])
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            
+            return [
+                {"index": int(i), "similarity": float(scores[i])}
+                for i in top
+            ]
             
         except Exception as e:
             logger.error(
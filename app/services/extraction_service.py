@@ -1,12 +1,19 @@
 """Entity extraction service using LLM for structured data extraction."""
 
-from typing import Dict, List, Optional, Any
+import asyncio
+from bisect import bisect
+from collections import defaultdict
+from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime
+from itertools import islice
 import json
+import re
+import threading
 
 from langchain.chat_models import ChatOpenAI
 from langchain.prompts import ChatPromptTemplate
-from langchain.output_parsers import PydanticOutputParser
+from langchain.output_parsers.openai_functions import JsonOutputFunctionsParser
+from langchain.utils.openai_functions import convert_pydantic_to_openai_function
 from pydantic import BaseModel, Field
 
 from app.config import settings
@@ -15,6 +22,109 @@ from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+try:
+    import hyperscan
+except ImportError:  # Optional; medical code scanning falls back to re
+    hyperscan = None
+
+# Fallback extraction patterns
+_NUMBER_RES = (
+    re.compile(r"(?:policy|claim|invoice|receipt)\s*(?:number|#)?\s*:?\s*([A-Z0-9\-]+)", re.IGNORECASE),
+    re.compile(r"(?:number|#)\s*:?\s*([A-Z0-9\-]{6,})", re.IGNORECASE),
+)
+_DATE_RES = (
+    re.compile(r"(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})"),
+    re.compile(r"(\d{4}[/-]\d{1,2}[/-]\d{1,2})"),
+)
+_AMOUNT_RE = re.compile(r"\$\s*(\d+(?:,\d{3})*(?:\.\d{2})?)")
+
+# Document length bins (in characters, ~4 per token) for batch extraction:
+# up to ~1k, ~4k and ~8k tokens, then everything longer
+_EXTRACTION_BIN_EDGES = (4_000, 16_000, 32_000)
+
+# Medical code patterns, combined into one alternation so the text is
+# scanned once; the shapes are disjoint so no match shadows another
+_MEDICAL_CODE_RE = re.compile(
+    r"(?P<hcpcs>\b[A-Z]\d{4}\b)"  # letter + 4 digits, e.g., J1234
+    r"|(?P<icd10>\b[A-Z]\d{2}(?:\.\d{1,4})?\b)"  # e.g., M25.511, Z79.01
+    r"|(?P<cpt>\b\d{5}\b)"  # 5 digits, e.g., 99213
+)
+
+# Same patterns for Hyperscan, indexed by match id
+_MEDICAL_CODE_GROUPS = ("hcpcs", "icd10", "cpt")
+_MEDICAL_CODE_EXPRESSIONS = (
+    rb"\b[A-Z]\d{4}\b",
+    rb"\b[A-Z]\d{2}(?:\.\d{1,4})?\b",
+    rb"\b\d{5}\b",
+)
+
+# Byte-level alternation for ASCII text, where \b and \d need no Unicode
+# class lookups
+_MEDICAL_CODE_BYTES_RE = re.compile(
+    b"|".join(
+        b"(?P<%s>%s)" % (group.encode("ascii"), expression)
+        for group, expression in zip(_MEDICAL_CODE_GROUPS, _MEDICAL_CODE_EXPRESSIONS)
+    )
+)
+_hs_medical_db = None
+_hs_local = threading.local()
+
+
+def _get_hs_medical_db():
+    """Compile the Hyperscan medical code database once, or None if unavailable."""
+    global _hs_medical_db
+    
+    if _hs_medical_db is None and hyperscan is not None:
+        try:
+            database = hyperscan.Database()
+            database.compile(
+                expressions=list(_MEDICAL_CODE_EXPRESSIONS),
+                ids=list(range(len(_MEDICAL_CODE_EXPRESSIONS))),
+                elements=len(_MEDICAL_CODE_EXPRESSIONS),
+                # Report start offsets so matches can be sliced out
+                flags=[hyperscan.HS_FLAG_SOM_LEFTMOST] * len(_MEDICAL_CODE_EXPRESSIONS),
+            )
+            _hs_medical_db = database
+        except Exception as e:
+            logger.warning("Hyperscan medical code database compile failed", error=str(e))
+    
+    return _hs_medical_db
+
+
+def _scan_medical_codes(text: str) -> Dict[str, set]:
+    """Bucket medical code matches by type with one scan of the text."""
+    found = {group: set() for group in _MEDICAL_CODE_GROUPS}
+    
+    database = _get_hs_medical_db()
+    if database is None:
+        if text.isascii():
+            for match in _MEDICAL_CODE_BYTES_RE.finditer(text.encode("ascii")):
+                found[match.lastgroup].add(match.group().decode("ascii"))
+        else:
+            for match in _MEDICAL_CODE_RE.finditer(text):
+                found[match.lastgroup].add(match.group())
+        return found
+    
+    # Hyperscan reports every end offset that satisfies a pattern; keep the
+    # longest per start to match re's greedy result
+    data = text.encode("utf-8")
+    longest: Dict[Tuple[int, int], int] = {}
+    
+    def on_match(pattern_id, start, end, flags, context):
+        key = (pattern_id, start)
+        if end > longest.get(key, -1):
+            longest[key] = end
+    
+    scratch = getattr(_hs_local, "scratch", None)
+    if scratch is None:
+        scratch = _hs_local.scratch = hyperscan.Scratch(database)
+    database.scan(data, match_event_handler=on_match, scratch=scratch)
+    
+    for (pattern_id, start), end in longest.items():
+        found[_MEDICAL_CODE_GROUPS[pattern_id]].add(data[start:end].decode("utf-8"))
+    
+    return found
+
 
 # Pydantic models for structured extraction
 class PolicyEntity(BaseModel):
@@ -128,6 +238,22 @@ class ExtractionService:
             DocumentType.EOB: EOBEntity,
             DocumentType.RECEIPT: ReceiptEntity,
         }
+        
+        # Per-type models bound to a forced function call, so the API
+        # enforces the schema instead of the prompt describing it
+        self.structured_llms = {}
+        for document_type, entity_model in self.entity_models.items():
+            function = convert_pydantic_to_openai_function(entity_model)
+            self.structured_llms[document_type] = self.llm.bind(
+                functions=[function],
+                function_call={"name": function["name"]},
+            )
+        
+        # Prompt templates and chains are fixed per type; build them once
+        self.chains = {
+            document_type: self._build_chain(document_type, entity_model)
+            for document_type, entity_model in self.entity_models.items()
+        }
 
     def extract_entities(
         self, 
@@ -146,33 +272,26 @@ class ExtractionService:
         """
         logger.info("Extracting entities", document_type=document_type.value)
         
-        # Get appropriate entity model
-        entity_model = self.entity_models.get(document_type)
-        if not entity_model:
+        # Get the chain for this document type
+        chain = self.chains.get(document_type)
+        if chain is None:
             logger.warning(
                 "No extraction model for document type",
                 document_type=document_type.value,
             )
             return {"error": f"No extraction model for {document_type.value}"}
         
-        # Create parser
-        parser = PydanticOutputParser(pydantic_object=entity_model)
-        
-        # Create extraction prompt
-        prompt = self._create_extraction_prompt(document_type, parser)
-        
         try:
             # Run extraction
-            chain = prompt | self.llm | parser
             result = chain.invoke({"text": text})
             
-            # Convert to dict
-            entities = result.dict()
+            # Convert to dict, keeping only the fields that were found
+            entities = result.model_dump(exclude_none=True, exclude_defaults=True)
             
             logger.info(
                 "Entities extracted successfully",
                 document_type=document_type.value,
-                entity_count=len([v for v in entities.values() if v]),
+                entity_count=len(entities),
             )
             
             return entities
@@ -187,15 +306,102 @@ class ExtractionService:
             # Fall back to simple extraction
             return self._simple_extraction(text, document_type)
 
+    async def extract_entities_batch(
+        self,
+        items: List[Tuple[str, DocumentType]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Extract entities from many documents with concurrent LLM calls.
+        
+        Documents are grouped by type and length bin, and all groups run
+        concurrently under one EXTRACTION_MAX_CONCURRENCY bound. Shortest
+        bins, and shortest documents within a bin, are queued first, so the
+        slots turn over quickly before the long documents take them.
+        
+        Args:
+            items: (text, document_type) pairs
+            
+        Returns:
+            Extracted entities per item, in input order
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(items)
+        
+        # Group item indices by document type and length bin
+        groups: Dict[Tuple[DocumentType, int], List[int]] = defaultdict(list)
+        for index, (text, document_type) in enumerate(items):
+            groups[(document_type, bisect(_EXTRACTION_BIN_EDGES, len(text)))].append(index)
+        
+        # Shared by every group, so concurrent groups cannot multiply the
+        # number of requests in flight
+        semaphore = asyncio.Semaphore(settings.EXTRACTION_MAX_CONCURRENCY)
+        
+        async def extract(chain: Any, text: str) -> Any:
+            async with semaphore:
+                return await chain.ainvoke({"text": text})
+        
+        async def extract_group(document_type: DocumentType, indices: List[int]) -> None:
+            chain = self.chains.get(document_type)
+            if chain is None:
+                logger.warning(
+                    "No extraction model for document type",
+                    document_type=document_type.value,
+                )
+                for index in indices:
+                    results[index] = {"error": f"No extraction model for {document_type.value}"}
+                return
+            
+            outputs = await asyncio.gather(
+                *(extract(chain, items[index][0]) for index in indices),
+                return_exceptions=True,
+            )
+            
+            for index, output in zip(indices, outputs):
+                if isinstance(output, Exception):
+                    logger.error(
+                        "Failed to extract entities",
+                        document_type=document_type.value,
+                        error=str(output),
+                    )
+                    # Fall back to simple extraction
+                    results[index] = self._simple_extraction(items[index][0], document_type)
+                else:
+                    results[index] = output.model_dump(exclude_none=True, exclude_defaults=True)
+        
+        # Shortest bins first, and shortest documents first within a bin
+        await asyncio.gather(*(
+            extract_group(
+                document_type,
+                sorted(groups[(document_type, length_bin)], key=lambda i: len(items[i][0])),
+            )
+            for document_type, length_bin in sorted(groups, key=lambda key: key[1])
+        ))
+        
+        logger.info(
+            "Batch entity extraction complete",
+            documents=len(items),
+            groups=len(groups),
+        )
+        
+        return results
+
+    def _build_chain(self, document_type: DocumentType, entity_model: type):
+        """Build the prompt | structured llm | parser chain for a document type."""
+        prompt = self._create_extraction_prompt(document_type)
+        # PydanticOutputFunctionsParser only accepts pydantic v1 models, so the
+        # function arguments are parsed as JSON and validated by the model
+        return (
+            prompt
+            | self.structured_llms[document_type]
+            | JsonOutputFunctionsParser()
+            | entity_model.model_validate
+        )
+
     def _create_extraction_prompt(
         self, 
-        document_type: DocumentType,
-        parser: PydanticOutputParser
+        document_type: DocumentType
     ) -> ChatPromptTemplate:
         """Create extraction prompt for document type."""
         
-        format_instructions = parser.get_format_instructions()
-        
         # Document-specific instructions
         type_instructions = {
             DocumentType.POLICY: """
@@ -252,19 +458,18 @@ Extract receipt information including:
 
 {instruction}
 
-Document Text:
-{text}
-
-{format_instructions}
-
 Extract all available information accurately. If a field is not present in the document, leave it as null.
 For dates, use YYYY-MM-DD format when possible.
 For lists (like diagnosis codes or covered services), extract all mentioned items.
 """
         
-        return ChatPromptTemplate.from_template(template).partial(
+        # Document text goes last, in its own message, so every request for a
+        # document type shares the same prefix and hits OpenAI's prompt cache
+        return ChatPromptTemplate.from_messages([
+            ("system", template),
+            ("human", "Document Text:\n{text}"),
+        ]).partial(
             instruction=instruction,
-            format_instructions=format_instructions,
         )
 
     def _simple_extraction(
@@ -284,38 +489,28 @@ For lists (like diagnosis codes or covered services), extract all mentioned item
             "raw_text_length": len(text),
         }
         
-        # Simple regex patterns for common fields
-        import re
-        
         # Policy/claim/invoice numbers
-        number_patterns = [
-            r"(?:policy|claim|invoice|receipt)\s*(?:number|#)?\s*:?\s*([A-Z0-9\-]+)",
-            r"(?:number|#)\s*:?\s*([A-Z0-9\-]{6,})",
-        ]
-        for pattern in number_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+        for pattern in _NUMBER_RES:
+            match = pattern.search(text)
             if match:
                 entities["document_number"] = match.group(1)
                 break
         
-        # Dates
-        date_patterns = [
-            r"(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})",
-            r"(\d{4}[/-]\d{1,2}[/-]\d{1,2})",
-        ]
-        dates = []
-        for pattern in date_patterns:
-            dates.extend(re.findall(pattern, text))
+        # Dates, stopping the scan once the first 5 are found
+        dates = list(islice(
+            (match.group(1) for pattern in _DATE_RES for match in pattern.finditer(text)),
+            5,
+        ))
         if dates:
-            entities["dates_found"] = dates[:5]  # Limit to first 5
+            entities["dates_found"] = dates
         
-        # Dollar amounts
-        amount_pattern = r"\$\s*(\d+(?:,\d{3})*(?:\.\d{2})?)"
-        amounts = re.findall(amount_pattern, text)
+        # Dollar amounts, first 10 only
+        amounts = [
+            float(match.group(1).replace(",", ""))
+            for match in islice(_AMOUNT_RE.finditer(text), 10)
+        ]
         if amounts:
-            entities["amounts_found"] = [
-                float(amt.replace(",", "")) for amt in amounts[:10]
-            ]
+            entities["amounts_found"] = amounts
         
         return entities
 
@@ -329,31 +524,15 @@ For lists (like diagnosis codes or covered services), extract all mentioned item
         Returns:
             Dictionary with code types and extracted codes
         """
-        import re
+        found = _scan_medical_codes(text)
         
         codes = {
-            "icd10": [],
-            "cpt": [],
-            "hcpcs": [],
+            "icd10": list(found["icd10"]),
+            # Filter to valid CPT range (00100-99999)
+            "cpt": [code for code in found["cpt"] if 100 <= int(code) <= 99999],
+            "hcpcs": list(found["hcpcs"]),
         }
         
-        # ICD-10 pattern (e.g., M25.511, Z79.01)
-        icd10_pattern = r"\b[A-Z]\d{2}(?:\.\d{1,4})?\b"
-        codes["icd10"] = list(set(re.findall(icd10_pattern, text)))
-        
-        # CPT pattern (5 digits, e.g., 99213, 12345)
-        cpt_pattern = r"\b\d{5}\b"
-        potential_cpt = re.findall(cpt_pattern, text)
-        # Filter to valid CPT range (00100-99999)
-        codes["cpt"] = [
-            code for code in set(potential_cpt) 
-            if 100 <= int(code) <= 99999
-        ]
-        
-        # HCPCS pattern (letter + 4 digits, e.g., J1234, E0123)
-        hcpcs_pattern = r"\b[A-Z]\d{4}\b"
-        codes["hcpcs"] = list(set(re.findall(hcpcs_pattern, text)))
-        
         logger.info(
             "Extracted medical codes",
             icd10_count=len(codes["icd10"]),
@@ -364,10 +543,20 @@ For lists (like diagnosis codes or covered services), extract all mentioned item
         return codes
 
 
-# Global extraction service instance
-extraction_service = ExtractionService()
+# Singleton instance
+_extraction_service: Optional[ExtractionService] = None
 
 
 def get_extraction_service() -> ExtractionService:
-    """Get extraction service instance."""
-    return extraction_service
+    """
+    Get or create extraction service instance.
+    
+    Returns:
+        ExtractionService instance
+    """
+    global _extraction_service
+    
+    if _extraction_service is None:
+        _extraction_service = ExtractionService()
+    
+    return _extraction_service
@@ -1,18 +1,39 @@
 """Graph extraction service for building knowledge graphs from documents."""
 
-from typing import List, Dict, Any, Optional, Tuple
+import asyncio
+from typing import List, Dict, Any, AsyncIterator, Optional, Tuple, Union
 from datetime import datetime
-import json
+import re
 
+import orjson
+import tiktoken
 from langchain_openai import ChatOpenAI
 from langchain.prompts import ChatPromptTemplate
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, TypeAdapter
 
 from app.config import settings
 from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Rule-based fallback patterns. Dates and CPT codes can never overlap
+# (date components are at most 4 digits) so they share one pass; amounts
+# and ICD codes stay separate because a CPT code may sit inside either
+# (e.g. "$99213.00", "B12.34567") and must still be found
+_DATE_CPT_RE = re.compile(
+    r'(?P<date>\b\d{1,2}[/-]\d{1,2}[/-]\d{2,4}\b)'
+    r'|(?P<cpt>\b\d{5}\b)'
+)
+_AMOUNT_RE = re.compile(r'\$[\d,]+\.?\d*')
+_ICD_RE = re.compile(r'\b[A-Z]\d{2}\.?\d*\b')
+
+# Document tokens sent to the LLM; gpt-4's 8192-token window less the
+# 3000-token completion budget and the prompt template
+MAX_INPUT_TOKENS = 4000
+
+# Character limit used when the tokenizer is unavailable
+MAX_INPUT_CHARS = 8000
+
 
 # Pydantic models for structured extraction
 class Entity(BaseModel):
@@ -38,6 +59,82 @@ class GraphExtraction(BaseModel):
     relationships: List[Relationship] = Field(default_factory=list)
 
 
+# Reused validator for LLM graph responses
+_GRAPH_ADAPTER = TypeAdapter(GraphExtraction)
+
+
+class _GraphItemScanner:
+    """
+    Incrementally pick complete entity/relationship objects out of a
+    streamed graph JSON response.
+    
+    Tracks string and nesting state across chunks, so each object is parsed
+    as soon as its closing brace arrives rather than after the whole
+    response has been generated.
+    """
+    
+    def __init__(self):
+        """Initialize scanner state."""
+        self._text = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._last_key: Optional[str] = None
+        self._array: Optional[str] = None
+        self._item_start: Optional[int] = None
+    
+    def feed(self, chunk: str) -> List[Tuple[str, Dict[str, Any]]]:
+        """
+        Consume a chunk of the response.
+        
+        Args:
+            chunk: Next piece of streamed content
+            
+        Returns:
+            (array name, object) pairs completed by this chunk
+        """
+        self._text += chunk
+        text = self._text
+        items = []
+        
+        for i in range(self._pos, len(text)):
+            c = text[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        self._last_key = text[self._string_start + 1:i]
+            elif c == '"':
+                self._in_string = True
+                self._string_start = i
+            elif c == "{" or c == "[":
+                self._depth += 1
+                if c == "[" and self._depth == 2:
+                    # Top-level array, named by the key before it
+                    self._array = self._last_key
+                elif c == "{" and self._depth == 3 and self._array:
+                    self._item_start = i
+            elif c == "}" or c == "]":
+                if c == "}" and self._depth == 3 and self._item_start is not None:
+                    try:
+                        items.append((self._array, orjson.loads(text[self._item_start:i + 1])))
+                    except orjson.JSONDecodeError:
+                        logger.warning("Skipping malformed streamed graph item")
+                    self._item_start = None
+                self._depth -= 1
+                if self._depth == 1:
+                    self._array = None
+        
+        self._pos = len(text)
+        return items
+
+
 class GraphExtractionService:
     """Service for extracting knowledge graph from documents."""
     
@@ -48,6 +145,9 @@ class GraphExtractionService:
             temperature=0.1,
             max_tokens=3000
         )
+        self.encoding = self._load_encoding("gpt-4")
+        # Compiled prompt templates, keyed by document type
+        self._prompts: Dict[str, ChatPromptTemplate] = {}
         logger.info("Graph extraction service initialized")
     
     def extract_entities_and_relationships(
@@ -68,37 +168,40 @@ class GraphExtractionService:
             GraphExtraction with entities and relationships
         """
         try:
-            # Create domain-specific extraction prompt
-            prompt = self._create_extraction_prompt(document_type)
-            
-            # Extract using LLM
-            messages = prompt.format_messages(
-                document_type=document_type,
-                text=text[:8000]  # Limit context
-            )
-            
+            messages = self._build_messages(text, document_type)
             response = self.llm.invoke(messages)
+            return self._parse_response(response.content, text, document_type, document_id)
             
-            # Parse JSON response
-            try:
-                result_data = json.loads(response.content)
-                extraction = GraphExtraction(**result_data)
-            except json.JSONDecodeError:
-                logger.warning(
-                    "Failed to parse LLM response as JSON",
-                    document_id=document_id
-                )
-                # Fallback: use rule-based extraction
-                extraction = self._rule_based_extraction(text, document_type)
-            
-            logger.info(
-                "Graph extraction completed",
+        except Exception as e:
+            logger.error(
+                "Graph extraction failed",
                 document_id=document_id,
-                entity_count=len(extraction.entities),
-                relationship_count=len(extraction.relationships)
+                error=str(e),
+                exc_info=True
             )
+            return GraphExtraction()
+    
+    async def aextract_entities_and_relationships(
+        self,
+        text: str,
+        document_type: str,
+        document_id: str
+    ) -> GraphExtraction:
+        """
+        Async variant of extract_entities_and_relationships.
+        
+        Args:
+            text: Document text
+            document_type: Type of document
+            document_id: Document identifier
             
-            return extraction
+        Returns:
+            GraphExtraction with entities and relationships
+        """
+        try:
+            messages = self._build_messages(text, document_type)
+            response = await self.llm.ainvoke(messages)
+            return self._parse_response(response.content, text, document_type, document_id)
             
         except Exception as e:
             logger.error(
@@ -109,6 +212,143 @@ class GraphExtractionService:
             )
             return GraphExtraction()
     
+    @staticmethod
+    def _load_encoding(model: str) -> Optional["tiktoken.Encoding"]:
+        """Load the model's tokenizer, or None to fall back to char truncation."""
+        try:
+            return tiktoken.encoding_for_model(model)
+        except Exception as e:
+            logger.warning("Tokenizer unavailable, truncating by characters", error=str(e))
+            return None
+    
+    def _truncate(self, text: str) -> str:
+        """
+        Limit document text to the LLM's input budget.
+        
+        Args:
+            text: Document text
+            
+        Returns:
+            The text itself when it fits, otherwise its longest token-bounded prefix
+        """
+        if self.encoding is None:
+            return text if len(text) <= MAX_INPUT_CHARS else text[:MAX_INPUT_CHARS]
+        
+        # Every token covers at least one byte, so short ASCII text always fits
+        if len(text) <= MAX_INPUT_TOKENS and text.isascii():
+            return text
+        
+        tokens = self.encoding.encode(text, disallowed_special=())
+        if len(tokens) <= MAX_INPUT_TOKENS:
+            return text
+        return self.encoding.decode(tokens[:MAX_INPUT_TOKENS])
+    
+    async def astream_entities_and_relationships(
+        self,
+        text: str,
+        document_type: str,
+        document_id: str
+    ) -> AsyncIterator[Union[Entity, Relationship]]:
+        """
+        Stream entities and relationships as the LLM generates them.
+        
+        Each object is yielded as soon as it is complete in the response, so
+        callers can process a large graph while the rest is still being
+        generated. Falls back to rule-based extraction if the stream fails
+        before producing anything.
+        
+        Args:
+            text: Document text
+            document_type: Type of document
+            document_id: Document identifier
+            
+        Yields:
+            Entity and Relationship instances
+        """
+        scanner = _GraphItemScanner()
+        entity_count = 0
+        relationship_count = 0
+        
+        try:
+            messages = self._build_messages(text, document_type)
+            async for chunk in self.llm.astream(messages):
+                for array, data in scanner.feed(chunk.content):
+                    try:
+                        if array == "entities":
+                            item = Entity(**data)
+                            entity_count += 1
+                        elif array == "relationships":
+                            item = Relationship(**data)
+                            relationship_count += 1
+                        else:
+                            continue
+                    except ValueError as e:
+                        logger.warning(
+                            "Skipping invalid streamed graph item",
+                            document_id=document_id,
+                            error=str(e)
+                        )
+                        continue
+                    yield item
+                    
+        except Exception as e:
+            logger.error(
+                "Graph extraction stream failed",
+                document_id=document_id,
+                error=str(e),
+                exc_info=True
+            )
+            if entity_count or relationship_count:
+                return
+            
+            # Nothing was produced; fall back to rule-based extraction
+            extraction = self._rule_based_extraction(text, document_type)
+            for entity in extraction.entities:
+                yield entity
+            return
+        
+        logger.info(
+            "Graph extraction stream completed",
+            document_id=document_id,
+            entity_count=entity_count,
+            relationship_count=relationship_count
+        )
+    
+    def _build_messages(self, text: str, document_type: str) -> List[Any]:
+        """Format the domain-specific extraction prompt for a document."""
+        prompt = self._prompts.get(document_type)
+        if prompt is None:
+            prompt = self._prompts[document_type] = self._create_extraction_prompt(document_type)
+        return prompt.format_messages(text=self._truncate(text))
+    
+    def _parse_response(
+        self,
+        content: str,
+        text: str,
+        document_type: str,
+        document_id: str
+    ) -> GraphExtraction:
+        """Parse the LLM JSON response, falling back to rule-based extraction."""
+        try:
+            result_data = orjson.loads(content)
+            extraction = _GRAPH_ADAPTER.validate_python(result_data)
+        except orjson.JSONDecodeError:
+            logger.warning(
+                "Failed to parse LLM response as JSON",
+                document_id=document_id
+            )
+            # Fallback: use rule-based extraction
+            extraction = self._rule_based_extraction(text, document_type)
+        
+        logger.info(
+            "Graph extraction completed",
+            document_id=document_id,
+            entity_count=len(extraction.entities),
+            relationship_count=len(extraction.relationships)
+        )
+        
+        return extraction
+    
     def _create_extraction_prompt(self, document_type: str) -> ChatPromptTemplate:
         """Create extraction prompt based on document type."""
         
@@ -130,14 +370,11 @@ class GraphExtractionService:
         
         template = """You are an expert at extracting structured knowledge graphs from {document_type} documents.
 
-Extract all relevant entities and relationships from the following text.
+Extract all relevant entities and relationships from the text provided by the user.
 
 **Entity Types to Extract**: {entity_types}
 **Relationship Types**: {relationship_types}
 
-**Text**:
-{text}
-
 Return a JSON object with this exact structure:
 {{
   "entities": [
@@ -168,9 +405,13 @@ Guidelines:
 
 Return only valid JSON, no additional text."""
 
+        # Document text goes last, in its own message, so every request for a
+        # document type shares the same prefix and hits OpenAI's prompt cache
         return ChatPromptTemplate.from_messages([
-            ("system", template)
+            ("system", template),
+            ("human", "**Text**:\n{text}")
         ]).partial(
+            document_type=document_type,
             entity_types=entity_types,
             relationship_types=relationship_types
         )
@@ -193,32 +434,31 @@ Return only valid JSON, no additional text."""
         entities = []
         relationships = []
         
+        found = {"date": set(), "cpt": set()}
+        for match in _DATE_CPT_RE.finditer(text):
+            found[match.lastgroup].add(match.group())
+        
         # Extract dates
-        import re
-        date_pattern = r'\b\d{1,2}[/-]\d{1,2}[/-]\d{2,4}\b'
-        dates = re.findall(date_pattern, text)
-        for date in set(dates):
-            entities.append(Entity(
+        for date in found["date"]:
+            entities.append(Entity.model_construct(
                 name=date,
                 type="date",
+                properties={},
                 confidence=0.8
             ))
         
         # Extract amounts
-        amount_pattern = r'\$[\d,]+\.?\d*'
-        amounts = re.findall(amount_pattern, text)
-        for amount in set(amounts):
-            entities.append(Entity(
+        for amount in {match.group() for match in _AMOUNT_RE.finditer(text)}:
+            entities.append(Entity.model_construct(
                 name=amount,
                 type="amount",
+                properties={},
                 confidence=0.8
             ))
         
         # Extract medical codes (CPT)
-        cpt_pattern = r'\b\d{5}\b'
-        cpts = re.findall(cpt_pattern, text)
-        for cpt in set(cpts):
-            entities.append(Entity(
+        for cpt in found["cpt"]:
+            entities.append(Entity.model_construct(
                 name=cpt,
                 type="procedure_code",
                 properties={"code_type": "CPT"},
@@ -226,10 +466,8 @@ Return only valid JSON, no additional text."""
             ))
         
         # Extract ICD codes
-        icd_pattern = r'\b[A-Z]\d{2}\.?\d*\b'
-        icds = re.findall(icd_pattern, text)
-        for icd in set(icds):
-            entities.append(Entity(
+        for icd in {match.group() for match in _ICD_RE.finditer(text)}:
+            entities.append(Entity.model_construct(
                 name=icd,
                 type="diagnosis_code",
                 properties={"code_type": "ICD-10"},
@@ -242,7 +480,8 @@ Return only valid JSON, no additional text."""
             relationship_count=len(relationships)
         )
         
-        return GraphExtraction(
+        # Built from our own regex matches, so skip validation
+        return GraphExtraction.model_construct(
             entities=entities,
             relationships=relationships
         )
@@ -278,23 +517,7 @@ Return only valid JSON, no additional text."""
                     document_id="temp_claim"
                 )
                 
-                # Merge graphs
-                all_entities = policy_graph.entities + claim_graph.entities
-                all_relationships = policy_graph.relationships + claim_graph.relationships
-                
-                # Add cross-document relationships
-                # E.g., link claim to policy
-                all_relationships.append(Relationship(
-                    source="claim",
-                    target="policy",
-                    type="covered_by",
-                    confidence=0.9
-                ))
-                
-                return GraphExtraction(
-                    entities=all_entities,
-                    relationships=all_relationships
-                )
+                return self._combine_insurance_graphs(policy_graph, claim_graph)
             
             return policy_graph
             
@@ -306,6 +529,78 @@ Return only valid JSON, no additional text."""
             )
             return GraphExtraction()
     
+    async def aextract_insurance_graph(
+        self,
+        policy_text: str,
+        claim_text: Optional[str] = None
+    ) -> GraphExtraction:
+        """
+        Extract insurance-specific graph, running policy and claim
+        extraction concurrently.
+        
+        Args:
+            policy_text: Insurance policy document text
+            claim_text: Optional claim document text
+            
+        Returns:
+            GraphExtraction with insurance entities/relationships
+        """
+        try:
+            if not claim_text:
+                return await self.aextract_entities_and_relationships(
+                    text=policy_text,
+                    document_type="policy",
+                    document_id="temp_policy"
+                )
+            
+            policy_graph, claim_graph = await asyncio.gather(
+                self.aextract_entities_and_relationships(
+                    text=policy_text,
+                    document_type="policy",
+                    document_id="temp_policy"
+                ),
+                self.aextract_entities_and_relationships(
+                    text=claim_text,
+                    document_type="claim_form",
+                    document_id="temp_claim"
+                ),
+            )
+            
+            return self._combine_insurance_graphs(policy_graph, claim_graph)
+            
+        except Exception as e:
+            logger.error(
+                "Insurance graph extraction failed",
+                error=str(e),
+                exc_info=True
+            )
+            return GraphExtraction()
+    
+    @staticmethod
+    def _combine_insurance_graphs(
+        policy_graph: GraphExtraction,
+        claim_graph: GraphExtraction
+    ) -> GraphExtraction:
+        """Concatenate policy and claim graphs and link the claim to the policy."""
+        all_entities = policy_graph.entities + claim_graph.entities
+        all_relationships = policy_graph.relationships + claim_graph.relationships
+        
+        # Add cross-document relationships
+        # E.g., link claim to policy
+        all_relationships.append(Relationship.model_construct(
+            source="claim",
+            target="policy",
+            type="covered_by",
+            properties={},
+            confidence=0.9
+        ))
+        
+        # Inputs were validated when each graph was parsed
+        return GraphExtraction.model_construct(
+            entities=all_entities,
+            relationships=all_relationships
+        )
+    
     def extract_clinical_graph(self, text: str) -> GraphExtraction:
         """
         Extract clinical/medical graph from text.
@@ -363,13 +658,11 @@ Return only valid JSON, no additional text."""
             entity_map = {}
             for graph in graphs:
                 for entity in graph.entities:
-                    key = f"{entity.name}:{entity.type}"
-                    if key not in entity_map:
+                    key = (entity.name, entity.type)
+                    current = entity_map.get(key)
+                    # Keep entity with higher confidence
+                    if current is None or entity.confidence > current.confidence:
                         entity_map[key] = entity
-                    else:
-                        # Keep entity with higher confidence
-                        if entity.confidence > entity_map[key].confidence:
-                            entity_map[key] = entity
             
             all_entities = list(entity_map.values())
             
@@ -377,12 +670,10 @@ Return only valid JSON, no additional text."""
             rel_map = {}
             for graph in graphs:
                 for rel in graph.relationships:
-                    key = f"{rel.source}:{rel.type}:{rel.target}"
-                    if key not in rel_map:
+                    key = (rel.source, rel.type, rel.target)
+                    current = rel_map.get(key)
+                    if current is None or rel.confidence > current.confidence:
                         rel_map[key] = rel
-                    else:
-                        if rel.confidence > rel_map[key].confidence:
-                            rel_map[key] = rel
             
             all_relationships = list(rel_map.values())
             
@@ -393,7 +684,8 @@ Return only valid JSON, no additional text."""
                 total_relationships=len(all_relationships)
             )
             
-            return GraphExtraction(
+            # Entities and relationships are already validated instances
+            return GraphExtraction.model_construct(
                 entities=all_entities,
                 relationships=all_relationships
             )
@@ -1,23 +1,98 @@
 """Graph store service for NebulaGraph integration."""
 
-from typing import List, Dict, Any, Optional
+import asyncio
+import threading
+from collections import defaultdict
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
 
-from app.db.nebula import get_nebula_client
+from app.config import settings
+from app.db.nebula import NebulaGraphClient, get_nebula_client
 from app.services.graph_extraction_service import GraphExtraction, Entity, Relationship
+from app.utils.cache import TTLCache
 from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Entity type to NebulaGraph vertex tag
+_VERTEX_TAGS = {
+    "person": "Person",
+    "patient": "Patient",
+    "provider": "Provider",
+    "organization": "Organization",
+    "insurance_company": "InsuranceCompany",
+    "policy": "Policy",
+    "claim": "Claim",
+    "diagnosis": "Diagnosis",
+    "diagnosis_code": "DiagnosisCode",
+    "procedure": "Procedure",
+    "procedure_code": "ProcedureCode",
+    "coverage": "Coverage",
+    "service": "Service",
+    "document": "Document",
+    "amount": "Amount",
+    "date": "Date"
+}
+
+# Query templates; user values are bound as nGQL parameters, so the text
+# only varies with the validated integer hop count / limit
+_COVERAGE_PATH_QUERY = """
+MATCH p = (policy:Policy)-[*1..{max_hops}]->(service:ProcedureCode)
+WHERE policy.vid == $policy_id AND service.name == $service_code
+RETURN p
+LIMIT 10
+"""
+
+# Paths kept per service, matching the single-service query's LIMIT
+_COVERAGE_PATHS_PER_SERVICE = 10
+
+# One traversal for many services; rows carry the matched code. Paths are
+# capped per code on the server so a dense graph does not send every path
+_COVERAGE_PATHS_BULK_QUERY = """
+UNWIND $service_codes AS code
+MATCH p = (policy:Policy)-[*1..{max_hops}]->(service:ProcedureCode)
+WHERE policy.vid == $policy_id AND service.name == code
+WITH code, collect(p)[0..{per_service}] AS paths
+UNWIND paths AS p
+RETURN code, p
+"""
+
+# Claims are narrowed by diagnosis first and collapsed to one row each, so
+# the procedure expansion runs once per candidate claim rather than once
+# per (claim, diagnosis) pair of a combined pattern
+_SIMILAR_CLAIMS_QUERY = """
+MATCH (claim:Claim)-[:diagnoses]->(d:DiagnosisCode)
+WHERE d.name IN $diagnosis_codes
+WITH claim, collect(DISTINCT d.name) AS diagnoses
+MATCH (claim)-[:includes]->(p:ProcedureCode)
+WHERE p.name IN $procedure_codes
+RETURN claim, diagnoses, collect(DISTINCT p.name) AS procedures
+LIMIT {limit}
+"""
+
 
 class GraphStoreService:
     """Service for managing knowledge graph in NebulaGraph."""
     
     def __init__(self):
         """Initialize graph store service."""
-        self.client = get_nebula_client()
+        self.client: Optional[NebulaGraphClient] = None
+        # Coverage path results keyed on (generation, policy, service, hops).
+        # Any graph write bumps the generation, so paths cached before it are
+        # never served again and simply age out
+        self.coverage_path_cache: TTLCache = TTLCache(
+            max_entries=settings.COVERAGE_PATH_CACHE_MAX_ENTRIES,
+            ttl_seconds=settings.COVERAGE_PATH_CACHE_TTL_SECONDS,
+        )
+        self._graph_generation = 0
         logger.info("Graph store service initialized")
     
+    async def _get_client(self) -> NebulaGraphClient:
+        """Get the shared NebulaGraph client, connecting its session pool on first use."""
+        if self.client is None:
+            self.client = await get_nebula_client()
+        return self.client
+    
     async def store_graph(
         self,
         document_id: str,
@@ -27,6 +102,9 @@ class GraphStoreService:
         """
         Store extracted graph in NebulaGraph.
         
+        Entities and relationships are grouped by tag/edge type and property
+        keys so each group is written with a single multi-row INSERT.
+        
         Args:
             document_id: Document identifier
             extraction: GraphExtraction with entities and relationships
@@ -36,20 +114,73 @@ class GraphStoreService:
             Dict with counts of stored entities and relationships
         """
         try:
+            client = await self._get_client()
             entity_count = 0
             relationship_count = 0
             
-            # Store entities as vertices
+            # One timestamp for every row written by this call
+            created_at = datetime.utcnow().isoformat()
+            
+            # Group entities by vertex tag and property keys
+            vertex_groups: Dict[Tuple[str, Tuple[str, ...]], List[Tuple[str, Dict[str, Any]]]] = defaultdict(list)
             for entity in extraction.entities:
-                success = await self._store_entity(entity, document_id, metadata)
-                if success:
-                    entity_count += 1
+                vertex_tag, vertex_id, properties = self._build_vertex_row(
+                    entity, document_id, metadata, created_at
+                )
+                vertex_groups[(vertex_tag, tuple(properties))].append((vertex_id, properties))
             
-            # Store relationships as edges
+            # Group relationships by edge type and property keys
+            edge_groups: Dict[Tuple[str, Tuple[str, ...]], List[Tuple[str, str, Dict[str, Any]]]] = defaultdict(list)
             for relationship in extraction.relationships:
-                success = await self._store_relationship(relationship, document_id)
-                if success:
-                    relationship_count += 1
+                source_id, target_id, properties = self._build_edge_row(
+                    relationship, document_id, created_at
+                )
+                edge_groups[(relationship.type, tuple(properties))].append(
+                    (source_id, target_id, properties)
+                )
+            
+            # Store entities as vertices, one batch insert per group in flight
+            vertex_results = await asyncio.gather(
+                *(
+                    client.insert_nodes(vertex_tag, rows)
+                    for (vertex_tag, _), rows in vertex_groups.items()
+                ),
+                return_exceptions=True,
+            )
+            for ((vertex_tag, _), rows), result in zip(vertex_groups.items(), vertex_results):
+                if isinstance(result, Exception):
+                    logger.error(
+                        "Failed to store entities",
+                        tag=vertex_tag,
+                        count=len(rows),
+                        error=str(result)
+                    )
+                else:
+                    entity_count += result
+            
+            # Store relationships as edges once their vertices are written
+            edge_results = await asyncio.gather(
+                *(
+                    client.insert_edges(edge_type, rows)
+                    for (edge_type, _), rows in edge_groups.items()
+                ),
+                return_exceptions=True,
+            )
+            for ((edge_type, _), rows), result in zip(edge_groups.items(), edge_results):
+                if isinstance(result, Exception):
+                    logger.error(
+                        "Failed to store relationships",
+                        type=edge_type,
+                        count=len(rows),
+                        error=str(result)
+                    )
+                else:
+                    relationship_count += result
+            
+            # New vertices and edges can open coverage paths; bump once the
+            # writes have landed so no pre-write result is cached as current
+            if vertex_groups or edge_groups:
+                self._graph_generation += 1
             
             logger.info(
                 "Graph stored in NebulaGraph",
@@ -72,118 +203,69 @@ class GraphStoreService:
             )
             return {"entities": 0, "relationships": 0}
     
-    async def _store_entity(
+    def _build_vertex_row(
         self,
         entity: Entity,
         document_id: str,
-        metadata: Optional[Dict[str, Any]] = None
-    ) -> bool:
-        """Store an entity as a vertex."""
-        try:
-            # Determine vertex tag based on entity type
-            vertex_tag = self._get_vertex_tag(entity.type)
-            
-            # Prepare properties
-            properties = {
-                "name": entity.name,
-                "type": entity.type,
-                "confidence": entity.confidence,
-                "document_id": document_id,
-                "created_at": datetime.utcnow().isoformat()
-            }
-            
-            # Add entity properties
-            for key, value in entity.properties.items():
-                properties[key] = value
-            
-            # Add metadata if provided
-            if metadata:
-                properties["document_type"] = metadata.get("document_type", "")
-                properties["user_id"] = metadata.get("user_id", "")
-            
-            # Insert vertex
-            vertex_id = f"{document_id}:{entity.type}:{entity.name}"
-            success = await self.client.insert_vertex(
-                tag=vertex_tag,
-                vid=vertex_id,
-                properties=properties
-            )
-            
-            return success
-            
-        except Exception as e:
-            logger.error(
-                "Failed to store entity",
-                entity_name=entity.name,
-                entity_type=entity.type,
-                error=str(e)
-            )
-            return False
+        metadata: Optional[Dict[str, Any]] = None,
+        created_at: Optional[str] = None
+    ) -> Tuple[str, str, Dict[str, Any]]:
+        """Build the (tag, vid, properties) row for an entity vertex."""
+        # Determine vertex tag based on entity type
+        vertex_tag = self._get_vertex_tag(entity.type)
+        
+        # Prepare properties
+        properties = {
+            "name": entity.name,
+            "type": entity.type,
+            "confidence": entity.confidence,
+            "document_id": document_id,
+            "created_at": created_at or datetime.utcnow().isoformat()
+        }
+        
+        # Add entity properties
+        for key, value in entity.properties.items():
+            properties[key] = value
+        
+        # Add metadata if provided
+        if metadata:
+            properties["document_type"] = metadata.get("document_type", "")
+            properties["user_id"] = metadata.get("user_id", "")
+        
+        vertex_id = f"{document_id}:{entity.type}:{entity.name}"
+        return vertex_tag, vertex_id, properties
     
-    async def _store_relationship(
+    def _build_edge_row(
         self,
         relationship: Relationship,
-        document_id: str
-    ) -> bool:
-        """Store a relationship as an edge."""
-        try:
-            # Create vertex IDs
-            source_id = f"{document_id}:{relationship.source}"
-            target_id = f"{document_id}:{relationship.target}"
-            
-            # Prepare edge properties
-            properties = {
-                "confidence": relationship.confidence,
-                "document_id": document_id,
-                "created_at": datetime.utcnow().isoformat()
-            }
-            
-            # Add relationship properties
-            for key, value in relationship.properties.items():
-                properties[key] = value
-            
-            # Insert edge
-            success = await self.client.insert_edge(
-                edge_type=relationship.type,
-                src_id=source_id,
-                dst_id=target_id,
-                properties=properties
-            )
-            
-            return success
-            
-        except Exception as e:
-            logger.error(
-                "Failed to store relationship",
-                source=relationship.source,
-                target=relationship.target,
-                type=relationship.type,
-                error=str(e)
-            )
-            return False
+        document_id: str,
+        created_at: Optional[str] = None
+    ) -> Tuple[str, str, Dict[str, Any]]:
+        """Build the (src, dst, properties) row for a relationship edge."""
+        # Create vertex IDs
+        source_id = f"{document_id}:{relationship.source}"
+        target_id = f"{document_id}:{relationship.target}"
+        
+        # Prepare edge properties
+        properties = {
+            "confidence": relationship.confidence,
+            "document_id": document_id,
+            "created_at": created_at or datetime.utcnow().isoformat()
+        }
+        
+        # Add relationship properties
+        for key, value in relationship.properties.items():
+            properties[key] = value
+        
+        return source_id, target_id, properties
     
     def _get_vertex_tag(self, entity_type: str) -> str:
         """Map entity type to NebulaGraph vertex tag."""
-        type_mapping = {
-            "person": "Person",
-            "patient": "Patient",
-            "provider": "Provider",
-            "organization": "Organization",
-            "insurance_company": "InsuranceCompany",
-            "policy": "Policy",
-            "claim": "Claim",
-            "diagnosis": "Diagnosis",
-            "diagnosis_code": "DiagnosisCode",
-            "procedure": "Procedure",
-            "procedure_code": "ProcedureCode",
-            "coverage": "Coverage",
-            "service": "Service",
-            "document": "Document",
-            "amount": "Amount",
-            "date": "Date"
-        }
-        
-        return type_mapping.get(entity_type.lower(), "Entity")
+        # Rule-based types are already lowercase; only LLM types need folding
+        tag = _VERTEX_TAGS.get(entity_type)
+        if tag is None:
+            tag = _VERTEX_TAGS.get(entity_type.lower(), "Entity")
+        return tag
     
     async def query_coverage_path(
         self,
@@ -202,16 +284,21 @@ class GraphStoreService:
         Returns:
             List of paths showing coverage relationships
         """
+        cache_key = (self._graph_generation, policy_id, service_code, max_hops)
+        paths = self.coverage_path_cache.get(cache_key)
+        if paths is not None:
+            return paths
+        
         try:
-            query = f"""
-            MATCH p = (policy:Policy {{vid: "{policy_id}"}})-[*1..{max_hops}]->(service:ProcedureCode {{name: "{service_code}"}})
-            RETURN p
-            LIMIT 10
-            """
+            query = _COVERAGE_PATH_QUERY.format(max_hops=int(max_hops))
             
-            result = await self.client.execute_query(query)
+            client = await self._get_client()
+            result = await client.execute_parameterized(
+                query, {"policy_id": policy_id, "service_code": service_code}
+            )
             
-            paths = self._parse_paths(result)
+            paths = self._parse_paths(result.as_primitive())
+            self.coverage_path_cache.set(cache_key, paths)
             
             logger.info(
                 "Coverage path query completed",
@@ -232,6 +319,85 @@ class GraphStoreService:
             )
             return []
     
+    async def query_coverage_paths_bulk(
+        self,
+        policy_id: str,
+        service_codes: List[str],
+        max_hops: int = 3
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Query coverage paths from a policy to many services at once.
+        
+        Cached services are served from the coverage path cache; the rest
+        are resolved with a single UNWIND query so the policy expansion is
+        shared instead of repeated per service.
+        
+        Args:
+            policy_id: Policy identifier
+            service_codes: Service/procedure codes
+            max_hops: Maximum graph hops
+            
+        Returns:
+            Coverage paths per service code (empty when not covered)
+        """
+        generation = self._graph_generation
+        paths_by_code: Dict[str, List[Dict[str, Any]]] = {}
+        misses: List[str] = []
+        
+        for service_code in dict.fromkeys(service_codes):
+            paths = self.coverage_path_cache.get(
+                (generation, policy_id, service_code, max_hops)
+            )
+            if paths is None:
+                misses.append(service_code)
+            else:
+                paths_by_code[service_code] = paths
+        
+        if not misses:
+            return paths_by_code
+        
+        try:
+            query = _COVERAGE_PATHS_BULK_QUERY.format(
+                max_hops=int(max_hops), per_service=_COVERAGE_PATHS_PER_SERVICE
+            )
+            
+            client = await self._get_client()
+            result = await client.execute_parameterized(
+                query, {"policy_id": policy_id, "service_codes": misses}
+            )
+            
+            rows_by_code: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+            # Records have no mapping access; primitive rows are plain dicts
+            for row in result.as_primitive():
+                rows_by_code[row.get("code")].append(row)
+            
+            for service_code in misses:
+                paths = self._parse_paths(rows_by_code.get(service_code, []))
+                self.coverage_path_cache.set(
+                    (generation, policy_id, service_code, max_hops), paths
+                )
+                paths_by_code[service_code] = paths
+            
+            logger.info(
+                "Bulk coverage path query completed",
+                policy_id=policy_id,
+                services_queried=len(misses),
+                services_cached=len(paths_by_code) - len(misses)
+            )
+            
+        except Exception as e:
+            logger.error(
+                "Bulk coverage path query failed",
+                policy_id=policy_id,
+                service_count=len(misses),
+                error=str(e),
+                exc_info=True
+            )
+            for service_code in misses:
+                paths_by_code[service_code] = []
+        
+        return paths_by_code
+    
     async def find_similar_claims(
         self,
         diagnosis_codes: List[str],
@@ -250,21 +416,18 @@ class GraphStoreService:
             List of similar claims
         """
         try:
-            # Build query for similar claims
-            diagnosis_filter = " OR ".join([f'd.name == "{code}"' for code in diagnosis_codes])
-            procedure_filter = " OR ".join([f'p.name == "{code}"' for code in procedure_codes])
-            
-            query = f"""
-            MATCH (claim:Claim)-[:diagnoses]->(d:DiagnosisCode),
-                  (claim)-[:includes]->(p:ProcedureCode)
-            WHERE ({diagnosis_filter}) AND ({procedure_filter})
-            RETURN claim, collect(DISTINCT d.name) AS diagnoses, collect(DISTINCT p.name) AS procedures
-            LIMIT {limit}
-            """
-            
-            result = await self.client.execute_query(query)
+            query = _SIMILAR_CLAIMS_QUERY.format(limit=int(limit))
+            
+            client = await self._get_client()
+            result = await client.execute_parameterized(
+                query,
+                {
+                    "diagnosis_codes": list(diagnosis_codes),
+                    "procedure_codes": list(procedure_codes),
+                },
+            )
             
-            claims = self._parse_claims(result)
+            claims = self._parse_claims(result.as_primitive())
             
             logger.info(
                 "Similar claims query completed",
@@ -309,9 +472,11 @@ class GraphStoreService:
             else:
                 pattern = f'(entity)-[r]-(other)'
             
-            where_clause = f'entity.vid == "{entity_id}"'
+            params = {"entity_id": entity_id}
+            where_clause = 'entity.vid == $entity_id'
             if relationship_type:
-                where_clause += f' AND type(r) == "{relationship_type}"'
+                where_clause += ' AND type(r) == $relationship_type'
+                params["relationship_type"] = relationship_type
             
             query = f"""
             MATCH {pattern}
@@ -324,9 +489,10 @@ class GraphStoreService:
             LIMIT 100
             """
             
-            result = await self.client.execute_query(query)
+            client = await self._get_client()
+            result = await client.execute_parameterized(query, params)
             
-            relationships = self._parse_relationships(result)
+            relationships = self._parse_relationships(result.as_primitive())
             
             logger.info(
                 "Entity relationships retrieved",
@@ -371,13 +537,14 @@ class GraphStoreService:
                 "coverage_details": []
             }
             
+            # Query coverage paths for all services in one round-trip
+            paths_by_code = await self.query_coverage_paths_bulk(
+                policy_id=policy_id,
+                service_codes=service_codes
+            )
+            
             for service_code in service_codes:
-                # Query coverage path
-                paths = await self.query_coverage_path(
-                    policy_id=policy_id,
-                    service_code=service_code
-                )
-                
+                paths = paths_by_code[service_code]
                 if paths:
                     results["eligible_services"].append(service_code)
                     results["coverage_details"].append({
@@ -454,6 +621,7 @@ class GraphStoreService:
 
 # Singleton instance
 _graph_store_service: Optional[GraphStoreService] = None
+_graph_store_service_lock = threading.Lock()
 
 
 def get_graph_store_service() -> GraphStoreService:
@@ -466,6 +634,8 @@ def get_graph_store_service() -> GraphStoreService:
     global _graph_store_service
     
     if _graph_store_service is None:
-        _graph_store_service = GraphStoreService()
+        with _graph_store_service_lock:
+            if _graph_store_service is None:
+                _graph_store_service = GraphStoreService()
     
     return _graph_store_service
@@ -1,21 +1,54 @@
 """Storage service for file upload/download using MinIO/S3."""
 
+import asyncio
 import io
-from typing import BinaryIO, Optional
+import os
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import AsyncExitStack, ExitStack
+from functools import partial
+from typing import Any, BinaryIO, Callable, Iterator, Optional, Union
 from uuid import UUID
 
 from boto3 import client
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
 from botocore.exceptions import ClientError
 
 from app.config import settings
+from app.utils.cache import TTLCache
 from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+try:
+    import aioboto3
+except ImportError:  # Optional; async variants fall back to the thread pool
+    aioboto3 = None
+
 
 class StorageService:
     """MinIO/S3 storage service."""
 
+    # Connection pool shared by the I/O threads and multipart transfer
+    # threads; keep-alive probes keep idle pooled connections usable and
+    # adaptive retries back off under throttling
+    client_config = Config(
+        max_pool_connections=settings.S3_MAX_POOL_CONNECTIONS,
+        tcp_keepalive=True,
+        retries={"mode": "adaptive", "max_attempts": 5},
+        # Path-style addressing works for MinIO without bucket DNS
+        s3={"addressing_style": "path"},
+    )
+
+    # Objects above the threshold move as concurrent multipart uploads /
+    # ranged GETs, holding at most chunksize x concurrency in flight
+    transfer_config = TransferConfig(
+        multipart_threshold=settings.S3_MULTIPART_THRESHOLD_MB * 1024 * 1024,
+        multipart_chunksize=settings.S3_MULTIPART_CHUNKSIZE_MB * 1024 * 1024,
+        max_concurrency=settings.S3_MAX_CONCURRENCY,
+        use_threads=True,
+    )
+
     def __init__(self):
         """Initialize storage service."""
         self.client = client(
@@ -25,9 +58,28 @@ class StorageService:
             aws_secret_access_key=settings.S3_SECRET_KEY,
             region_name=settings.S3_REGION,
             use_ssl=settings.S3_USE_SSL,
+            config=self.client_config,
         )
         self.bucket = settings.S3_BUCKET
         
+        # boto3 clients are thread-safe; async callers run the blocking
+        # calls here so the event loop is free during S3 round-trips
+        self._executor = ThreadPoolExecutor(
+            max_workers=settings.S3_IO_WORKERS, thread_name_prefix="s3-io"
+        )
+        
+        # Presigned URLs keyed on (object key, expiration), reused for at
+        # most the cache TTL so each still has most of its lifetime left
+        self.presigned_url_cache: TTLCache = TTLCache(
+            max_entries=settings.PRESIGNED_URL_CACHE_MAX_ENTRIES,
+            ttl_seconds=settings.PRESIGNED_URL_CACHE_TTL_SECONDS,
+        )
+        
+        # Native async client (S3_ASYNC_CLIENT), opened on first use
+        self._aclient = None
+        self._aclient_stack: Optional[AsyncExitStack] = None
+        self._aclient_lock = asyncio.Lock()
+        
         # Create bucket if it doesn't exist
         self._ensure_bucket_exists()
 
@@ -53,9 +105,43 @@ class StorageService:
             else:
                 logger.error("Error checking bucket", error=str(e), exc_info=True)
 
+    @staticmethod
+    def _extra_args(
+        content_type: Optional[str], metadata: Optional[dict]
+    ) -> dict:
+        """Build upload ExtraArgs from content type and metadata."""
+        extra_args = {}
+        
+        if content_type:
+            extra_args["ContentType"] = content_type
+        
+        if metadata:
+            extra_args["Metadata"] = {
+                k: str(v) for k, v in metadata.items()
+            }
+        
+        return extra_args
+
+    @staticmethod
+    def _open_fileobj(
+        stack: ExitStack, file_content: Union[bytes, BinaryIO, os.PathLike]
+    ) -> BinaryIO:
+        """
+        Readable binary file object for upload content.
+        
+        Paths are opened and streamed part by part, so the file never sits
+        in memory whole. bytes are wrapped in BytesIO, which shares the
+        buffer rather than copying it.
+        """
+        if isinstance(file_content, os.PathLike):
+            return stack.enter_context(open(file_content, "rb"))
+        if isinstance(file_content, (bytes, bytearray, memoryview)):
+            return io.BytesIO(file_content)
+        return file_content
+
     def upload_file(
         self,
-        file_content: bytes,
+        file_content: Union[bytes, BinaryIO, os.PathLike],
         object_key: str,
         content_type: Optional[str] = None,
         metadata: Optional[dict] = None,
@@ -64,7 +150,8 @@ class StorageService:
         Upload file to storage.
         
         Args:
-            file_content: File content as bytes
+            file_content: File content as a readable binary file or a path
+                (preferred, streamed in parts), or as bytes
             object_key: S3 object key (path)
             content_type: MIME type
             metadata: Additional metadata
@@ -75,23 +162,17 @@ class StorageService:
         logger.info("Uploading file to storage", object_key=object_key)
         
         try:
-            extra_args = {}
-            
-            if content_type:
-                extra_args["ContentType"] = content_type
-            
-            if metadata:
-                extra_args["Metadata"] = {
-                    k: str(v) for k, v in metadata.items()
-                }
+            extra_args = self._extra_args(content_type, metadata)
             
             # Upload file
-            self.client.put_object(
-                Bucket=self.bucket,
-                Key=object_key,
-                Body=file_content,
-                **extra_args,
-            )
+            with ExitStack() as stack:
+                self.client.upload_fileobj(
+                    Fileobj=self._open_fileobj(stack, file_content),
+                    Bucket=self.bucket,
+                    Key=object_key,
+                    ExtraArgs=extra_args,
+                    Config=self.transfer_config,
+                )
             
             logger.info("File uploaded successfully", object_key=object_key)
             
@@ -120,8 +201,14 @@ class StorageService:
         logger.info("Downloading file from storage", object_key=object_key)
         
         try:
-            response = self.client.get_object(Bucket=self.bucket, Key=object_key)
-            content = response["Body"].read()
+            buffer = io.BytesIO()
+            self.client.download_fileobj(
+                Bucket=self.bucket,
+                Key=object_key,
+                Fileobj=buffer,
+                Config=self.transfer_config,
+            )
+            content = buffer.getvalue()
             
             logger.info(
                 "File downloaded successfully",
@@ -133,7 +220,8 @@ class StorageService:
             
         except ClientError as e:
             error_code = e.response.get("Error", {}).get("Code")
-            if error_code == "NoSuchKey":
+            # The transfer manager HEADs the object first, which reports 404
+            if error_code in ("NoSuchKey", "404"):
                 logger.warning("File not found", object_key=object_key)
                 raise FileNotFoundError(f"File not found: {object_key}")
             else:
@@ -145,6 +233,46 @@ class StorageService:
                 )
                 raise
 
+    def download_file_stream(
+        self, object_key: str, chunk_size: int = 1024 * 1024
+    ) -> Iterator[bytes]:
+        """
+        Stream file content from storage in chunks.
+        
+        Only one chunk is held in memory at a time, so large objects can be
+        consumed without buffering them whole as download_file does.
+        
+        Args:
+            object_key: S3 object key (path)
+            chunk_size: Maximum bytes per yielded chunk
+            
+        Yields:
+            Consecutive chunks of the file content
+        """
+        logger.info("Streaming file from storage", object_key=object_key)
+        
+        try:
+            response = self.client.get_object(Bucket=self.bucket, Key=object_key)
+        except ClientError as e:
+            error_code = e.response.get("Error", {}).get("Code")
+            if error_code == "NoSuchKey":
+                logger.warning("File not found", object_key=object_key)
+                raise FileNotFoundError(f"File not found: {object_key}")
+            logger.error(
+                "Failed to download file",
+                object_key=object_key,
+                error=str(e),
+                exc_info=True,
+            )
+            raise
+        
+        body = response["Body"]
+        try:
+            yield from body.iter_chunks(chunk_size)
+        finally:
+            # Release the connection if the consumer stops early
+            body.close()
+
     def delete_file(self, object_key: str) -> None:
         """
         Delete file from storage.
@@ -216,6 +344,120 @@ class StorageService:
             )
             raise
 
+    async def _run(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run a blocking storage call on the I/O thread pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(func, *args, **kwargs))
+
+    async def _get_async_client(self) -> Any:
+        """Native async S3 client, or None to use the thread pool."""
+        if not settings.S3_ASYNC_CLIENT or aioboto3 is None:
+            return None
+        
+        if self._aclient is None:
+            async with self._aclient_lock:
+                if self._aclient is None:
+                    stack = AsyncExitStack()
+                    self._aclient = await stack.enter_async_context(
+                        aioboto3.Session().client(
+                            "s3",
+                            endpoint_url=settings.S3_ENDPOINT,
+                            aws_access_key_id=settings.S3_ACCESS_KEY,
+                            aws_secret_access_key=settings.S3_SECRET_KEY,
+                            region_name=settings.S3_REGION,
+                            use_ssl=settings.S3_USE_SSL,
+                            config=self.client_config,
+                        )
+                    )
+                    self._aclient_stack = stack
+        
+        return self._aclient
+
+    async def upload_file_async(
+        self,
+        file_content: Union[bytes, BinaryIO, os.PathLike],
+        object_key: str,
+        content_type: Optional[str] = None,
+        metadata: Optional[dict] = None,
+    ) -> str:
+        """Async variant of upload_file."""
+        aclient = await self._get_async_client()
+        if aclient is None:
+            return await self._run(
+                self.upload_file, file_content, object_key, content_type, metadata
+            )
+        
+        logger.info("Uploading file to storage", object_key=object_key)
+        
+        try:
+            with ExitStack() as stack:
+                await aclient.upload_fileobj(
+                    self._open_fileobj(stack, file_content),
+                    self.bucket,
+                    object_key,
+                    ExtraArgs=self._extra_args(content_type, metadata),
+                    Config=self.transfer_config,
+                )
+        except Exception as e:
+            logger.error(
+                "Failed to upload file",
+                object_key=object_key,
+                error=str(e),
+                exc_info=True,
+            )
+            raise
+        
+        logger.info("File uploaded successfully", object_key=object_key)
+        return object_key
+
+    async def download_file_async(self, object_key: str) -> bytes:
+        """Async variant of download_file."""
+        aclient = await self._get_async_client()
+        if aclient is None:
+            return await self._run(self.download_file, object_key)
+        
+        logger.info("Downloading file from storage", object_key=object_key)
+        
+        try:
+            response = await aclient.get_object(Bucket=self.bucket, Key=object_key)
+            async with response["Body"] as body:
+                content = await body.read()
+        except ClientError as e:
+            error_code = e.response.get("Error", {}).get("Code")
+            if error_code == "NoSuchKey":
+                logger.warning("File not found", object_key=object_key)
+                raise FileNotFoundError(f"File not found: {object_key}")
+            logger.error(
+                "Failed to download file",
+                object_key=object_key,
+                error=str(e),
+                exc_info=True,
+            )
+            raise
+        
+        logger.info(
+            "File downloaded successfully",
+            object_key=object_key,
+            size_bytes=len(content),
+        )
+        return content
+
+    async def delete_file_async(self, object_key: str) -> None:
+        """Async variant of delete_file."""
+        await self._run(self.delete_file, object_key)
+
+    async def file_exists_async(self, object_key: str) -> bool:
+        """Async variant of file_exists."""
+        return await self._run(self.file_exists, object_key)
+
+    async def close(self) -> None:
+        """Close the async client and stop the I/O threads."""
+        if self._aclient_stack is not None:
+            await self._aclient_stack.aclose()
+            self._aclient_stack = None
+            self._aclient = None
+        self._executor.shutdown(wait=False)
+
     def generate_presigned_url(
         self, object_key: str, expiration: int = 3600
     ) -> str:
@@ -229,6 +471,13 @@ class StorageService:
         Returns:
             Presigned URL
         """
+        # Short-lived URLs are always signed fresh
+        cacheable = expiration >= 2 * settings.PRESIGNED_URL_CACHE_TTL_SECONDS
+        if cacheable:
+            url = self.presigned_url_cache.get((object_key, expiration))
+            if url is not None:
+                return url
+        
         try:
             url = self.client.generate_presigned_url(
                 "get_object",
@@ -242,6 +491,9 @@ class StorageService:
                 expiration=expiration,
             )
             
+            if cacheable:
+                self.presigned_url_cache.set((object_key, expiration), url)
+            
             return url
             
         except Exception as e:
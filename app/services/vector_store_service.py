@@ -2,14 +2,24 @@
 
 from typing import List, Dict, Any, Optional
 from datetime import datetime
+import hashlib
 import uuid
 
+from app.core.semantic_cache import SemanticCache, get_semantic_cache
 from app.db.weaviate import get_weaviate_client
 from app.services.embedding_service import get_embedding_service
+from app.utils.cache import TTLCache
 from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Recently stored (document_id, content_hash) pairs remembered for retries
+STORED_DOCUMENTS_MAX_ENTRIES = 10000
+STORED_DOCUMENTS_TTL_SECONDS = 3600
+
+# Vectors of recently stored documents, for similar-document lookups
+DOCUMENT_VECTOR_CACHE_MAX_ENTRIES = 1024
+
 
 class VectorStoreService:
     """Service for managing document vectors in Weaviate."""
@@ -18,6 +28,18 @@ class VectorStoreService:
         """Initialize vector store service."""
         self.client = get_weaviate_client()
         self.embedding_service = get_embedding_service()
+        self.search_cache = get_semantic_cache("semantic_search")
+        # Weaviate UUIDs of recent inserts, keyed on (document_id, content_hash)
+        self.stored_documents: TTLCache = TTLCache(
+            max_entries=STORED_DOCUMENTS_MAX_ENTRIES,
+            ttl_seconds=STORED_DOCUMENTS_TTL_SECONDS,
+        )
+        # Recently stored document vectors keyed on document_id; a hit saves
+        # find_similar_documents the fetch round-trip
+        self.document_vectors: TTLCache = TTLCache(
+            max_entries=DOCUMENT_VECTOR_CACHE_MAX_ENTRIES,
+            ttl_seconds=STORED_DOCUMENTS_TTL_SECONDS,
+        )
         logger.info("Vector store service initialized")
     
     async def store_document(
@@ -38,6 +60,20 @@ class VectorStoreService:
             Weaviate object UUID
         """
         try:
+            # A retried store of the same content returns the earlier object
+            content_hash = hashlib.blake2b(
+                text.encode("utf-8"), digest_size=16
+            ).hexdigest()
+            stored_key = (document_id, content_hash)
+            existing = self.stored_documents.get(stored_key)
+            if existing is not None:
+                logger.info(
+                    "Document already stored in vector database",
+                    document_id=document_id,
+                    weaviate_uuid=existing
+                )
+                return existing
+            
             # Generate embedding
             embedding = self.embedding_service.generate_embedding(text)
             
@@ -50,7 +86,8 @@ class VectorStoreService:
                 "filename": metadata.get("filename", ""),
                 "upload_date": metadata.get("upload_date", datetime.utcnow().isoformat()),
                 "file_size": metadata.get("file_size", 0),
-                "classification_confidence": metadata.get("classification_confidence", 0.0)
+                "classification_confidence": metadata.get("classification_confidence", 0.0),
+                "content_hash": content_hash
             }
             
             # Store in Weaviate
@@ -59,6 +96,10 @@ class VectorStoreService:
                 vector=embedding
             )
             
+            self.stored_documents.set(stored_key, result)
+            self.document_vectors.set(document_id, embedding)
+            self.search_cache.clear()
+            
             logger.info(
                 "Document stored in vector database",
                 document_id=document_id,
@@ -95,26 +136,40 @@ class VectorStoreService:
             List of Weaviate UUIDs
         """
         try:
-            # Generate embeddings for all chunks
-            embeddings = self.embedding_service.generate_embeddings(chunks)
-            
-            uuids = []
-            for i, (chunk, embedding) in enumerate(zip(chunks, embeddings)):
-                chunk_object = {
-                    "document_id": document_id,
-                    "content": chunk,
-                    "chunk_index": i,
-                    "document_type": metadata.get("document_type", "unknown"),
-                    "user_id": metadata.get("user_id", ""),
-                    "filename": metadata.get("filename", ""),
+            # Embed each distinct chunk once; repeated headers, footers and
+            # disclosures reuse the same row
+            positions: Dict[str, int] = {}
+            rows = [positions.setdefault(chunk, len(positions)) for chunk in chunks]
+            unique_embeddings = await self.embedding_service.agenerate_embeddings(
+                list(positions)
+            )
+            # Unit length for cosine distance, in one vectorized pass
+            self.embedding_service.normalize_batch(unique_embeddings)
+            embeddings = unique_embeddings[rows]
+            
+            document_type = metadata.get("document_type", "unknown")
+            user_id = metadata.get("user_id", "")
+            filename = metadata.get("filename", "")
+            
+            objects = [
+                {
+                    "properties": {
+                        "document_id": document_id,
+                        "content": chunk,
+                        "chunk_index": i,
+                        "document_type": document_type,
+                        "user_id": user_id,
+                        "filename": filename,
+                    },
+                    "vector": embedding,
                 }
-                
-                result = await self.client.create_chunk(
-                    properties=chunk_object,
-                    vector=embedding
-                )
-                
-                uuids.append(result)
+                for i, (chunk, embedding) in enumerate(zip(chunks, embeddings))
+            ]
+            
+            # One insert request per batch instead of a round-trip per chunk
+            uuids = await self.client.create_chunks_batch(objects)
+            
+            self.search_cache.clear()
             
             logger.info(
                 "Document chunks stored in vector database",
@@ -157,8 +212,20 @@ class VectorStoreService:
             List of matching documents with similarity scores
         """
         try:
-            # Generate query embedding
-            query_embedding = self.embedding_service.generate_embedding(query)
+            # Generate query embedding (repeat queries are served from cache)
+            query_embedding = await self.embedding_service.agenerate_embedding(query, query=True)
+            
+            # Serve near-duplicate queries with identical filters from cache
+            scope = SemanticCache.scope_key(
+                document_type=document_type,
+                user_id=user_id,
+                limit=limit,
+                min_certainty=min_certainty
+            )
+            cached = self.search_cache.lookup(query_embedding, scope)
+            if cached is not None:
+                logger.debug("Semantic search cache hit", query_length=len(query))
+                return cached
             
             # Build filter
             filters = {}
@@ -175,6 +242,8 @@ class VectorStoreService:
                 min_certainty=min_certainty
             )
             
+            self.search_cache.store(query_embedding, scope, results)
+            
             logger.info(
                 "Semantic search completed",
                 query_length=len(query),
@@ -214,8 +283,8 @@ class VectorStoreService:
             List of matching chunks with scores
         """
         try:
-            # Generate query embedding
-            query_embedding = self.embedding_service.generate_embedding(query)
+            # Generate query embedding (repeat queries are served from cache)
+            query_embedding = await self.embedding_service.agenerate_embedding(query, query=True)
             
             # Build filter
             filters = {}
@@ -268,8 +337,8 @@ class VectorStoreService:
             List of matching documents
         """
         try:
-            # Generate query embedding
-            query_embedding = self.embedding_service.generate_embedding(query)
+            # Generate query embedding (repeat queries are served from cache)
+            query_embedding = await self.embedding_service.agenerate_embedding(query, query=True)
             
             # Build filter
             filters = {}
@@ -321,20 +390,22 @@ class VectorStoreService:
             List of similar documents
         """
         try:
-            # Get document vector
-            doc = await self.client.get_document(document_id)
-            
-            if not doc:
-                logger.warning(
-                    "Document not found for similarity search",
-                    document_id=document_id
-                )
-                return []
-            
-            # Extract vector
-            doc_vector = doc.get("_vector", [])
+            # Use the vector kept at store time, else fetch the document
+            doc_vector = self.document_vectors.get(document_id)
+            if doc_vector is None:
+                doc = await self.client.get_document(document_id)
+                
+                if not doc:
+                    logger.warning(
+                        "Document not found for similarity search",
+                        document_id=document_id
+                    )
+                    return []
+                
+                # Extract vector
+                doc_vector = doc.get("_vector", [])
             
-            if not doc_vector:
+            if not len(doc_vector):
                 logger.warning(
                     "No vector found for document",
                     document_id=document_id
@@ -380,6 +451,9 @@ class VectorStoreService:
         """
         try:
             result = await self.client.delete_document(document_id)
+            self.stored_documents.clear()
+            self.document_vectors.pop(document_id)
+            self.search_cache.clear()
             
             logger.info(
                 "Document deleted from vector store",
@@ -398,6 +472,44 @@ class VectorStoreService:
             )
             return False
     
+    async def delete_documents(self, document_ids: List[str]) -> int:
+        """
+        Delete several documents from vector store in bulk.
+        
+        Args:
+            document_ids: Document IDs to delete
+            
+        Returns:
+            Number of chunk objects deleted
+        """
+        if not document_ids:
+            return 0
+        
+        try:
+            # One filtered delete per batch of IDs instead of a round-trip each
+            deleted = await self.client.delete_documents(list(document_ids))
+            self.stored_documents.clear()
+            for document_id in document_ids:
+                self.document_vectors.pop(document_id)
+            self.search_cache.clear()
+            
+            logger.info(
+                "Documents deleted from vector store",
+                document_count=len(document_ids),
+                deleted_objects=deleted
+            )
+            
+            return deleted
+            
+        except Exception as e:
+            logger.error(
+                "Failed to delete documents from vector store",
+                document_count=len(document_ids),
+                error=str(e),
+                exc_info=True
+            )
+            return 0
+    
     async def get_document_stats(self, user_id: Optional[str] = None) -> Dict[str, Any]:
         """
         Get statistics about stored documents.
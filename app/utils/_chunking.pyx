@@ -0,0 +1,99 @@
+# cython: language_level=3, boundscheck=False, wraparound=False
+"""Compiled text splitting for the semantic chunker."""
+
+from cpython.unicode cimport Py_UNICODE_ISSPACE
+
+
+def split_paragraphs(str text):
+    """
+    Split text at blank lines.
+
+    Equivalent to re.split(r'\\n\\s*\\n', text) with each piece stripped and
+    empty pieces dropped: a break is any whitespace run holding at least
+    two newlines.
+
+    Args:
+        text: Document text
+
+    Returns:
+        List of non-empty, stripped paragraphs
+    """
+    cdef Py_ssize_t n = len(text), i = 0, start = 0, run_start, newlines
+    cdef Py_UCS4 ch
+    cdef list paragraphs = []
+    cdef str piece
+
+    while True:
+        # Every break contains a newline; find() scans for it in C
+        i = text.find(u'\n', i)
+        if i < 0:
+            break
+
+        # Expand to the whole whitespace run around the newline
+        run_start = i
+        while run_start > start and Py_UNICODE_ISSPACE(text[run_start - 1]):
+            run_start -= 1
+        newlines = 0
+        while i < n:
+            ch = text[i]
+            if not Py_UNICODE_ISSPACE(ch):
+                break
+            if ch == u'\n':
+                newlines += 1
+            i += 1
+
+        if newlines >= 2:
+            piece = text[start:run_start].strip()
+            if piece:
+                paragraphs.append(piece)
+            start = i
+
+    piece = text[start:n].strip()
+    if piece:
+        paragraphs.append(piece)
+
+    return paragraphs
+
+
+def split_sentences(str text):
+    """
+    Split text after runs of sentence terminators followed by whitespace.
+
+    Equivalent to re.split(r'[.!?]+\\s+', text) with each piece stripped and
+    empty pieces dropped.
+
+    Args:
+        text: Paragraph text
+
+    Returns:
+        List of non-empty, stripped sentences (without terminators)
+    """
+    cdef Py_ssize_t n = len(text), i = 0, start = 0, run_start
+    cdef Py_UCS4 ch
+    cdef list sentences = []
+    cdef str piece
+
+    while i < n:
+        ch = text[i]
+        if ch != u'.' and ch != u'!' and ch != u'?':
+            i += 1
+            continue
+
+        run_start = i
+        while i < n and (text[i] == u'.' or text[i] == u'!' or text[i] == u'?'):
+            i += 1
+        if i == n or not Py_UNICODE_ISSPACE(text[i]):
+            continue
+
+        while i < n and Py_UNICODE_ISSPACE(text[i]):
+            i += 1
+        piece = text[start:run_start].strip()
+        if piece:
+            sentences.append(piece)
+        start = i
+
+    piece = text[start:n].strip()
+    if piece:
+        sentences.append(piece)
+
+    return sentences
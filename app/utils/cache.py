@@ -0,0 +1,136 @@
+"""Small in-process caching utilities."""
+
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Generic, Hashable, List, Optional, Tuple, TypeVar
+
+V = TypeVar("V")
+
+_MISSING = object()
+
+
+class TTLCache(Generic[V]):
+    """
+    Thread-safe LRU cache whose entries expire after a fixed TTL.
+
+    Expired entries are dropped lazily on access; the least recently used
+    entry is evicted once max_entries is exceeded.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: Optional[float] = 60.0):
+        """
+        Initialize cache.
+
+        Args:
+            max_entries: Maximum number of entries
+            ttl_seconds: Lifetime of an entry (None for no expiry)
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = float("inf") if ttl_seconds is None else ttl_seconds
+        self._data: "OrderedDict[Hashable, Tuple[float, V]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Optional[V]:
+        """Return the cached value for key, or default if missing or expired."""
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                return default
+
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return default
+
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: V) -> None:
+        """Store value under key."""
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        """Remove key if present."""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class DiskCache:
+    """
+    Persistent bytes-to-bytes cache backed by a local SQLite file.
+
+    Intended for values that are expensive to recompute and survive
+    restarts (e.g. embeddings); there is no expiry or size limit.
+    """
+
+    def __init__(self, path: str):
+        """
+        Initialize cache, creating the database file if needed.
+
+        Args:
+            path: SQLite database file path
+        """
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache (key BLOB PRIMARY KEY, value BLOB NOT NULL)"
+        )
+        self._conn.commit()
+        self._lock = threading.Lock()
+
+    def get_many(self, keys: List[bytes]) -> Dict[bytes, bytes]:
+        """Return the cached values for whichever keys are present."""
+        found: Dict[bytes, bytes] = {}
+        with self._lock:
+            # Stay under SQLite's bound-parameter limit
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, value FROM cache WHERE key IN ({placeholders})",
+                    chunk,
+                )
+                found.update(rows)
+        return found
+
+    def get(self, key: bytes) -> Optional[bytes]:
+        """Return the cached value for key, or None."""
+        return self.get_many([key]).get(key)
+
+    def set_many(self, items: Dict[bytes, bytes]) -> None:
+        """Store several values in one transaction."""
+        if not items:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO cache (key, value) VALUES (?, ?)",
+                items.items(),
+            )
+            self._conn.commit()
+
+    def set(self, key: bytes, value: bytes) -> None:
+        """Store value under key."""
+        self.set_many({key: value})
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
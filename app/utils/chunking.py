@@ -1,9 +1,77 @@
 """Document chunking utilities."""
 
+import os
 import re
-from typing import Any, Dict, List
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import tiktoken
 
 from app.config import settings
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+try:
+    from app.utils._chunking import split_paragraphs as _split_paragraphs_compiled
+    from app.utils._chunking import split_sentences as _split_sentences_compiled
+except ImportError:  # Built by scripts/build_extensions.py
+    _split_paragraphs_compiled = None
+    _split_sentences_compiled = None
+
+# Paragraph breaks (blank lines) and sentence ends
+_PARAGRAPH_RE = re.compile(r'\n\s*\n')
+_SENTENCE_RE = re.compile(r'[.!?]+\s+')
+
+
+# Paragraphs shorter than this are split with the regex; the array setup
+# only pays off on long runs of text
+_VECTOR_SPLIT_MIN_CHARS = 4096
+
+
+def _split_sentences(text: str) -> List[str]:
+    """
+    Split text after runs of sentence terminators followed by whitespace.
+    
+    Equivalent to _SENTENCE_RE.split(text) up to surrounding whitespace of
+    each piece. Long ASCII text is scanned as a byte array: a vectorized
+    mask finds every terminator followed by whitespace, and the text is
+    sliced there, instead of the regex engine stepping through each
+    character.
+    """
+    if len(text) < _VECTOR_SPLIT_MIN_CHARS or not text.isascii():
+        return _SENTENCE_RE.split(text)
+    
+    data = np.frombuffer(text.encode("ascii"), dtype=np.uint8)
+    is_terminator = (data == 46) | (data == 33) | (data == 63)
+    # ASCII characters \s matches: space, \t..\r and \x1c..\x1f
+    is_whitespace = (
+        (data == 32) | ((data >= 9) & (data <= 13)) | ((data >= 28) & (data <= 31))
+    )
+    
+    # Last terminator of each run that is followed by whitespace
+    ends = np.flatnonzero(is_terminator[:-1] & is_whitespace[1:])
+    if not len(ends):
+        return [text]
+    
+    # Each piece ends where the terminator run before its split begins
+    run_starts = np.flatnonzero(is_terminator[1:] & ~is_terminator[:-1]) + 1
+    if is_terminator[0]:
+        run_starts = np.concatenate(([0], run_starts))
+    cuts = run_starts[np.searchsorted(run_starts, ends, side="right") - 1].tolist()
+    starts = [0, *(ends + 1).tolist()]
+    return [text[start:cut] for start, cut in zip(starts, cuts)] + [text[starts[-1]:]]
+
+
+@lru_cache(maxsize=1)
+def _get_encoding() -> Optional["tiktoken.Encoding"]:
+    """Tokenizer of the embedding models, or None to estimate from words."""
+    try:
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        logger.warning("Tokenizer unavailable, estimating tokens from words", error=str(e))
+        return None
 
 
 class SemanticChunker:
@@ -37,30 +105,25 @@ class SemanticChunker:
         """
         # Split into paragraphs first
         paragraphs = self._split_into_paragraphs(text)
+        if not paragraphs:
+            return []
+        
+        tokens = np.array(self._count_tokens_batch(paragraphs), dtype=np.int64)
+        # cumulative[k] is the size of paragraphs[:k]
+        cumulative = np.concatenate(([0], np.cumsum(tokens)))
+        oversized = np.flatnonzero(tokens > self.chunk_size)
         
         chunks = []
-        current_chunk = []
-        current_size = 0
         chunk_index = 0
+        overlap_text = ""
+        overlap_size = 0
+        start = 0
+        count = len(paragraphs)
         
-        for para in paragraphs:
-            para_tokens = self._count_tokens(para)
-            
+        while start < count:
             # If paragraph itself is larger than chunk_size, split it
-            if para_tokens > self.chunk_size:
-                # Save current chunk if any
-                if current_chunk:
-                    chunks.append(self._create_chunk(
-                        current_chunk,
-                        chunk_index,
-                        metadata
-                    ))
-                    chunk_index += 1
-                    current_chunk = []
-                    current_size = 0
-                
-                # Split large paragraph
-                sub_chunks = self._split_large_paragraph(para)
+            if tokens[start] > self.chunk_size:
+                sub_chunks = self._split_large_paragraph(paragraphs[start])
                 for sub_chunk in sub_chunks:
                     chunks.append(self._create_chunk(
                         [sub_chunk],
@@ -69,69 +132,82 @@ class SemanticChunker:
                     ))
                     chunk_index += 1
                 
+                overlap_text = ""
+                overlap_size = 0
+                start += 1
                 continue
             
-            # Add paragraph to current chunk
-            if current_size + para_tokens <= self.chunk_size:
-                current_chunk.append(para)
-                current_size += para_tokens
-            else:
-                # Create chunk and start new one
-                if current_chunk:
-                    chunks.append(self._create_chunk(
-                        current_chunk,
-                        chunk_index,
-                        metadata
-                    ))
-                    chunk_index += 1
-                
-                # Handle overlap
-                overlap_text = self._get_overlap_text(current_chunk)
-                current_chunk = [overlap_text, para] if overlap_text else [para]
-                current_size = self._count_tokens("\n\n".join(current_chunk))
-        
-        # Add remaining chunk
-        if current_chunk:
+            # Greedily take paragraphs while the running size fits, found
+            # with one binary search over the prefix sums; a chunk always
+            # takes its first paragraph and stops before an oversized one
+            end = int(np.searchsorted(
+                cumulative,
+                cumulative[start] + self.chunk_size - overlap_size,
+                side="right",
+            )) - 1
+            next_oversized = np.searchsorted(oversized, start)
+            if next_oversized < len(oversized):
+                end = min(end, int(oversized[next_oversized]))
+            end = min(max(end, start + 1), count)
+            
+            current_chunk = paragraphs[start:end]
+            if overlap_text:
+                current_chunk.insert(0, overlap_text)
             chunks.append(self._create_chunk(
                 current_chunk,
                 chunk_index,
                 metadata
             ))
+            chunk_index += 1
+            
+            # Handle overlap into the next chunk unless an oversized
+            # paragraph or the end of the text follows
+            if end < count and tokens[end] <= self.chunk_size:
+                overlap_text = self._get_overlap_text(current_chunk)
+                overlap_size = self._count_tokens(overlap_text) if overlap_text else 0
+            else:
+                overlap_text = ""
+                overlap_size = 0
+            start = end
         
         return chunks
 
     def _split_into_paragraphs(self, text: str) -> List[str]:
         """Split text into paragraphs."""
         # Split on double newlines or section markers
-        paragraphs = re.split(r'\n\s*\n', text)
-        return [p.strip() for p in paragraphs if p.strip()]
+        if _split_paragraphs_compiled is not None:
+            return _split_paragraphs_compiled(text)
+        return [p for p in map(str.strip, _PARAGRAPH_RE.split(text)) if p]
 
     def _split_large_paragraph(self, paragraph: str) -> List[str]:
         """Split a large paragraph into smaller chunks."""
-        sentences = re.split(r'[.!?]+\s+', paragraph)
-        
         chunks = []
-        current_chunk = []
-        current_size = 0
         
-        for sentence in sentences:
-            sentence = sentence.strip()
-            if not sentence:
-                continue
-            
-            sentence_tokens = self._count_tokens(sentence)
-            
-            if current_size + sentence_tokens <= self.chunk_size:
-                current_chunk.append(sentence)
-                current_size += sentence_tokens
-            else:
-                if current_chunk:
-                    chunks.append(". ".join(current_chunk) + ".")
-                current_chunk = [sentence]
-                current_size = sentence_tokens
+        if _split_sentences_compiled is not None:
+            sentences = _split_sentences_compiled(paragraph)
+        else:
+            sentences = [
+                sentence
+                for sentence in map(str.strip, _split_sentences(paragraph))
+                if sentence
+            ]
+        
+        if not sentences:
+            return chunks
         
-        if current_chunk:
-            chunks.append(". ".join(current_chunk) + ".")
+        tokens = np.array(self._count_tokens_batch(sentences), dtype=np.int64)
+        cumulative = np.concatenate(([0], np.cumsum(tokens)))
+        
+        # Each chunk ends at the last sentence whose running size fits; a
+        # sentence larger than chunk_size becomes a chunk of its own
+        start = 0
+        while start < len(sentences):
+            end = int(np.searchsorted(
+                cumulative, cumulative[start] + self.chunk_size, side="right"
+            )) - 1
+            end = max(end, start + 1)
+            chunks.append(". ".join(sentences[start:end]) + ".")
+            start = end
         
         return chunks
 
@@ -150,10 +226,24 @@ class SemanticChunker:
         return " ".join(overlap_tokens)
 
     def _count_tokens(self, text: str) -> int:
-        """Estimate token count (simple word-based approximation)."""
-        # Rough approximation: 1 token ≈ 0.75 words
-        words = len(text.split())
-        return int(words / 0.75)
+        """Count tokens with the embedding models' BPE tokenizer."""
+        encoding = _get_encoding()
+        if encoding is None:
+            # Rough approximation: 1 token ≈ 0.75 words
+            return int(len(text.split()) / 0.75)
+        return len(encoding.encode(text, disallowed_special=()))
+
+    def _count_tokens_batch(self, texts: List[str]) -> List[int]:
+        """Count tokens of many texts in one multi-threaded tokenizer call."""
+        encoding = _get_encoding()
+        if encoding is None:
+            return [self._count_tokens(text) for text in texts]
+        return [
+            len(tokens)
+            for tokens in encoding.encode_batch(
+                texts, num_threads=os.cpu_count() or 1, disallowed_special=()
+            )
+        ]
 
     def _create_chunk(
         self,
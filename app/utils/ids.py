@@ -0,0 +1,53 @@
+"""Identifier generation utilities."""
+
+import secrets
+import threading
+import time
+import uuid
+
+# Random bytes are drawn from the OS in bulk and handed out 10 at a time
+_RANDOM_BATCH_IDS = 4096
+_RANDOM_BYTES_PER_ID = 10
+
+_random_buffer = b""
+_random_offset = 0
+_lock = threading.Lock()
+
+
+def _next_random() -> bytes:
+    """Return 10 random bytes from the shared buffer, refilling when empty."""
+    global _random_buffer, _random_offset
+
+    with _lock:
+        if _random_offset >= len(_random_buffer):
+            _random_buffer = secrets.token_bytes(_RANDOM_BATCH_IDS * _RANDOM_BYTES_PER_ID)
+            _random_offset = 0
+        start = _random_offset
+        _random_offset += _RANDOM_BYTES_PER_ID
+        return _random_buffer[start:_random_offset]
+
+
+def uuid7() -> uuid.UUID:
+    """
+    Generate a time-ordered UUIDv7 (RFC 9562).
+
+    The leading 48 bits are the Unix timestamp in milliseconds, so ids created
+    close together sort together and keep B-tree primary key inserts local.
+
+    Returns:
+        UUID instance
+    """
+    timestamp_ms = time.time_ns() // 1_000_000
+    rand = int.from_bytes(_next_random(), "big")
+
+    value = (timestamp_ms & 0xFFFF_FFFF_FFFF) << 80
+    value |= 0x7 << 76                               # version
+    value |= ((rand >> 68) & 0xFFF) << 64            # rand_a (12 bits)
+    value |= 0b10 << 62                              # variant
+    value |= rand & 0x3FFF_FFFF_FFFF_FFFF            # rand_b (62 bits)
+    return uuid.UUID(int=value)
+
+
+def new_id() -> str:
+    """Generate a new time-ordered identifier as a string."""
+    return str(uuid7())
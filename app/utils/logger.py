@@ -1,43 +1,153 @@
 """Structured logging configuration."""
 
+import atexit
 import logging
+import os
+import queue
 import sys
-from typing import Any, Dict
+import threading
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, BinaryIO, List
 
+import orjson
 import structlog
-from structlog.types import EventDict, Processor
+from structlog.types import Processor
 
 from app.config import settings
 
 
-def add_app_context(logger: logging.Logger, method_name: str, event_dict: EventDict) -> EventDict:
-    """Add application context to log entries."""
-    event_dict["app"] = settings.APP_NAME
-    event_dict["version"] = settings.APP_VERSION
-    event_dict["environment"] = settings.ENVIRONMENT
-    return event_dict
+class _QueuedStream:
+    """
+    Binary stream whose writes happen on a background thread.
+    
+    write() only enqueues, so callers on the event loop never block on the
+    stdout syscall; the writer thread joins whatever has queued up into
+    one write and flushes when the queue runs dry.
+    """
+
+    def __init__(self, stream: BinaryIO):
+        self._stream = stream
+        self._write_lock = threading.Lock()
+        self._start()
+        # Threads do not survive fork, so worker processes get their own
+        # writer; the lock keeps a fork from copying a half-flushed buffer
+        os.register_at_fork(
+            before=self._before_fork,
+            after_in_parent=self._after_fork_in_parent,
+            after_in_child=self._after_fork_in_child,
+        )
+
+    def _before_fork(self) -> None:
+        self._write_lock.acquire()
+
+    def _after_fork_in_parent(self) -> None:
+        self._write_lock.release()
+
+    def _after_fork_in_child(self) -> None:
+        self._write_lock = threading.Lock()
+        self._start()
+
+    def _start(self) -> None:
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread = threading.Thread(
+            target=self._drain, name="log-writer", daemon=True
+        )
+        self._thread.start()
+
+    def write(self, data: bytes) -> None:
+        self._queue.put(data)
+
+    def flush(self) -> None:
+        # The writer thread flushes once it has caught up
+        pass
+
+    def close(self) -> None:
+        """Write out everything queued and stop the writer thread."""
+        self._queue.put(None)
+        self._thread.join()
+
+    def _drain(self) -> None:
+        while True:
+            data = self._queue.get()
+            if data is None:
+                break
+            pending: List[bytes] = [data]
+            stop = False
+            while not self._queue.empty():
+                data = self._queue.get()
+                if data is None:
+                    stop = True
+                    break
+                pending.append(data)
+            with self._write_lock:
+                self._stream.write(b"".join(pending))
+                self._stream.flush()
+            if stop:
+                break
+
+
+def _queue_root_handlers() -> None:
+    """Move the root logger's handlers behind a queue and listener thread."""
+    root = logging.getLogger()
+    handlers = root.handlers[:]
+    if not handlers:
+        return
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = QueueHandler(log_queue)
+    root.handlers = [queue_handler]
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+
+    def acquire_handlers() -> None:
+        # Forking mid-emit would copy a half-flushed stream buffer
+        for handler in handlers:
+            handler.acquire()
+
+    def release_handlers() -> None:
+        for handler in handlers:
+            handler.release()
+
+    def restart_in_child() -> None:
+        # Records still queued at fork time belong to the parent; logging
+        # reinitializes the handler locks in the child
+        queue_handler.queue = listener.queue = queue.SimpleQueue()
+        listener._thread = None
+        listener.start()
+
+    os.register_at_fork(
+        before=acquire_handlers,
+        after_in_parent=release_handlers,
+        after_in_child=restart_in_child,
+    )
 
 
 def configure_logging() -> None:
     """Configure structured logging."""
+    level = getattr(logging, settings.LOG_LEVEL.upper())
+
     # Configure structlog
     shared_processors: list[Processor] = [
         structlog.contextvars.merge_contextvars,
-        structlog.stdlib.add_log_level,
-        structlog.stdlib.add_logger_name,
+        structlog.processors.add_log_level,
         structlog.processors.TimeStamper(fmt="iso"),
-        structlog.processors.StackInfoRenderer(),
-        add_app_context,
     ]
 
     if settings.DEBUG:
         # Pretty console output for development
         structlog.configure(
-            processors=shared_processors
-            + [
+            processors=[
+                # Drop events below the configured level before any other
+                # processor does work on them
+                structlog.stdlib.filter_by_level,
+                *shared_processors,
+                # Nothing logs with stack_info, so stack rendering is kept
+                # out of the production chain
+                structlog.processors.StackInfoRenderer(),
                 structlog.dev.ConsoleRenderer(
                     colors=True,
-                )
+                ),
             ],
             wrapper_class=structlog.stdlib.BoundLogger,
             context_class=dict,
@@ -45,16 +155,22 @@ def configure_logging() -> None:
             cache_logger_on_first_use=True,
         )
     else:
-        # JSON output for production
+        # JSON output for production: orjson renders UTF-8 bytes that are
+        # written straight to stdout, bypassing stdlib logging; the
+        # filtering bound logger makes calls below the level no-ops
+        stream = _QueuedStream(sys.stdout.buffer)
+        atexit.register(stream.close)
         structlog.configure(
             processors=shared_processors
             + [
                 structlog.processors.dict_tracebacks,
-                structlog.processors.JSONRenderer(),
+                structlog.processors.JSONRenderer(
+                    serializer=orjson.dumps, option=orjson.OPT_NON_STR_KEYS
+                ),
             ],
-            wrapper_class=structlog.stdlib.BoundLogger,
+            wrapper_class=structlog.make_filtering_bound_logger(level),
             context_class=dict,
-            logger_factory=structlog.stdlib.LoggerFactory(),
+            logger_factory=structlog.BytesLoggerFactory(file=stream),
             cache_logger_on_first_use=True,
         )
 
@@ -62,14 +178,30 @@ def configure_logging() -> None:
     logging.basicConfig(
         format="%(message)s",
         stream=sys.stdout,
-        level=getattr(logging, settings.LOG_LEVEL.upper()),
+        level=level,
     )
+    # Handlers format and write on the listener thread, off the event loop
+    _queue_root_handlers()
+
+
+_configured = False
+
+# Fixed for the process lifetime, so bound once per logger instead of
+# being added by a processor on every event
+_APP_CONTEXT = {
+    "app": settings.APP_NAME,
+    "version": settings.APP_VERSION,
+    "environment": settings.ENVIRONMENT,
+}
 
 
-def get_logger(name: str) -> structlog.stdlib.BoundLogger:
-    """Get a logger instance."""
-    return structlog.get_logger(name)
+def get_logger(name: str) -> Any:
+    """Get a logger instance, configuring logging on first use."""
+    global _configured
 
+    if not _configured:
+        configure_logging()
+        _configured = True
 
-# Initialize logging on module import
-configure_logging()
+    # The name is bound as context since bytes loggers have no name of their own
+    return structlog.get_logger(name).bind(logger=name, **_APP_CONTEXT)
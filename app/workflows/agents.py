@@ -0,0 +1,25 @@
+"""Agent instances shared by the workflows."""
+
+from functools import lru_cache
+
+from app.agents.compliance_validation_agent import ComplianceValidationAgent
+from app.agents.eligibility_reasoning_agent import EligibilityReasoningAgent
+from app.agents.fraud_detection_agent import FraudDetectionAgent
+
+
+@lru_cache(maxsize=None)
+def get_eligibility_agent() -> EligibilityReasoningAgent:
+    """Get the shared eligibility reasoning agent."""
+    return EligibilityReasoningAgent()
+
+
+@lru_cache(maxsize=None)
+def get_fraud_detector() -> FraudDetectionAgent:
+    """Get the shared fraud detection agent."""
+    return FraudDetectionAgent()
+
+
+@lru_cache(maxsize=None)
+def get_compliance_validator() -> ComplianceValidationAgent:
+    """Get the shared compliance validation agent."""
+    return ComplianceValidationAgent()
@@ -1,8 +1,10 @@
 """LangGraph workflow for document processing using multiple agents."""
 
-from typing import Dict, Any, Literal
+from typing import Any, Awaitable, Callable, Dict, List, Literal, Optional, Sequence, Tuple
+import threading
 import time
 
+import structlog
 from langgraph.graph import StateGraph, END
 
 from app.agents.base_agent import AgentState
@@ -10,13 +12,28 @@ from app.agents.document_classifier_agent import DocumentClassifierAgent
 from app.agents.invoice_extraction_agent import InvoiceExtractionAgent
 from app.agents.policy_parser_agent import PolicyParserAgent
 from app.agents.claims_benefits_agent import ClaimsAndBenefitsAgent
-from app.agents.eligibility_reasoning_agent import EligibilityReasoningAgent
-from app.agents.fraud_detection_agent import FraudDetectionAgent
-from app.agents.compliance_validation_agent import ComplianceValidationAgent
+from app.config import settings
 from app.utils.logger import get_logger
+from app.workflows.agents import (
+    get_compliance_validator,
+    get_eligibility_agent,
+    get_fraud_detector,
+)
+from app.workflows.node_cache import get_node_cache
+from app.workflows.parallel import run_concurrently
+from app.workflows.state import WorkflowState, agent_node
 
 logger = get_logger(__name__)
 
+# Route taken after classification for each supported document type
+_ROUTES: Dict[str, str] = {
+    "invoice": "invoice",
+    "policy": "policy",
+    "claim_form": "claim",
+    "claim": "claim",
+    "eob": "eob",
+}
+
 
 class DocumentProcessingWorkflow:
     """LangGraph workflow for comprehensive document processing."""
@@ -27,24 +44,63 @@ class DocumentProcessingWorkflow:
         self.invoice_extractor = InvoiceExtractionAgent()
         self.policy_parser = PolicyParserAgent()
         self.claims_analyzer = ClaimsAndBenefitsAgent()
-        self.eligibility_agent = EligibilityReasoningAgent()
-        self.fraud_detector = FraudDetectionAgent()
-        self.compliance_validator = ComplianceValidationAgent()
+        # Shared with the other workflow
+        self.eligibility_agent = get_eligibility_agent()
+        self.fraud_detector = get_fraud_detector()
+        self.compliance_validator = get_compliance_validator()
+        
+        # Build the static prompt prefixes up front rather than on first use
+        for agent in (
+            self.classifier,
+            self.invoice_extractor,
+            self.policy_parser,
+            self.claims_analyzer,
+            self.eligibility_agent,
+            self.fraud_detector,
+            self.compliance_validator,
+        ):
+            agent.prepare_prompt()
+        
+        # Policy parsing, fraud detection and compliance validation are
+        # reused for identical inputs such as repeated policy boilerplate
+        self.node_cache = get_node_cache() if settings.WORKFLOW_NODE_CACHE_ENABLED else None
         
         self.workflow = self._build_workflow()
+        
+        # Straight-line graphs for callers that already know the document
+        # type: no classify node and no conditional routing
+        invoice_graph = self._build_path_graph([
+            ("extract_invoice", self._extract_invoice),
+            ("review_invoice", self._review_invoice),
+        ])
+        policy_graph = self._build_path_graph([
+            ("parse_policy", self._parse_policy),
+            ("validate_compliance", self._validate_compliance),
+        ])
+        claim_graph = self._build_path_graph([
+            ("analyze_claim", self._analyze_claim),
+            ("review_claim", self._review_claim),
+        ])
+        self.typed_workflows = {
+            "invoice": invoice_graph,
+            "policy": policy_graph,
+            "claim": claim_graph,
+            "claim_form": claim_graph,
+            "eob": claim_graph,
+        }
 
     def _build_workflow(self) -> StateGraph:
         """Build the LangGraph workflow."""
-        workflow = StateGraph(AgentState)
+        workflow = StateGraph(WorkflowState)
         
         # Add nodes
-        workflow.add_node("classify", self._classify_document)
-        workflow.add_node("extract_invoice", self._extract_invoice)
-        workflow.add_node("parse_policy", self._parse_policy)
-        workflow.add_node("analyze_claim", self._analyze_claim)
-        workflow.add_node("check_eligibility", self._check_eligibility)
-        workflow.add_node("detect_fraud", self._detect_fraud)
-        workflow.add_node("validate_compliance", self._validate_compliance)
+        workflow.add_node("classify", agent_node(self._classify_document))
+        workflow.add_node("extract_invoice", agent_node(self._extract_invoice))
+        workflow.add_node("parse_policy", agent_node(self._parse_policy))
+        workflow.add_node("analyze_claim", agent_node(self._analyze_claim))
+        workflow.add_node("review_invoice", agent_node(self._review_invoice))
+        workflow.add_node("review_claim", agent_node(self._review_claim))
+        workflow.add_node("validate_compliance", agent_node(self._validate_compliance))
         
         # Set entry point
         workflow.set_entry_point("classify")
@@ -62,49 +118,57 @@ class DocumentProcessingWorkflow:
             }
         )
         
-        # Invoice path
-        workflow.add_edge("extract_invoice", "detect_fraud")
+        # Invoice path: fraud detection and compliance validation
+        workflow.add_edge("extract_invoice", "review_invoice")
+        workflow.add_edge("review_invoice", END)
         
-        # Policy path
+        # Policy path: compliance validation
         workflow.add_edge("parse_policy", "validate_compliance")
+        workflow.add_edge("validate_compliance", END)
         
-        # Claim path
-        workflow.add_edge("analyze_claim", "check_eligibility")
-        workflow.add_edge("check_eligibility", "detect_fraud")
+        # Claim path: eligibility, fraud detection and compliance validation
+        workflow.add_edge("analyze_claim", "review_claim")
+        workflow.add_edge("review_claim", END)
         
-        # All paths converge at fraud detection
-        workflow.add_edge("detect_fraud", "validate_compliance")
+        return workflow.compile()
+
+    def _build_path_graph(
+        self, nodes: List[Tuple[str, Callable[[AgentState], Awaitable[AgentState]]]]
+    ) -> StateGraph:
+        """Build a graph that runs the given nodes in order."""
+        workflow = StateGraph(WorkflowState)
         
-        # Final step
-        workflow.add_edge("validate_compliance", END)
+        for name, node in nodes:
+            workflow.add_node(name, agent_node(node))
+        
+        workflow.set_entry_point(nodes[0][0])
+        for (name, _), (next_name, _) in zip(nodes, nodes[1:]):
+            workflow.add_edge(name, next_name)
+        workflow.add_edge(nodes[-1][0], END)
         
         return workflow.compile()
 
     def _route_after_classification(
-        self, state: AgentState
+        self, state: WorkflowState
     ) -> Literal["invoice", "policy", "claim", "eob", "end"]:
         """Route to appropriate agent based on document type."""
-        if state.errors:
-            logger.warning("Classification errors, ending workflow", errors=state.errors)
+        if state["errors"]:
+            logger.warning("Classification errors, ending workflow", errors=state["errors"])
             return "end"
         
-        doc_type = state.document_type
+        doc_type = state["document_type"]
         
         if not doc_type:
             logger.warning("No document type determined")
             return "end"
         
-        if doc_type == "invoice":
-            return "invoice"
-        elif doc_type == "policy":
-            return "policy"
-        elif doc_type in ["claim_form", "claim"]:
-            return "claim"
-        elif doc_type == "eob":
-            return "eob"
-        else:
+        # One dict lookup instead of a chain of string comparisons
+        route = _ROUTES.get(doc_type)
+        if route is None:
             logger.warning(f"Unknown document type: {doc_type}")
             return "end"
+        
+        return route
 
     async def _classify_document(self, state: AgentState) -> AgentState:
         """Classify document type."""
@@ -116,10 +180,29 @@ class DocumentProcessingWorkflow:
         logger.info("Extracting invoice data")
         return await self.invoice_extractor.run(state)
 
+    async def _run_cached(
+        self,
+        node: str,
+        state: AgentState,
+        func: Callable[[AgentState], Awaitable[AgentState]],
+        reads: Sequence[str],
+        writes: Sequence[str],
+    ) -> AgentState:
+        """Run a node through the node result cache when it is enabled."""
+        if self.node_cache is None:
+            return await func(state)
+        return await self.node_cache.run(node, state, func, reads, writes)
+
     async def _parse_policy(self, state: AgentState) -> AgentState:
         """Parse policy document."""
         logger.info("Parsing policy document")
-        return await self.policy_parser.run(state)
+        return await self._run_cached(
+            "parse_policy",
+            state,
+            self.policy_parser.run,
+            reads=("text",),
+            writes=("extracted_entities", "confidence", "current_step"),
+        )
 
     async def _analyze_claim(self, state: AgentState) -> AgentState:
         """Analyze claim."""
@@ -134,12 +217,37 @@ class DocumentProcessingWorkflow:
     async def _detect_fraud(self, state: AgentState) -> AgentState:
         """Detect fraud patterns."""
         logger.info("Detecting fraud patterns")
-        return await self.fraud_detector.run(state)
+        return await self._run_cached(
+            "detect_fraud",
+            state,
+            self.fraud_detector.run,
+            reads=("text", "extracted_entities", "analysis.historical_data"),
+            writes=("analysis.fraud_detection", "confidence", "current_step"),
+        )
 
     async def _validate_compliance(self, state: AgentState) -> AgentState:
         """Validate compliance."""
         logger.info("Validating compliance")
-        return await self.compliance_validator.run(state)
+        return await self._run_cached(
+            "validate_compliance",
+            state,
+            self.compliance_validator.run,
+            reads=("text", "extracted_entities", "document_type"),
+            writes=("analysis.compliance", "confidence", "current_step"),
+        )
+
+    async def _review_invoice(self, state: AgentState) -> AgentState:
+        """Detect fraud and validate compliance of an invoice concurrently."""
+        return await run_concurrently(
+            state, [self._detect_fraud, self._validate_compliance]
+        )
+
+    async def _review_claim(self, state: AgentState) -> AgentState:
+        """Check eligibility, detect fraud and validate compliance concurrently."""
+        return await run_concurrently(
+            state,
+            [self._check_eligibility, self._detect_fraud, self._validate_compliance],
+        )
 
     async def process_document(
         self, 
@@ -158,71 +266,79 @@ class DocumentProcessingWorkflow:
         Returns:
             Processing results
         """
-        logger.info(
-            "Starting document processing workflow",
-            document_id=document_id,
-            text_length=len(text),
-        )
-        
-        start_time = time.time()
-        
-        # Initialize state
-        initial_state = AgentState(
-            document_id=document_id,
-            text=text,
-            document_type=document_type,
-        )
-        
-        try:
-            # Run workflow
-            final_state = await self.workflow.ainvoke(initial_state)
-            
-            processing_time = time.time() - start_time
-            final_state.processing_time = processing_time
-            
+        # Every log line of this run, agent nodes included, carries the
+        # document ID from the context rather than as a keyword argument
+        with structlog.contextvars.bound_contextvars(document_id=document_id):
             logger.info(
-                "Document processing completed",
-                document_id=document_id,
-                document_type=final_state.document_type,
-                processing_time=processing_time,
-                errors=len(final_state.errors),
+                "Starting document processing workflow",
+                text_length=len(text),
             )
             
-            return {
-                "success": len(final_state.errors) == 0,
-                "document_id": final_state.document_id,
-                "document_type": final_state.document_type,
-                "extracted_entities": final_state.extracted_entities,
-                "classifications": final_state.classifications,
-                "analysis": final_state.analysis,
-                "confidence": final_state.confidence,
-                "processing_time": final_state.processing_time,
-                "errors": final_state.errors,
-                "iterations": final_state.iterations,
-            }
+            start_time = time.perf_counter()
             
-        except Exception as e:
-            logger.error(
-                "Workflow execution failed",
+            # Initialize state
+            initial_state = AgentState(
                 document_id=document_id,
-                error=str(e),
-                exc_info=True,
+                text=text,
+                document_type=document_type,
             )
-            return {
-                "success": False,
-                "document_id": document_id,
-                "errors": [str(e)],
-                "processing_time": time.time() - start_time,
-            }
+            
+            try:
+                # Run workflow
+                # Pre-classified documents skip classification
+                workflow = self.typed_workflows.get(document_type, self.workflow)
+                final_state = await workflow.ainvoke(initial_state.model_dump())
+                
+                processing_time = time.perf_counter() - start_time
+                
+                logger.info(
+                    "Document processing completed",
+                    document_type=final_state["document_type"],
+                    processing_time=processing_time,
+                    errors=len(final_state["errors"]),
+                )
+                
+                return {
+                    "success": len(final_state["errors"]) == 0,
+                    "document_id": final_state["document_id"],
+                    "document_type": final_state["document_type"],
+                    "extracted_entities": final_state["extracted_entities"],
+                    "classifications": final_state["classifications"],
+                    "analysis": final_state["analysis"],
+                    "confidence": final_state["confidence"],
+                    "processing_time": processing_time,
+                    "errors": final_state["errors"],
+                    "iterations": final_state["iterations"],
+                }
+                
+            except Exception as e:
+                logger.error(
+                    "Workflow execution failed",
+                    error=str(e),
+                    exc_info=True,
+                )
+                return {
+                    "success": False,
+                    "document_id": document_id,
+                    "errors": [str(e)],
+                    "processing_time": time.perf_counter() - start_time,
+                }
 
 
 # Global workflow instance
-_workflow_instance = None
+_workflow_instance: Optional[DocumentProcessingWorkflow] = None
+_workflow_lock = threading.Lock()
 
 
 def get_document_processing_workflow() -> DocumentProcessingWorkflow:
     """Get or create workflow instance."""
     global _workflow_instance
+    
+    # Building a workflow creates every agent and its LLM client, so
+    # concurrent first calls must not each build one
     if _workflow_instance is None:
-        _workflow_instance = DocumentProcessingWorkflow()
+        with _workflow_lock:
+            if _workflow_instance is None:
+                _workflow_instance = DocumentProcessingWorkflow()
+    
     return _workflow_instance
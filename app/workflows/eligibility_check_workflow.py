@@ -1,15 +1,22 @@
 """Eligibility check workflow for determining coverage eligibility."""
 
-from typing import Dict, Any
+from typing import Any, Dict, Iterator, Optional
+import threading
 import time
 
+import structlog
 from langgraph.graph import StateGraph, END
 
 from app.agents.base_agent import AgentState
-from app.agents.eligibility_reasoning_agent import EligibilityReasoningAgent
-from app.agents.fraud_detection_agent import FraudDetectionAgent
-from app.agents.compliance_validation_agent import ComplianceValidationAgent
+from app.utils.ids import new_id
 from app.utils.logger import get_logger
+from app.workflows.agents import (
+    get_compliance_validator,
+    get_eligibility_agent,
+    get_fraud_detector,
+)
+from app.workflows.parallel import run_concurrently
+from app.workflows.state import WorkflowState, agent_node
 
 logger = get_logger(__name__)
 
@@ -19,26 +26,32 @@ class EligibilityCheckWorkflow:
 
     def __init__(self):
         """Initialize workflow."""
-        self.eligibility_agent = EligibilityReasoningAgent()
-        self.fraud_detector = FraudDetectionAgent()
-        self.compliance_validator = ComplianceValidationAgent()
+        # Shared with the other workflow
+        self.eligibility_agent = get_eligibility_agent()
+        self.fraud_detector = get_fraud_detector()
+        self.compliance_validator = get_compliance_validator()
+        
+        # Build the static prompt prefixes up front rather than on first use
+        for agent in (
+            self.eligibility_agent,
+            self.fraud_detector,
+            self.compliance_validator,
+        ):
+            agent.prepare_prompt()
         
         self.workflow = self._build_workflow()
 
     def _build_workflow(self) -> StateGraph:
         """Build the workflow graph."""
-        workflow = StateGraph(AgentState)
+        workflow = StateGraph(WorkflowState)
         
-        # Add nodes
-        workflow.add_node("check_eligibility", self._check_eligibility)
-        workflow.add_node("detect_fraud", self._detect_fraud)
-        workflow.add_node("validate_compliance", self._validate_compliance)
+        # Eligibility, fraud detection and compliance validation read only
+        # the request data, so they run concurrently in one node
+        workflow.add_node("review", agent_node(self._review))
         
         # Define flow
-        workflow.set_entry_point("check_eligibility")
-        workflow.add_edge("check_eligibility", "detect_fraud")
-        workflow.add_edge("detect_fraud", "validate_compliance")
-        workflow.add_edge("validate_compliance", END)
+        workflow.set_entry_point("review")
+        workflow.add_edge("review", END)
         
         return workflow.compile()
 
@@ -54,6 +67,13 @@ class EligibilityCheckWorkflow:
         """Validate compliance."""
         return await self.compliance_validator.run(state)
 
+    async def _review(self, state: AgentState) -> AgentState:
+        """Run all checks concurrently."""
+        return await run_concurrently(
+            state,
+            [self._check_eligibility, self._detect_fraud, self._validate_compliance],
+        )
+
     async def check_eligibility(
         self,
         policy_info: Dict[str, Any],
@@ -71,12 +91,14 @@ class EligibilityCheckWorkflow:
         Returns:
             Eligibility determination with fraud and compliance checks
         """
-        logger.info("Starting eligibility check")
-        
-        start_time = time.time()
-        
-        # Prepare text for analysis
-        text = f"""
+        # Tag every log line of this check, agent nodes included
+        with structlog.contextvars.bound_contextvars(correlation_id=new_id()):
+            logger.info("Starting eligibility check")
+            
+            start_time = time.perf_counter()
+            
+            # Prepare text for analysis
+            text = f"""
 Policy Information:
 {self._format_dict(policy_info)}
 
@@ -86,76 +108,88 @@ Service Information:
 Patient Information:
 {self._format_dict(patient_info) if patient_info else 'Not provided'}
 """
-        
-        # Initialize state
-        initial_state = AgentState(
-            text=text,
-            document_type="eligibility_check",
-        )
-        
-        # Add structured data to state
-        initial_state.extracted_entities = {
-            "policy": policy_info,
-            "service": service_info,
-            "patient": patient_info or {},
-        }
-        
-        try:
-            # Run workflow
-            final_state = await self.workflow.ainvoke(initial_state)
-            
-            processing_time = time.time() - start_time
             
-            logger.info(
-                "Eligibility check completed",
-                is_eligible=final_state.analysis.get("is_eligible"),
-                processing_time=processing_time,
+            # Initialize state
+            initial_state = AgentState(
+                text=text,
+                document_type="eligibility_check",
             )
             
-            return {
-                "success": len(final_state.errors) == 0,
-                "eligibility": final_state.analysis,
-                "fraud_risk": final_state.analysis.get("fraud_detection", {}),
-                "compliance": final_state.analysis.get("compliance", {}),
-                "confidence": final_state.confidence,
-                "processing_time": processing_time,
-                "errors": final_state.errors,
+            # Add structured data to state
+            initial_state.extracted_entities = {
+                "policy": policy_info,
+                "service": service_info,
+                "patient": patient_info or {},
             }
             
-        except Exception as e:
-            logger.error("Eligibility check failed", error=str(e), exc_info=True)
-            return {
-                "success": False,
-                "errors": [str(e)],
-                "processing_time": time.time() - start_time,
-            }
+            try:
+                # Run workflow
+                final_state = await self.workflow.ainvoke(initial_state.model_dump())
+                analysis = final_state["analysis"]
+                
+                processing_time = time.perf_counter() - start_time
+                
+                logger.info(
+                    "Eligibility check completed",
+                    is_eligible=analysis.get("is_eligible"),
+                    processing_time=processing_time,
+                )
+                
+                return {
+                    "success": len(final_state["errors"]) == 0,
+                    "eligibility": analysis,
+                    "fraud_risk": analysis.get("fraud_detection", {}),
+                    "compliance": analysis.get("compliance", {}),
+                    "confidence": final_state["confidence"],
+                    "processing_time": processing_time,
+                    "errors": final_state["errors"],
+                }
+                
+            except Exception as e:
+                logger.error("Eligibility check failed", error=str(e), exc_info=True)
+                return {
+                    "success": False,
+                    "errors": [str(e)],
+                    "processing_time": time.perf_counter() - start_time,
+                }
 
     def _format_dict(self, data: Dict[str, Any]) -> str:
         """Format dictionary for text representation."""
         if not data:
             return "No data"
         
-        lines = []
+        # Prompts expect "key: value" lines rather than JSON, so the lines
+        # are joined straight from a generator without a list of parts
+        return "\n".join(self._format_lines(data))
+
+    @staticmethod
+    def _format_lines(data: Dict[str, Any]) -> Iterator[str]:
+        """Yield the "key: value" lines of a dictionary."""
         for key, value in data.items():
             if isinstance(value, dict):
-                lines.append(f"{key}:")
+                yield f"{key}:"
                 for k, v in value.items():
-                    lines.append(f"  {k}: {v}")
+                    yield f"  {k}: {v}"
             elif isinstance(value, list):
-                lines.append(f"{key}: {', '.join(str(v) for v in value)}")
+                yield f"{key}: {', '.join(map(str, value))}"
             else:
-                lines.append(f"{key}: {value}")
-        
-        return "\n".join(lines)
+                yield f"{key}: {value}"
 
 
 # Global instance
-_eligibility_workflow_instance = None
+_eligibility_workflow_instance: Optional[EligibilityCheckWorkflow] = None
+_eligibility_workflow_lock = threading.Lock()
 
 
 def get_eligibility_check_workflow() -> EligibilityCheckWorkflow:
     """Get or create eligibility workflow instance."""
     global _eligibility_workflow_instance
+    
+    # Building a workflow creates every agent and its LLM client, so
+    # concurrent first calls must not each build one
     if _eligibility_workflow_instance is None:
-        _eligibility_workflow_instance = EligibilityCheckWorkflow()
+        with _eligibility_workflow_lock:
+            if _eligibility_workflow_instance is None:
+                _eligibility_workflow_instance = EligibilityCheckWorkflow()
+    
     return _eligibility_workflow_instance
@@ -0,0 +1,129 @@
+"""Result cache for idempotent workflow nodes."""
+
+import copy
+import hashlib
+import threading
+from typing import Any, Awaitable, Callable, Dict, Optional, Sequence
+
+import orjson
+
+from app.agents.base_agent import AgentState
+from app.config import settings
+from app.utils.cache import TTLCache
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+_MISSING = object()
+
+
+def _get_path(state: AgentState, path: str) -> Any:
+    """Read a state field, or a key of a dict field as "field.key"."""
+    field, _, key = path.partition(".")
+    value = getattr(state, field)
+    return value.get(key, _MISSING) if key else value
+
+
+def _set_path(state: AgentState, path: str, value: Any) -> None:
+    """Write a state field, or a key of a dict field as "field.key"."""
+    field, _, key = path.partition(".")
+    if key:
+        getattr(state, field)[key] = value
+    else:
+        setattr(state, field, value)
+
+
+class NodeCache:
+    """
+    Memoizes workflow nodes on the slice of state they read.
+
+    A node declares the state paths it reads and writes. On a hit the
+    cached writes are applied to the state and the agent, and its LLM
+    round-trip, is skipped. Only runs that add no errors are cached.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        """
+        Initialize node cache.
+
+        Args:
+            max_entries: Maximum number of cached node results
+            ttl_seconds: Lifetime of a cached result
+        """
+        self._cache: TTLCache = TTLCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+
+    @staticmethod
+    def _key(node: str, state: AgentState, reads: Sequence[str]) -> bytes:
+        """Digest of the node name and the state it reads."""
+        payload = orjson.dumps(
+            [node, *[_get_path(state, path) for path in reads]],
+            default=str,
+            option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS,
+        )
+        return hashlib.blake2b(payload, digest_size=16).digest()
+
+    async def run(
+        self,
+        node: str,
+        state: AgentState,
+        func: Callable[[AgentState], Awaitable[AgentState]],
+        reads: Sequence[str],
+        writes: Sequence[str],
+    ) -> AgentState:
+        """
+        Run a node, reusing its result for identical inputs.
+
+        Args:
+            node: Node name, part of the cache key
+            state: Workflow state
+            func: Node implementation
+            reads: State paths the node's output depends on
+            writes: State paths the node sets
+
+        Returns:
+            Updated state
+        """
+        key = self._key(node, state, reads)
+        cached: Optional[Dict[str, Any]] = self._cache.get(key)
+        if cached is not None:
+            logger.info("Node result cache hit", node=node)
+            for path, value in cached["writes"].items():
+                _set_path(state, path, copy.deepcopy(value))
+            state.iterations += cached["iterations"]
+            return state
+
+        errors = len(state.errors)
+        iterations = state.iterations
+        state = await func(state)
+
+        if len(state.errors) == errors:
+            self._cache.set(key, {
+                "writes": {
+                    path: copy.deepcopy(value)
+                    for path in writes
+                    if (value := _get_path(state, path)) is not _MISSING
+                },
+                "iterations": state.iterations - iterations,
+            })
+
+        return state
+
+
+# Singleton instance
+_node_cache: Optional[NodeCache] = None
+_node_cache_lock = threading.Lock()
+
+
+def get_node_cache() -> NodeCache:
+    """Get or create the shared node result cache."""
+    global _node_cache
+
+    if _node_cache is None:
+        with _node_cache_lock:
+            if _node_cache is None:
+                _node_cache = NodeCache(
+                    max_entries=settings.WORKFLOW_NODE_CACHE_MAX_ENTRIES,
+                    ttl_seconds=settings.WORKFLOW_NODE_CACHE_TTL_SECONDS,
+                )
+
+    return _node_cache
@@ -0,0 +1,54 @@
+"""Concurrent execution of independent workflow nodes."""
+
+import asyncio
+from typing import Awaitable, Callable, Sequence
+
+from app.agents.base_agent import AgentState
+
+Node = Callable[[AgentState], Awaitable[AgentState]]
+
+
+async def run_concurrently(state: AgentState, nodes: Sequence[Node]) -> AgentState:
+    """
+    Run independent nodes concurrently and merge their results.
+    
+    Each node gets its own copy of the state. The result matches running
+    the nodes in order, provided none of them reads what another writes.
+    The first node's result is the base. Each later node adds the analysis
+    entries it sets, its errors and its iterations. When it succeeds, it
+    also sets confidence and the current step.
+    
+    Args:
+        state: Workflow state
+        nodes: Node implementations, in their sequential order
+        
+    Returns:
+        Merged state
+    """
+    # A task group cancels the remaining nodes if one of them raises,
+    # where gather would leave their LLM calls running
+    try:
+        async with asyncio.TaskGroup() as group:
+            tasks = [
+                group.create_task(node(state.model_copy(deep=True)))
+                for node in nodes
+            ]
+    except ExceptionGroup as e:
+        # Surface the node's own error to the workflow, as gather did
+        raise e.exceptions[0]
+    
+    merged, *others = [task.result() for task in tasks]
+    errors = len(state.errors)
+    for result in others:
+        merged.analysis.update({
+            key: value
+            for key, value in result.analysis.items()
+            if key not in state.analysis or state.analysis[key] != value
+        })
+        merged.errors.extend(result.errors[errors:])
+        merged.iterations += result.iterations - state.iterations
+        if len(result.errors) == errors:
+            merged.confidence = result.confidence
+            merged.current_step = result.current_step
+    
+    return merged
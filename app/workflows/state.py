@@ -0,0 +1,92 @@
+"""Graph state shared by the LangGraph workflows."""
+
+import operator
+from typing import Annotated, Any, Awaitable, Callable, Dict, List, Optional, TypedDict
+
+from app.agents.base_agent import AgentState
+
+_MISSING = object()
+
+# Dict fields whose entries are merged rather than replaced
+_MERGED_FIELDS = ("extracted_entities", "classifications", "analysis")
+
+
+def _merge(current: Dict[str, Any], update: Dict[str, Any]) -> Dict[str, Any]:
+    """Reducer: overlay a node's dict entries on the current ones."""
+    return {**current, **update}
+
+
+class WorkflowState(TypedDict):
+    """
+    Graph state with per-field reducers.
+
+    Mirrors AgentState. Nodes return only the fields they change. Dict
+    fields merge the returned entries, errors are appended and iterations
+    are added, so the graph applies sparse updates.
+    """
+
+    document_id: Optional[str]
+    text: Optional[str]
+    document_type: Optional[str]
+    current_step: str
+    iterations: Annotated[int, operator.add]
+    max_iterations: int
+    extracted_entities: Annotated[Dict[str, Any], _merge]
+    classifications: Annotated[Dict[str, Any], _merge]
+    analysis: Annotated[Dict[str, Any], _merge]
+    errors: Annotated[List[str], operator.add]
+    confidence: float
+    processing_time: float
+
+
+def _state_update(state: WorkflowState, result: AgentState) -> Dict[str, Any]:
+    """Fields of result that differ from the graph state, as reducer inputs."""
+    update: Dict[str, Any] = {}
+
+    for field in AgentState.model_fields:
+        value = getattr(result, field)
+        current = state.get(field)
+
+        if field in _MERGED_FIELDS:
+            # AgentState copies the dict itself but not its values, so an
+            # entry the agent set is a different object
+            changed = {
+                key: item
+                for key, item in value.items()
+                if current.get(key, _MISSING) is not item
+            }
+            if changed:
+                update[field] = changed
+        elif field == "errors":
+            if len(value) > len(current):
+                update[field] = value[len(current):]
+        elif field == "iterations":
+            if value != current:
+                update[field] = value - current
+        elif value != current:
+            update[field] = value
+
+    return update
+
+
+def agent_node(
+    func: Callable[[AgentState], Awaitable[AgentState]],
+) -> Callable[[WorkflowState], Awaitable[Dict[str, Any]]]:
+    """
+    Adapt an AgentState node to the graph.
+
+    The wrapped node runs on an AgentState built from the graph state and
+    returns only the fields it changed.
+
+    Args:
+        func: Node implementation working on AgentState
+
+    Returns:
+        Graph node
+    """
+    async def node(state: WorkflowState) -> Dict[str, Any]:
+        result = await func(AgentState(**state))
+        return _state_update(state, result)
+
+    node.__name__ = getattr(func, "__name__", "agent_node")
+    return node
@@ -0,0 +1,38 @@
+"""Build optional Cython extensions in place.
+
+Usage:
+    python scripts/build_extensions.py
+
+The application falls back to pure Python when an extension is missing.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+from Cython.Build import cythonize
+from setuptools import Extension
+from setuptools.dist import Distribution
+
+ROOT = Path(__file__).parent.parent
+
+EXTENSIONS = [
+    Extension("app.utils._chunking", ["app/utils/_chunking.pyx"]),
+]
+
+
+def main():
+    """Compile all extensions next to their sources."""
+    distribution = Distribution({
+        "ext_modules": cythonize(EXTENSIONS, language_level=3),
+    })
+    command = distribution.get_command_obj("build_ext")
+    command.inplace = True
+    command.ensure_finalized()
+    command.run()
+
+
+if __name__ == "__main__":
+    sys.path.insert(0, str(ROOT))
+    os.chdir(ROOT)
+    main()
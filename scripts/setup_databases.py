@@ -11,7 +11,7 @@ from app.config import settings
 from app.db.nebula import nebula_client
 from app.db.postgres import init_db as init_postgres
 from app.db.weaviate import weaviate_client
-from app.models.graph_schema import get_all_schema_statements
+from app.models.graph_schema import get_schema_statement_tiers
 from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -34,16 +34,18 @@ async def setup_nebula():
     try:
         await nebula_client.connect()
         
-        # Execute schema statements
-        statements = get_all_schema_statements()
+        # Execute schema statements tier by tier; statements within a tier
+        # have no dependencies on each other and run concurrently
+        tiers = get_schema_statement_tiers()
         
-        for i, stmt in enumerate(statements):
-            try:
-                logger.info(f"Executing statement {i+1}/{len(statements)}")
-                await nebula_client.execute(stmt)
-            except Exception as e:
-                # Some statements might fail if already exist, log but continue
-                logger.warning(f"Statement {i+1} failed", error=str(e))
+        for tier_num, statements in enumerate(tiers, start=1):
+            logger.info(f"Executing schema tier {tier_num}/{len(tiers)}", statements=len(statements))
+            results = await nebula_client.execute_concurrently(statements)
+            
+            for stmt, result in zip(statements, results):
+                if isinstance(result, Exception):
+                    # Some statements might fail if already exist, log but continue
+                    logger.warning("Statement failed", statement=stmt.split("(")[0], error=str(result))
         
         logger.info("NebulaGraph schema initialized successfully")
     except Exception as e:
@@ -15,14 +15,13 @@ from dotenv import load_dotenv
 load_dotenv()
 
 import os
-import psycopg2
-from redis import Redis
-import weaviate
-from weaviate.classes.init import Auth
+import asyncpg
+import httpx
+from redis.asyncio import Redis
 from nebula3.gclient.net import ConnectionPool
 from nebula3.Config import Config as NebulaConfig
 from minio import Minio
-from openai import OpenAI
+from openai import AsyncOpenAI
 
 # Color codes for terminal output
 GREEN = '\033[92m'
@@ -51,27 +50,27 @@ def print_result(service: str, status: bool, message: str = ""):
         print(f"{prefix}{message}")
 
 
-def check_postgres() -> Tuple[bool, str]:
+async def check_postgres() -> Tuple[bool, str]:
     """Test PostgreSQL connection"""
     try:
-        conn = psycopg2.connect(
+        conn = await asyncpg.connect(
             host=os.getenv("POSTGRES_HOST", "localhost"),
             port=int(os.getenv("POSTGRES_PORT", "5432")),
             database=os.getenv("POSTGRES_DB", "finsight"),
             user=os.getenv("POSTGRES_USER", "finsight_user"),
-            password=os.getenv("POSTGRES_PASSWORD", "secure_password")
+            password=os.getenv("POSTGRES_PASSWORD", "secure_password"),
+            timeout=5,
         )
-        cursor = conn.cursor()
-        cursor.execute("SELECT version();")
-        version = cursor.fetchone()[0]
-        cursor.close()
-        conn.close()
+        try:
+            version = await conn.fetchval("SELECT version();")
+        finally:
+            await conn.close()
         return True, f"Connected - {version.split(',')[0]}"
     except Exception as e:
         return False, str(e)
 
 
-def check_redis() -> Tuple[bool, str]:
+async def check_redis() -> Tuple[bool, str]:
     """Test Redis connection"""
     try:
         client = Redis(
@@ -80,27 +79,27 @@ def check_redis() -> Tuple[bool, str]:
             db=int(os.getenv("REDIS_DB", "0")),
             decode_responses=True
         )
-        client.ping()
-        info = client.info()
+        try:
+            await client.ping()
+            info = await client.info()
+        finally:
+            await client.aclose()
         return True, f"Connected - Redis {info['redis_version']}"
     except Exception as e:
         return False, str(e)
 
 
-def check_weaviate() -> Tuple[bool, str]:
+async def check_weaviate(http: httpx.AsyncClient) -> Tuple[bool, str]:
     """Test Weaviate connection"""
     try:
-        client = weaviate.connect_to_local(
-            host="localhost",
-            port=8080
-        )
-        if client.is_ready():
-            meta = client.get_meta()
-            version = meta.get('version', 'unknown')
-            client.close()
-            return True, f"Connected - Weaviate {version}"
-        else:
+        url = os.getenv("WEAVIATE_URL", "http://localhost:8080").rstrip("/")
+        response = await http.get(f"{url}/v1/.well-known/ready")
+        if response.status_code != 200:
             return False, "Service not ready"
+        
+        meta = (await http.get(f"{url}/v1/meta")).json()
+        version = meta.get('version', 'unknown')
+        return True, f"Connected - Weaviate {version}"
     except Exception as e:
         return False, str(e)
 
@@ -160,20 +159,23 @@ def check_minio() -> Tuple[bool, str]:
         return False, str(e)
 
 
-def check_openai() -> Tuple[bool, str]:
+async def check_openai() -> Tuple[bool, str]:
     """Test OpenAI API connection"""
     try:
         api_key = os.getenv("OPENAI_API_KEY", "")
         if not api_key or api_key == "sk-your-api-key-here":
             return False, "API key not configured"
         
-        client = OpenAI(api_key=api_key)
+        client = AsyncOpenAI(api_key=api_key)
         
         # Test with a simple embedding call (cheaper than completion)
-        response = client.embeddings.create(
-            model="text-embedding-3-small",
-            input="test"
-        )
+        try:
+            response = await client.embeddings.create(
+                model="text-embedding-3-small",
+                input="test"
+            )
+        finally:
+            await client.close()
         
         if response.data and len(response.data) > 0:
             dim = len(response.data[0].embedding)
@@ -187,23 +189,29 @@ def check_openai() -> Tuple[bool, str]:
         return False, error_msg[:100]
 
 
-def check_services():
+async def check_services():
     """Check all service health"""
     print_header()
     
-    services = {
-        "PostgreSQL": check_postgres,
-        "Redis": check_redis,
-        "Weaviate": check_weaviate,
-        "NebulaGraph": check_nebula,
-        "MinIO": check_minio,
-        "OpenAI API": check_openai,
-    }
+    # All probes run at once, so the check takes as long as the slowest
+    # service rather than the sum; NebulaGraph and MinIO only have
+    # blocking clients and run in threads
+    async with httpx.AsyncClient(
+        timeout=5.0, limits=httpx.Limits(max_keepalive_connections=8)
+    ) as http:
+        services = {
+            "PostgreSQL": check_postgres(),
+            "Redis": check_redis(),
+            "Weaviate": check_weaviate(http),
+            "NebulaGraph": asyncio.to_thread(check_nebula),
+            "MinIO": asyncio.to_thread(check_minio),
+            "OpenAI API": check_openai(),
+        }
+        outcomes = await asyncio.gather(*services.values())
     
     results = {}
     
-    for service_name, check_func in services.items():
-        success, message = check_func()
+    for service_name, (success, message) in zip(services, outcomes):
         results[service_name] = success
         print_result(service_name, success, message)
     
@@ -233,7 +241,7 @@ def check_services():
 
 if __name__ == "__main__":
     try:
-        success = check_services()
+        success = asyncio.run(check_services())
         sys.exit(0 if success else 1)
     except KeyboardInterrupt:
         print(f"\n{YELLOW}Test interrupted{RESET}")